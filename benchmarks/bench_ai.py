@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI控制器每帧耗时：4条AI蛇共享一块40x25 MODERN棋盘
+
+统计每帧 SquadPilot.steer() + observe()（所有控制器合计，不含规则推进）的耗时，
+另列出 MultiSnakeSimulation.step() 本身的耗时。--full-rebuild 时每帧丢弃距离场缓存，
+对比增量修复与每帧全图BFS的差别。所有蛇死亡后立即重开一局。
+
+用法: python benchmarks/bench_ai.py [--ticks N] [--snakes N] [--full-rebuild]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from multi_simulation import MultiSnakeSimulation
+from simulation import GameMode, grid_size_for_mode
+from snake_ai import SquadPilot
+
+# 多蛇对局中难度8~10同样使用安全A*（哈密顿回路只适用于单蛇）
+LEVELS = (("greedy", 2), ("astar", 5), ("astar+safe", 7))
+
+
+def bench_level(difficulty, snakes, ticks, seed, full_rebuild):
+    width, height = grid_size_for_mode(GameMode.MODERN)
+    sim = MultiSnakeSimulation(width, height, GameMode.MODERN, players=snakes, rng=random.Random(seed))
+    squad = SquadPilot(sim, {player: difficulty for player in range(snakes)})
+
+    samples = []
+    step_ns = 0
+    clock = time.perf_counter_ns
+    for _ in range(ticks):
+        if full_rebuild:
+            squad.fields.reset()
+        start = clock()
+        squad.steer()
+        middle = clock()
+        result = sim.step()
+        end = clock()
+        squad.observe(result)
+        samples.append(middle - start + clock() - end)
+        step_ns += end - middle
+        if not sim.alive_count:
+            sim.reset()
+            squad.reset()
+    samples.sort()
+    return statistics.fmean(samples), samples[int(len(samples) * 0.99)], samples[-1], step_ns / ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--snakes", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--full-rebuild", action="store_true", help="每帧重新计算距离场")
+    args = parser.parse_args(argv)
+
+    print(f"{args.snakes} snakes, 40x25 modern, {args.ticks} ticks"
+          + (" (full rebuild)" if args.full_rebuild else ""))
+    print(f"{'controller':>12}  {'mean us/tick':>12}  {'p99 us':>8}  {'max us':>8}  {'step us':>8}")
+    for name, difficulty in LEVELS:
+        mean, p99, worst, step = bench_level(difficulty, args.snakes, args.ticks, args.seed, args.full_rebuild)
+        print(f"{name:>12}  {mean / 1000:>12.1f}  {p99 / 1000:>8.1f}  {worst / 1000:>8.1f}  {step / 1000:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
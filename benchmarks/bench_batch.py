@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量模拟吞吐量：BatchSnakeEnv vs 逐个推进 SnakeSimulation
+
+随机动作（70%保持方向），死亡的对局自动重开，统计所有对局合计的每秒步数。
+
+用法: python benchmarks/bench_batch.py [--steps N] [--mode classic|freestyle|...]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from batch_env import BatchSnakeEnv, DIRECTIONS
+from simulation import GameMode, SnakeSimulation, grid_size_for_mode
+
+BATCH_SIZES = (256, 1024, 4096, 16384)
+
+
+def random_actions(rng, num_envs, count):
+    actions = rng.integers(0, len(DIRECTIONS), size=(count, num_envs), dtype=np.int8)
+    actions[rng.random((count, num_envs)) < 0.7] = -1
+    return actions
+
+
+def bench_batch(num_envs, mode, steps, seed):
+    env = BatchSnakeEnv(num_envs, mode, seed=seed, auto_reset=True)
+    rng = np.random.default_rng(seed)
+    # 动作预先生成，计时只包含 step()
+    actions = random_actions(rng, num_envs, min(steps, 256))
+    step = env.step
+    start = time.perf_counter_ns()
+    for i in range(steps):
+        step(actions[i % len(actions)])
+    elapsed = time.perf_counter_ns() - start
+    return num_envs * steps / (elapsed / 1e9)
+
+
+def bench_scalar(num_games, mode, steps, seed):
+    rng = random.Random(seed)
+    sims = [SnakeSimulation(*grid_size_for_mode(mode), mode, rng=rng) for _ in range(num_games)]
+    actions = [[rng.choice(DIRECTIONS) if rng.random() >= 0.7 else None for _ in range(num_games)]
+               for _ in range(256)]
+    start = time.perf_counter_ns()
+    for i in range(steps):
+        row = actions[i % len(actions)]
+        for sim, action in zip(sims, row):
+            if action is not None:
+                sim.set_direction(action)
+            if not sim.step().alive:
+                sim.reset()
+    elapsed = time.perf_counter_ns() - start
+    return num_games * steps / (elapsed / 1e9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--mode", default="classic", choices=[m.value for m in GameMode])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    mode = GameMode(args.mode)
+    width, height = grid_size_for_mode(mode)
+
+    print(f"mode {mode.value}, board {width}x{height}, {args.steps} steps")
+    print(f"{'impl':>10}  {'games':>6}  {'steps/s':>12}")
+    rate = bench_scalar(256, mode, max(1, args.steps // 5), args.seed)
+    print(f"{'scalar':>10}  {256:>6}  {rate:>12,.0f}")
+    for num_envs in BATCH_SIZES:
+        rate = bench_batch(num_envs, mode, args.steps, args.seed)
+        print(f"{'batch':>10}  {num_envs:>6}  {rate:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
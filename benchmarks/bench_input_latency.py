@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按键缓冲：各难度下丢失的按键比例和按键到转向的延迟
+
+不经过Qt：SnakeSimulation 按难度对应的逻辑帧间隔在毫秒虚拟时钟上推进。
+模拟的玩家每隔一段随机时间转一次弯，其中一部分是两次快速连按（例如向右走时先上后左的掉头），
+第二次按键落在同一个逻辑帧内。比较两种处理方式：
+    overwrite  按键立即写入下一步方向（以前的 setDirection），同一帧内后按的覆盖先按的
+    queue      按键进入 InputQueue，每个逻辑帧按顺序生效一个转向
+丢失的按键是从未体现在蛇的移动上的按键；延迟是按键到蛇头按该方向移动的时间。
+
+用法: python benchmarks/bench_input_latency.py [--seconds S] [--double F] [--gap-ms A B]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from game_loop import InputQueue, LatencyHistogram
+from simulation import Direction, GameMode, SnakeSimulation, tick_interval_ms
+
+PERPENDICULAR = {
+    Direction.UP: (Direction.LEFT, Direction.RIGHT),
+    Direction.DOWN: (Direction.LEFT, Direction.RIGHT),
+    Direction.LEFT: (Direction.UP, Direction.DOWN),
+    Direction.RIGHT: (Direction.UP, Direction.DOWN),
+}
+
+
+def make_snake():
+    """大棋盘上可以穿越边界的短蛇，不生成食物，长度保持不变"""
+    sim = SnakeSimulation(64, 64, GameMode.FREESTYLE)
+    sim.load_body([(32, 32), (31, 32), (30, 32)], Direction.RIGHT)
+    sim.food = None
+    return sim
+
+
+def run(difficulty, buffered, args):
+    tick_ms = tick_interval_ms(difficulty)
+    rng = random.Random(args.seed + difficulty)
+    now = 0
+    sim = make_snake()
+    queue = InputQueue(clock=lambda: now)
+    histogram = LatencyHistogram()
+    presses = lost = 0
+    pending = None         # overwrite: 下一帧将要生效的按键 (方向, 时刻)
+    scheduled = []         # 尚未发生的按键 (时刻, 是否为连按的第二次)
+    last_pressed = None
+    next_maneuver = rng.randrange(tick_ms)
+    next_tick = tick_ms
+    end = args.seconds * 1000
+
+    while now < end:
+        if not scheduled:
+            scheduled.append((next_maneuver, False))
+            if rng.random() < args.double:
+                scheduled.append((next_maneuver + rng.randint(*args.gap_ms), True))
+            next_maneuver = scheduled[-1][0] + rng.randint(3 * tick_ms, 8 * tick_ms)
+
+        if scheduled[0][0] < next_tick:
+            now, second = scheduled.pop(0)
+            # 第一次按键与屏幕上的方向垂直，连按的第二次与第一次垂直
+            direction = rng.choice(PERPENDICULAR[last_pressed if second else sim.direction])
+            last_pressed = direction
+            presses += 1
+            if buffered:
+                lost += not queue.push(direction, sim.next_direction, len(sim.body))
+            elif sim.set_direction(direction):
+                # 覆盖同一帧内先按的键
+                lost += pending is not None
+                pending = (direction, now)
+            else:
+                lost += 1
+            continue
+
+        now = next_tick
+        next_tick += tick_ms
+        if buffered:
+            queued = len(queue)
+            turn = queue.pop(sim.set_direction)
+            lost += queued - len(queue) - (turn is not None)
+        else:
+            turn, pending = pending, None
+        sim.advance()
+        if turn is not None:
+            histogram.add(now - turn[1])
+    lost += len(queue) + (pending is not None)
+    return presses, lost, histogram
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=600, help="每个难度的虚拟时间（秒）")
+    parser.add_argument("--double", type=float, default=0.4, help="两次快速连按的转弯比例")
+    parser.add_argument("--gap-ms", type=int, nargs=2, default=[20, 90], help="连按间隔的范围（毫秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'difficulty':>10}  {'tick ms':>7}  {'mode':>9}  {'presses':>7}  {'lost':>6}  "
+          f"{'mean ms':>7}  {'p50 ms':>6}  {'p95 ms':>6}  {'max ms':>6}")
+    for difficulty in range(1, 11):
+        for buffered in (False, True):
+            presses, lost, histogram = run(difficulty, buffered, args)
+            stats = histogram.stats()
+            print(f"{difficulty:>10}  {tick_interval_ms(difficulty):>7}  "
+                  f"{'queue' if buffered else 'overwrite':>9}  {presses:>7}  {lost / max(1, presses) * 100:>5.1f}%  "
+                  f"{stats['mean_ms']:>7.1f}  {stats['p50_ms']:>6.0f}  {stats['p95_ms']:>6.0f}  {stats['max_ms']:>6.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
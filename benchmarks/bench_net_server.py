@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+联网对战服务器负载：同一进程内多个房间，客户端全部通过本地回环连接
+
+每个房间 --seats 个键盘玩家座位（外加 --bots 个AI），客户端按自己重建的状态
+随机转向。结束时检查每个客户端重建的状态与服务端模拟完全一致，并统计：
+    每个房间每帧的推进+编码耗时、服务端在推进上花费的CPU比例、
+    每个客户端每帧收到的字节数，以及同样内容用JSON完整状态发送时的大小。
+
+用法: python benchmarks/bench_net_server.py [--rooms N] [--seats N] [--seconds S] [--tick-ms N]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from net_protocol import Delta, GameClient, Snapshot
+from net_server import GameServer
+from simulation import Direction, GameMode, is_reverse
+
+
+def full_state_json(sim) -> bytes:
+    """对比用：每帧发送完整状态的JSON"""
+    return json.dumps({
+        "tick": sim.tick,
+        "snakes": [{"id": s.player, "alive": s.alive, "score": s.score,
+                    "body": [{"x": x, "y": y} for x, y in s.body]} for s in sim.snakes],
+        "foods": [{"x": x, "y": y} for x, y in sim.foods],
+    }).encode("utf-8")
+
+
+async def run_client(host, port, room, seats, bots, seed, clients):
+    client = await GameClient.connect(host, port)
+    await client.join(room, GameMode.MODERN, seats, bots)
+    clients.append((room, client))
+    rng = random.Random(seed)
+    direction = Direction.RIGHT
+    while True:
+        message = await client.receive()
+        if message is None:
+            return
+        if isinstance(message, Snapshot):
+            direction = Direction.RIGHT
+        elif isinstance(message, Delta) and rng.random() < 0.2:
+            choice = rng.choice(tuple(Direction))
+            if not is_reverse(direction, choice):
+                direction = choice
+                client.send_input(choice)
+
+
+async def bench(args):
+    server = await GameServer(args.tick_ms, seed=args.seed).start()
+    host, port = server.address
+    clients = []
+    tasks = [asyncio.create_task(run_client(host, port, f"room-{room}", args.seats + args.bots, args.bots,
+                                            args.seed + room * 10 + seat, clients))
+             for room in range(args.rooms) for seat in range(args.seats)]
+    while len(server.rooms) < args.rooms or not all(room.started for room in server.rooms.values()):
+        await asyncio.sleep(0.05)
+    rooms = dict(server.rooms)
+    start_wall = time.perf_counter()
+    start_ns = sum(room.stats.tick_ns for room in rooms.values())
+    await asyncio.sleep(args.seconds)
+    wall = time.perf_counter() - start_wall
+    busy = sum(room.stats.tick_ns for room in rooms.values()) - start_ns
+    stats = server.stats()
+
+    # 停止推进后排空在途的消息，再比较客户端与服务端的状态
+    for room in rooms.values():
+        await room.stop()
+    await asyncio.sleep(0.5)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    mismatches = 0
+    for name, client in clients:
+        sim = rooms[name].sim
+        world = client.world
+        if world.tick != sim.tick or world.foods != set(sim.foods):
+            mismatches += 1
+        for snake in sim.snakes:
+            expected = list(snake.body) if snake.alive else []
+            if list(world.bodies.get(snake.player, ())) != expected or world.scores[snake.player] != snake.score:
+                mismatches += 1
+    json_sizes = [len(full_state_json(room.sim)) for room in rooms.values()]
+
+    ticks = [s["ticks"] for s in stats.values()]
+    print(f"{len(rooms)} rooms x {args.seats} clients (+{args.bots} AI), tick {args.tick_ms} ms, {wall:.1f} s")
+    print(f"  ticks per room          {statistics.fmean(ticks):.0f}")
+    print(f"  tick cost per room      {statistics.fmean(s['mean_tick_us'] for s in stats.values()):.1f} us "
+          f"(max {max(s['max_tick_us'] for s in stats.values()):.1f} us)")
+    print(f"  server tick CPU         {busy / 1e9 / wall * 100:.1f} %")
+    per_client = statistics.fmean(s["bytes_per_tick"] / args.seats for s in stats.values())
+    print(f"  delta bytes/client/tick {per_client:.1f}")
+    print(f"  JSON full state (end)   {statistics.fmean(json_sizes):.0f} bytes")
+    print(f"  client state mismatches {mismatches}")
+    for _, client in clients:
+        await client.close()
+    await server.close()
+    return 1 if mismatches else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--seats", type=int, default=2, help="每个房间的键盘玩家（客户端）数")
+    parser.add_argument("--bots", type=int, default=0, help="每个房间的AI数")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick-ms", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    return asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
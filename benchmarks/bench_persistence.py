@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计数据更新时GUI线程的耗时：同步整文件重写 vs 后台合并写盘
+
+sync 模拟原来的做法：每次 updateStatistic 都在调用线程用 indent=2 重写整个存档；
+write-behind 是 ConfigManager 当前的实现，调用线程只修改内存并登记写入。
+存档中预先放入 --entries 条统计/成就数据，模拟长期游玩后的存档大小。
+
+用法: python benchmarks/bench_persistence.py [--updates N] [--entries N] [--delay-ms MS]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from config_manager import ConfigManager
+
+
+def make_save_data(entries):
+    return {
+        "high_scores": {mode: 1000 for mode in ("classic", "maze", "freestyle", "time_attack", "survival")},
+        "achievements": {f"achievement_{i}": {"unlocked": i % 2 == 0, "progress": i} for i in range(entries)},
+        "statistics": {f"stat_{i}": i for i in range(entries)},
+    }
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[max(0, int(len(samples) * fraction) - 1)]
+
+
+def bench_sync(path, save_data, updates):
+    """原实现：每次更新在调用线程同步重写整个文件"""
+    samples = []
+    for i in range(updates):
+        start = time.perf_counter_ns()
+        save_data["statistics"]["games_played"] = i
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        samples.append(time.perf_counter_ns() - start)
+    return samples, updates
+
+
+def bench_write_behind(directory, save_data, updates, delay_ms):
+    manager = ConfigManager(str(directory / "config.toml"), save_file=directory / "game_save.json")
+    manager._writer.delay = delay_ms / 1000
+    manager.flush()
+    manager._save_data = save_data
+    writes_before = manager._writer.writes
+
+    samples = []
+    for i in range(updates):
+        start = time.perf_counter_ns()
+        manager.updateStatistic("games_played", i)
+        samples.append(time.perf_counter_ns() - start)
+
+    manager.flush()
+    written = json.loads((directory / "game_save.json").read_text(encoding="utf-8"))
+    assert written["statistics"]["games_played"] == updates - 1
+    return samples, manager._writer.writes - writes_before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--delay-ms", type=float, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        results = [
+            ("sync", bench_sync(directory / "sync.json", make_save_data(args.entries), args.updates)),
+            ("write-behind", bench_write_behind(directory, make_save_data(args.entries),
+                                                args.updates, args.delay_ms)),
+        ]
+
+    print(f"{args.updates} updates, {args.entries} entries, window {args.delay_ms:.0f} ms")
+    print(f"{'mode':>12}  {'mean us':>9}  {'p99 us':>9}  {'max us':>9}  {'writes':>7}")
+    for name, (samples, writes) in results:
+        print(f"{name:>12}  {sum(samples) / len(samples) / 1000:>9.1f}  "
+              f"{percentile(samples, 0.99) / 1000:>9.1f}  {max(samples) / 1000:>9.1f}  {writes:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
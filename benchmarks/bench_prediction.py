@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+客户端预测：不同网络延迟下的按键到显示延迟、预测修正率和和解耗时
+
+不经过真实网络：服务端规则、消息编解码和 ClientPrediction 都在同一进程内按毫秒的虚拟时钟推进，
+单向延迟固定为 RTT/2。一个键盘玩家随机转向，其余座位由AI控制（远程蛇只能按当前方向外推）。
+按键到显示延迟分别统计：
+    predicted   按键到本地下一逻辑帧显示新方向
+    unpredicted 不做预测时，按键到显示：输入到达服务端后的下一帧生效，再经过单向延迟送回
+结束时停止输入、排空消息，检查客户端重建的权威状态与服务端完全一致。
+
+用法: python benchmarks/bench_prediction.py [--seconds S] [--tick-ms N] [--rtt MS ...]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from multi_simulation import MultiSnakeSimulation
+from net_prediction import ClientPrediction
+from net_server import MAX_INPUT_LEAD
+from net_protocol import (FRAME_HEADER, Welcome, decode_server_message, encode_delta, encode_delta_body,
+                          encode_snapshot)
+from simulation import Direction, GameMode, grid_size_for_mode
+from snake_ai import SquadPilot
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+def run(rtt_ms, tick_ms, seconds, bots, seed):
+    width, height = grid_size_for_mode(GameMode.MODERN)
+    seats = 1 + bots
+    sim = MultiSnakeSimulation(width, height, GameMode.MODERN, players=seats, rng=random.Random(seed))
+    squad = SquadPilot(sim, {player: 5 for player in range(1, seats)})
+    rng = random.Random(seed + 1)
+    one_way = rtt_ms // 2
+
+    now = 0
+    prediction = ClientPrediction(Welcome(0, seats, GameMode.MODERN, width, height, tick_ms),
+                                  clock=lambda: now * 1_000_000)
+    to_server = deque()   # (到达时刻, 序号, 方向)
+    to_client = deque()   # (到达时刻, 正文)
+    queued = deque()      # 服务端收到但未处理的输入 (序号, 帧号, 方向, 到达时的帧号)
+    ack = slack = 0
+    client_phase = rng.randrange(tick_ms)
+    predicted_latency, unpredicted_latency, reconcile_ns = [], [], []
+    waiting = []          # 已按键但本地还未显示的序号
+
+    def send_snapshot():
+        to_client.append((now + one_way, encode_snapshot(sim)[FRAME_HEADER.size:]))
+
+    send_snapshot()
+    end = seconds * 1000
+    while now < end + 10 * tick_ms + rtt_ms:
+        inputs_on = now < end
+        while to_server and to_server[0][0] <= now:
+            queued.append(to_server.popleft()[1:] + (sim.tick,))
+
+        if now % tick_ms == 0:
+            # 服务端：与 net_server.Room.tick 相同，每帧最多处理一个到期的输入
+            if queued and not sim.tick + 1 < queued[0][1] <= sim.tick + 1 + MAX_INPUT_LEAD:
+                ack, _, direction, arrived = queued.popleft()
+                sim.snakes[0].set_direction(direction)
+                slack = max(0, sim.tick - arrived)
+            squad.steer()
+            result = sim.step()
+            squad.observe(result)
+            payload = encode_delta(sim.tick, ack, encode_delta_body(result, width), slack)
+            to_client.append((now + one_way, payload[FRAME_HEADER.size:]))
+            if not sim.snakes[0].alive and inputs_on:
+                sim.reset()
+                squad.reset()
+                queued.clear()
+                send_snapshot()
+
+        while to_client and to_client[0][0] <= now:
+            message = decode_server_message(to_client.popleft()[1], width)
+            start = time.perf_counter_ns()
+            prediction.receive(message)
+            reconcile_ns.append(time.perf_counter_ns() - start)
+
+        if inputs_on and rng.random() < 0.2 / tick_ms:
+            pending = prediction.input(rng.choice(tuple(Direction)))
+            if pending is not None:
+                arrival = now + one_way
+                unpredicted_latency.append((arrival // tick_ms + 1) * tick_ms + one_way - now)
+                waiting.append((pending.seq, now))
+                to_server.append((now + one_way, pending.seq, pending.tick, pending.direction))
+
+        if (now - client_phase) % tick_ms == 0:
+            prediction.advance()
+            local_tick = prediction.tick
+            still_waiting = []
+            for seq, at in waiting:
+                pending = next((p for p in prediction.pending if p.seq == seq), None)
+                if pending is None or pending.tick <= local_tick:
+                    predicted_latency.append(now - at)
+                else:
+                    still_waiting.append((seq, at))
+            waiting = still_waiting
+        now += 1
+
+    while to_client:
+        prediction.receive(decode_server_message(to_client.popleft()[1], width))
+    world = prediction.world
+    mismatches = int(world.tick != sim.tick or world.foods != set(sim.foods))
+    for snake in sim.snakes:
+        expected = list(snake.body) if snake.alive else []
+        if list(world.bodies[snake.player]) != expected or world.scores[snake.player] != snake.score:
+            mismatches += 1
+    return dict(predicted=predicted_latency, unpredicted=unpredicted_latency, reconcile=reconcile_ns,
+                stats=prediction.stats(), mismatches=mismatches)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=int, default=60, help="虚拟时间（秒）")
+    parser.add_argument("--tick-ms", type=int, default=100)
+    parser.add_argument("--bots", type=int, default=1)
+    parser.add_argument("--rtt", type=int, nargs="+", default=[0, 50, 100, 200])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"tick {args.tick_ms} ms, 1 client + {args.bots} AI, {args.seconds} s virtual time per RTT")
+    print(f"{'rtt ms':>6}  {'predicted p50/p95 ms':>20}  {'unpredicted p50/p95':>19}  {'lead':>5}  "
+          f"{'corrected':>9}  {'reconcile us':>12}  {'replayed/msg':>12}  {'mismatch':>8}")
+    failed = 0
+    for rtt in args.rtt:
+        r = run(rtt, args.tick_ms, args.seconds, args.bots, args.seed)
+        stats = r["stats"]
+        reconciles = max(1, stats["reconciles"])
+        print(f"{rtt:>6}  {percentile(r['predicted'], 0.5):>9.0f} / {percentile(r['predicted'], 0.95):<8.0f}  "
+              f"{percentile(r['unpredicted'], 0.5):>9.0f} / {percentile(r['unpredicted'], 0.95):<7.0f}  "
+              f"{stats['lead_ticks']:>5}  {stats['corrections'] / reconciles * 100:>8.1f}%  "
+              f"{statistics.fmean(r['reconcile']) / 1000:>12.1f}  {stats['replayed_ticks'] / reconciles:>12.2f}  "
+              f"{r['mismatches']:>8}")
+        failed += r["mismatches"]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+渲染帧耗时对比：Canvas整帧重绘 vs 场景图增量更新
+
+在离屏窗口中分别加载 GameRenderer.qml（canvas）和 SceneRenderer.qml（scene），
+让一条长蛇沿哈密顿环路前进，每推进一步等待一帧交换，统计帧耗时。
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/bench_render.py [--grid 100] [--length 2000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src" / "python"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QTimer, QUrl
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtQml import QQmlComponent, QQmlEngine
+from PySide6.QtQuick import QQuickWindow
+
+from snake_ai import hamiltonian_cycle
+
+RENDERERS = {
+    "canvas": "GameRenderer",
+    "scene": "SceneRenderer",
+}
+
+
+def wait_for_frame(window, timeout_ms=1000):
+    loop = QEventLoop()
+    window.frameSwapped.connect(loop.quit)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    window.update()
+    loop.exec()
+    window.frameSwapped.disconnect(loop.quit)
+
+
+def make_engine(grid, length):
+    """构造一个处于PLAYING状态、蛇长为length的引擎"""
+    from game_engine import GameEngine
+    from simulation import Direction, GameMode
+
+    engine = GameEngine()
+    engine.startGame()
+    engine.startGame()
+    engine.game_timer.stop()
+
+    sim = engine.simulation
+    sim.configure(GameMode.FREESTYLE, grid, grid)
+    cycle = hamiltonian_cycle(grid, grid)
+    sim.load_body(reversed(cycle[:length]), Direction.RIGHT)
+    sim.food = None
+    engine.gridSizeChanged.emit()
+    engine._sync_food_model()
+    engine._resync_snake()
+    return engine, cycle
+
+
+def steer(sim, cycle, position):
+    """让蛇头朝环路上的下一个格子移动"""
+    from simulation import Direction
+
+    hx, hy = cycle[position % len(cycle)]
+    nx, ny = cycle[(position + 1) % len(cycle)]
+    sim.next_direction = Direction((nx - hx, ny - hy))
+
+
+def run(renderer, grid, length, frames):
+    engine, cycle = make_engine(grid, length)
+    qml_engine = QQmlEngine()
+    component = QQmlComponent(qml_engine)
+    source = f"import QtQuick 2.15\n{RENDERERS[renderer]} {{ width: 800; height: 800 }}\n"
+    component.setData(source.encode(), QUrl.fromLocalFile(str(ROOT / "src" / "qml" / "bench.qml")))
+    item = component.create()
+    if item is None:
+        raise RuntimeError(component.errorString())
+
+    window = QQuickWindow()
+    window.resize(800, 800)
+    item.setParentItem(window.contentItem())
+    item.setProperty("gameEngine", engine)
+    window.show()
+    for _ in range(5):
+        wait_for_frame(window)
+
+    samples = []
+    position = length - 1
+    for _ in range(frames):
+        steer(engine.simulation, cycle, position)
+        position += 1
+        start = time.perf_counter()
+        engine.update_game()
+        wait_for_frame(window)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    window.close()
+    item.deleteLater()
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", type=int, default=100, help="正方形棋盘边长（偶数）")
+    parser.add_argument("--length", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--renderer", choices=sorted(RENDERERS), action="append")
+    args = parser.parse_args(argv)
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    print(f"board {args.grid}x{args.grid}, snake length {args.length}, {args.frames} frames")
+    print(f"{'renderer':>8}  {'mean ms':>8}  {'p50 ms':>8}  {'p95 ms':>8}")
+    for renderer in args.renderer or sorted(RENDERERS):
+        samples = sorted(run(renderer, args.grid, args.length, args.frames))
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{renderer:>8}  {statistics.mean(samples):>8.2f}  "
+              f"{statistics.median(samples):>8.2f}  {p95:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+强化学习环境单步耗时与棋盘大小的关系
+
+观测按格子增量更新，SnakeEnv 和 VectorSnakeEnv 的单步耗时不应随棋盘增大而增长
+（VectorSnakeEnv 中重开对局需要整局重写，随机策略下这部分会随死亡率摊入）。
+
+用法: python benchmarks/bench_rl_env.py [--steps N] [--num-envs N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from rl_env import ACTIONS, SnakeEnv, VectorSnakeEnv
+from simulation import GameMode
+
+BOARD_SIZES = ((10, 10), (30, 20), (100, 100), (300, 300))
+
+
+def bench_single(width, height, steps, seed):
+    env = SnakeEnv(GameMode.FREESTYLE, width, height, seed=seed)
+    env.reset()
+    actions = np.random.default_rng(seed).integers(len(ACTIONS), size=steps).tolist()
+    step, reset = env.step, env.reset
+    start = time.perf_counter_ns()
+    for action in actions:
+        _, _, terminated, truncated, _ = step(action)
+        if terminated or truncated:
+            reset()
+    return (time.perf_counter_ns() - start) / steps
+
+
+def bench_vector(width, height, num_envs, steps, seed):
+    env = VectorSnakeEnv(num_envs, GameMode.FREESTYLE, width, height, seed=seed)
+    env.reset()
+    actions = np.random.default_rng(seed).integers(-1, len(ACTIONS), size=(64, num_envs))
+    start = time.perf_counter_ns()
+    for i in range(steps):
+        env.step(actions[i % len(actions)])
+    return (time.perf_counter_ns() - start) / steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--num-envs", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    vector_steps = max(1, args.steps // 20)
+    print(f"{'board':>9}  {'single ns/step':>14}  {'vector us/step':>14}  {'vector ns/game':>14}")
+    for width, height in BOARD_SIZES:
+        single = bench_single(width, height, args.steps, args.seed)
+        vector = bench_vector(width, height, args.num_envs, vector_steps, args.seed)
+        print(f"{width:>4}x{height:<4}  {single:>14.0f}  {vector / 1000:>14.1f}  "
+              f"{vector / args.num_envs:>14.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnakeSimulation 单步耗时基准
+
+在FREESTYLE棋盘上放置长度为 1 ~ 10,000 的蛇，让它沿一行循环前进，
+测量每一步的平均耗时。占用位图让耗时与蛇长无关，结果应当基本持平。
+
+用法: python benchmarks/bench_simulation.py [--ticks N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from simulation import Direction, GameMode, SnakeSimulation
+
+LENGTHS = (1, 10, 100, 1_000, 10_000)
+
+
+def make_simulation(length):
+    """构造一条躺在第0行、向右移动的蛇；宽度留出空格以便穿越边界后不撞到自己"""
+    width = length + 2
+    sim = SnakeSimulation(width, 3, GameMode.FREESTYLE)
+    sim.load_body([(x, 0) for x in range(length - 1, -1, -1)], Direction.RIGHT)
+    sim.food = None  # 第0行不会生成食物，保持长度不变
+    return sim
+
+
+def time_ticks(length, ticks):
+    sim = make_simulation(length)
+    step = sim.step
+    start = time.perf_counter_ns()
+    for _ in range(ticks):
+        step()
+    elapsed = time.perf_counter_ns() - start
+    assert sim.alive and len(sim.body) == length
+    return elapsed / ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'length':>8}  {'ns/tick':>10}  {'ticks/s':>12}")
+    for length in LENGTHS:
+        per_tick = time_ticks(length, args.ticks)
+        print(f"{length:>8}  {per_tick:>10.0f}  {1e9 / per_tick:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SnakeSimulation 快照/恢复与 clone()、序列化的耗时对比
+
+与 bench_simulation.py 相同，在FREESTYLE棋盘上放置长度为 10 ~ 10,000 的蛇沿一行循环前进。
+对每个长度测量：
+    clone()                      完整复制
+    snapshot() + k帧 + restore()  撤销日志，耗时应只与 k 有关，与蛇长和棋盘大小无关
+    to_bytes() / from_bytes()     完整序列化（含空闲索引排列和随机数状态）及其大小
+
+用法: python benchmarks/bench_snapshot.py [--repeat N] [--depth K ...]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from bench_simulation import make_simulation
+from simulation import SnakeSimulation
+
+LENGTHS = (10, 100, 1_000, 10_000)
+
+
+def per_call_us(function, repeat):
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter_ns() - start) / repeat / 1000
+
+
+def rollback(sim, depth):
+    """拍快照、推进 depth 帧、恢复：AI前瞻和回退重放的基本操作"""
+    def run():
+        snapshot = sim.snapshot()
+        advance = sim.advance
+        for _ in range(depth):
+            advance()
+        sim.restore(snapshot)
+    return run
+
+
+def cloned(sim, depth):
+    """同样的操作用 clone() 实现"""
+    def run():
+        copy = sim.clone()
+        for _ in range(depth):
+            copy.advance()
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args(argv)
+
+    depth_columns = "".join(f"  {f'snap+{d}+restore':>16}  {f'clone+{d}':>10}" for d in args.depth)
+    print(f"{'length':>8}  {'clone us':>9}{depth_columns}  {'to_bytes us':>11}  {'from_bytes us':>13}  "
+          f"{'bytes':>7}")
+    for length in LENGTHS:
+        sim = make_simulation(length)
+        repeat = max(20, args.repeat * 10 // length) if length > 100 else args.repeat
+        row = f"{length:>8}  {per_call_us(sim.clone, repeat):>9.1f}"
+        for depth in args.depth:
+            row += f"  {per_call_us(rollback(sim, depth), args.repeat):>16.1f}"
+            row += f"  {per_call_us(cloned(sim, depth), repeat):>10.1f}"
+            assert sim.tick == 0 and len(sim.body) == length
+        data = sim.to_bytes()
+        row += f"  {per_call_us(sim.to_bytes, repeat):>11.1f}"
+        row += f"  {per_call_us(lambda: SnakeSimulation.from_bytes(data), repeat):>13.1f}  {len(data):>7}"
+        print(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+食物生成耗时与棋盘占用率的关系
+
+用蛇身按蛇形路线填满棋盘的指定比例，然后反复调用 spawn_food()。
+空闲格子索引让每次生成都是O(1)，占用率到95%以上也不会变慢。
+
+用法: python benchmarks/bench_spawn.py [--width W] [--height H] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from simulation import GameMode, SnakeSimulation
+
+from boards import serpentine
+
+OCCUPANCIES = (0.0, 0.5, 0.9, 0.95, 0.99, 0.999)
+
+
+def time_spawn(width, height, occupancy, repeat):
+    sim = SnakeSimulation(width, height, GameMode.CLASSIC)
+    length = min(width * height - 1, max(1, int(width * height * occupancy)))
+    sim.load_body(reversed(serpentine(width, height, length)))
+    spawn = sim.spawn_food
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        spawn()
+    elapsed = time.perf_counter_ns() - start
+    assert sim.food is not None and not sim.is_occupied(sim.food)
+    return length / (width * height), elapsed / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    print(f"board {args.width}x{args.height}")
+    print(f"{'occupancy':>10}  {'ns/spawn':>10}")
+    for occupancy in OCCUPANCIES:
+        actual, per_spawn = time_spawn(args.width, args.height, occupancy, args.repeat)
+        print(f"{actual:>10.1%}  {per_spawn:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
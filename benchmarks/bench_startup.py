@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动：各启动阶段的耗时和首帧时间
+
+在子进程中离屏启动 main.py（QT_QPA_PLATFORM=offscreen），SNAKE_STARTUP_REPORT=1 输出启动各阶段的耗时，
+SNAKE_STARTUP_EXIT=1 在首帧之后的工作完成后退出（见 src/python/startup.py）。
+每个阶段取 --runs 次的中位数，首帧时间与 FIRST_FRAME_TARGET_MS 比较；process 是子进程从启动到退出的总时间，
+包含解释器启动和退出。每个数据文件（config.toml、存档）在启动期间应只读取一次，读取多次时返回1。
+--importtime N 另外用 python -X importtime 列出导入 main 时累计耗时最多的 N 个模块。
+
+用法: python benchmarks/bench_startup.py [--runs N] [--importtime N]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src" / "python"
+sys.path.insert(0, str(SRC))
+
+from startup import FIRST_FRAME_TARGET_MS
+
+REPORT_LINE = re.compile(r"^startup:\s+([\d.]+) \|\s+([\d.]+) \| (.+)$")
+READS_LINE = re.compile(r"^startup:\s+(\d+) \| (/.+|[A-Za-z]:.+)$")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (.+)$")
+
+
+def launch():
+    """启动一次，返回 ([(阶段, 自身毫秒, 累计毫秒)], {数据文件: 读取次数}, 进程总毫秒)"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", SNAKE_STARTUP_REPORT="1", SNAKE_STARTUP_EXIT="1",
+               SNAKE_LOG_LEVEL="WARNING")
+    start = time.perf_counter()
+    # 与平时一样在项目根目录启动（config.toml 按当前目录查找）
+    result = subprocess.run([sys.executable, str(SRC / "main.py")], env=env, cwd=ROOT,
+                            capture_output=True, text=True, timeout=60)
+    elapsed = (time.perf_counter() - start) * 1000
+    rows = [(match[3], float(match[1]), float(match[2]))
+            for match in map(REPORT_LINE.match, result.stderr.splitlines()) if match]
+    if not rows:
+        raise RuntimeError(f"no startup report (exit code {result.returncode}):\n{result.stderr[-2000:]}")
+    reads = {match[2]: int(match[1]) for match in map(READS_LINE.match, result.stderr.splitlines()) if match}
+    return rows, reads, elapsed
+
+
+def import_times(count):
+    """python -X importtime -c "import main" 中累计耗时最多的模块 [(模块, 自身毫秒, 累计毫秒)]"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SRC,
+                            env=dict(os.environ, QT_QPA_PLATFORM="offscreen"), capture_output=True, text=True)
+    rows = [(match[3], int(match[1]) / 1000, int(match[2]) / 1000)
+            for match in map(IMPORT_LINE.match, result.stderr.splitlines()) if match]
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="列出导入耗时最多的 N 个模块")
+    args = parser.parse_args(argv)
+
+    launch()  # 预热磁盘缓存和QML缓存
+    phases = {}
+    processes = []
+    reads = {}
+    for _ in range(args.runs):
+        rows, run_reads, elapsed = launch()
+        processes.append(elapsed)
+        for path, count in run_reads.items():
+            reads[path] = max(reads.get(path, 0), count)
+        for name, own, cumulative in rows:
+            phases.setdefault(name, []).append((own, cumulative))
+
+    print(f"{'phase':<16}  {'self ms':>8}  {'cumulative ms':>13}")
+    for name, samples in phases.items():
+        print(f"{name:<16}  {statistics.median(own for own, _ in samples):>8.1f}  "
+              f"{statistics.median(cumulative for _, cumulative in samples):>13.1f}")
+    print(f"{'process':<16}  {'':>8}  {statistics.median(processes):>13.1f}")
+
+    first_frame = [cumulative for _, cumulative in phases.get("first frame", [])]
+    status = 0
+    if first_frame:
+        median = statistics.median(first_frame)
+        verdict = "ok" if median <= FIRST_FRAME_TARGET_MS else "OVER TARGET"
+        status = 0 if median <= FIRST_FRAME_TARGET_MS else 1
+        print(f"first frame: median {median:.1f} ms, max {max(first_frame):.1f} ms, "
+              f"target {FIRST_FRAME_TARGET_MS} ms: {verdict}")
+    for path, count in reads.items():
+        print(f"reads: {count} x {path}{'' if count <= 1 else '  READ MORE THAN ONCE'}")
+        status |= count > 1
+
+    if args.importtime:
+        print()
+        print(f"{'module':<40}  {'self ms':>8}  {'cumulative ms':>13}")
+        for name, own, cumulative in import_times(args.importtime):
+            print(f"{name.rstrip():<40}  {own:>8.1f}  {cumulative:>13.1f}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
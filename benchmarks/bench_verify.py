@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回放校验吞吐量
+
+用一个简单的贪心机器人生成若干局回放，然后分别测量
+当前进程逐个校验、进程池批量校验、以及通过本地HTTP服务（回环地址）校验的速度。
+
+用法: python benchmarks/bench_verify.py [--games N] [--processes P] [--mode classic]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+
+from replay import ReplayRecorder
+from replay_verifier import make_server, pack_batch, verify_many, verify_replay
+from simulation import Direction, GameMode, SnakeSimulation, grid_size_for_mode
+
+
+def greedy_direction(sim):
+    """不立即撞死的方向中离食物最近的一个"""
+    head_x, head_y = sim.head
+    food_x, food_y = sim.food
+    best, best_distance = sim.direction, None
+    for direction in Direction:
+        if not sim.is_valid_direction(direction):
+            continue
+        x, y = head_x + direction.value[0], head_y + direction.value[1]
+        if sim.wraps:
+            x %= sim.grid_width
+            y %= sim.grid_height
+        elif not (0 <= x < sim.grid_width and 0 <= y < sim.grid_height):
+            continue
+        if sim.is_occupied((x, y)):
+            continue
+        distance = abs(x - food_x) + abs(y - food_y)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = direction, distance
+    return best
+
+
+def record_game(seed, mode, difficulty):
+    width, height = grid_size_for_mode(mode)
+    sim = SnakeSimulation(width, height, mode, rng=random.Random(seed))
+    recorder = ReplayRecorder(seed, mode, difficulty, width, height)
+    while True:
+        sim.set_direction(greedy_direction(sim))
+        result = sim.step()
+        recorder.record(sim.direction)
+        if not result.alive:
+            return recorder.finish(sim.score, result.death_reason).to_bytes()
+
+
+def rate(count, started):
+    return count / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--mode", default="classic", choices=[m.value for m in GameMode])
+    args = parser.parse_args(argv)
+    mode = GameMode(args.mode)
+
+    replays = [record_game(seed, mode, 5) for seed in range(args.games)]
+    ticks = sum(verify_replay(data).ticks for data in replays[:200]) / min(200, len(replays))
+    size = sum(len(data) for data in replays) / len(replays)
+    print(f"{args.games} replays, mode {mode.value}, avg {ticks:.0f} ticks, avg {size:.0f} bytes")
+
+    started = time.perf_counter()
+    results = verify_many(replays)
+    print(f"{'inline':>14}: {rate(len(replays), started):>8,.0f} replays/s")
+    assert all(result.ok for result in results)
+
+    started = time.perf_counter()
+    verify_many(replays, processes=args.processes, chunksize=64)
+    print(f"{'pool x' + str(args.processes):>14}: {rate(len(replays), started):>8,.0f} replays/s")
+
+    server = make_server(processes=args.processes)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = "http://%s:%s" % server.server_address[:2]
+    try:
+        started = time.perf_counter()
+        for data in replays[:500]:
+            urllib.request.urlopen(urllib.request.Request(url + "/verify", data=data)).read()
+        print(f"{'http single':>14}: {rate(min(500, len(replays)), started):>8,.0f} replays/s")
+
+        started = time.perf_counter()
+        for offset in range(0, len(replays), 500):
+            request = urllib.request.Request(url + "/verify/batch", data=pack_batch(replays[offset:offset + 500]))
+            urllib.request.urlopen(request).read()
+        print(f"{'http batch':>14}: {rate(len(replays), started):>8,.0f} replays/s")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准脚本共用的棋盘布局
+"""
+
+from typing import List, Tuple
+
+Cell = Tuple[int, int]
+
+
+def serpentine(width: int, height: int, count: int) -> List[Cell]:
+    """按行往返的蛇形路线取前count个格子（相邻格子首尾相接，是合法的蛇身）"""
+    cells = []
+    for y in range(height):
+        xs = range(width) if y % 2 == 0 else range(width - 1, -1, -1)
+        for x in xs:
+            if len(cells) == count:
+                return cells
+            cells.append((x, y))
+    return cells
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准套件：规则推进、食物生成、蛇身序列化、配置读写和离屏QML渲染，与保存的基线比较
+
+每个用例复用对应基准脚本的场景（bench_simulation / bench_spawn / bench_persistence / bench_render），
+按 pyperf 的方式测量：先校准循环次数使每个样本至少运行 --min-time 秒，取 --runs 个样本，
+比较样本中位数。结果都是每次操作的耗时（越小越好），报告同时给出每秒次数。
+    simulate/length=N         SnakeSimulation.step()，蛇长 1 / 100 / 1,000 / 10,000
+    spawn/occupancy=P         spawn_food()，棋盘 100x100，占用率 0 ~ 99%
+    snakePositions/length=N   通过Qt元对象系统读取 GameEngine.snakePositions（含QVariant转换）
+    config/...                ConfigManager.save_game_data（调用线程）、写盘（flush）、load_config
+    render/<renderer>         离屏窗口中推进一帧并等待帧交换（QT_QPA_PLATFORM=offscreen）
+
+纯CPU用例的每个样本之前交替测一次与被测代码无关的参考工作量，用来扣除机器整体的快慢漂移（--raw 关闭）。
+中位数变化和扣除漂移后的变化都超过 --threshold 的用例记为回归，存在回归时返回1。
+基线与运行环境有关，换机器后用 --save-baseline 重新生成。
+
+用法: python benchmarks/suite.py [--filter TEXT ...] [--save-baseline] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, NamedTuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "python"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# 默认的回归阈值：扣除漂移后变慢超过25%（共享的虚拟机上同一代码多次运行的差异可达20%）
+DEFAULT_THRESHOLD = 0.25
+
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[], ContextManager[Callable[[int], float]]]  # 产生 sample(loops) -> 每次操作的秒数
+    loops: int = 0                                                 # 0 表示自动校准
+    normalize: bool = True  # 纯CPU用例按参考工作量扣除漂移；写盘和渲染受I/O与帧节奏影响，不扣除
+
+
+def timed_loop(operation):
+    """把无参数的操作包装成 sample(loops)"""
+    def sample(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        return (time.perf_counter() - start) / loops
+    return sample
+
+
+def reference_workload():
+    """与被测代码无关的固定纯Python工作量，用于扣除机器整体快慢的漂移"""
+    total = 0
+    for i in range(200):
+        total += i * i
+    return total
+
+
+def qt_app():
+    from PySide6.QtGui import QGuiApplication
+    return QGuiApplication.instance() or QGuiApplication(sys.argv)
+
+
+def simulate_case(length):
+    @contextmanager
+    def setup():
+        from bench_simulation import make_simulation
+        yield timed_loop(make_simulation(length).step)
+    return Case(f"simulate/length={length}", setup)
+
+
+def spawn_case(occupancy):
+    @contextmanager
+    def setup():
+        from boards import serpentine
+        from simulation import GameMode, SnakeSimulation
+        sim = SnakeSimulation(100, 100, GameMode.CLASSIC)
+        sim.load_body(reversed(serpentine(100, 100, max(1, int(100 * 100 * occupancy)))))
+        yield timed_loop(sim.spawn_food)
+    return Case(f"spawn/occupancy={occupancy:g}", setup)
+
+
+def snake_positions_case(length):
+    @contextmanager
+    def setup():
+        from bench_simulation import make_simulation
+        from game_engine import GameEngine
+        qt_app()
+        engine = GameEngine()
+        engine._sim = make_simulation(length)
+        read = engine.property
+        assert len(read("snakePositions")) == length
+        yield timed_loop(lambda: read("snakePositions"))
+    return Case(f"snakePositions/length={length}", setup)
+
+
+def config_case(name, operation_for, normalize=False):
+    """在临时目录中放一个有500条统计/成就数据的存档（与 bench_persistence.py 相同）"""
+    @contextmanager
+    def setup():
+        from bench_persistence import make_save_data
+        from config_manager import ConfigManager
+        with tempfile.TemporaryDirectory(prefix="snake-bench-") as tmp:
+            directory = Path(tmp)
+            config = ConfigManager(str(directory / "config.toml"), save_file=directory / "game_save.json")
+            config.flush()
+            config._save_data = make_save_data(500)
+            yield timed_loop(operation_for(config))
+            config.flush()
+    return Case(f"config/{name}", setup, normalize=normalize)
+
+
+def save_call(config):
+    config._writer.delay = 3600  # 只测调用线程上的登记，写盘留到最后的flush
+    return config.save_game_data
+
+
+def save_flush(config):
+    def operation():
+        config.save_game_data()
+        config.flush()
+    return operation
+
+
+def render_case(renderer, frames=60):
+    @contextmanager
+    def setup():
+        import bench_render
+        qt_app()
+        yield lambda loops: statistics.median(bench_render.run(renderer, 40, 400, frames)) / 1000
+    return Case(f"render/{renderer}", setup, loops=1, normalize=False)
+
+
+def all_cases() -> List[Case]:
+    return ([simulate_case(length) for length in (1, 100, 1_000, 10_000)]
+            + [spawn_case(occupancy) for occupancy in (0.0, 0.5, 0.9, 0.99)]
+            + [snake_positions_case(length) for length in (100, 1_000, 10_000)]
+            + [config_case("save_game_data", save_call, normalize=True), config_case("save_game_data+flush", save_flush),
+               config_case("load_config", lambda config: config.load_config)]
+            + [render_case("canvas"), render_case("scene")])
+
+
+def calibrate(sample, min_time: float) -> int:
+    """加倍循环次数直到一个样本至少运行 min_time 秒"""
+    loops = 1
+    while sample(loops) * loops < min_time:
+        loops *= 2
+    return loops
+
+
+def measure(case: Case, runs: int, min_time: float) -> Dict[str, float]:
+    """校准循环次数后取 runs 个样本（秒/次）；需要扣除漂移的用例在每个样本之前交替测一次参考工作量"""
+    reference = timed_loop(reference_workload)
+    reference_loops = calibrate(reference, min_time / 2) if case.normalize else 0
+    with case.setup() as sample:
+        loops = case.loops
+        if not loops:
+            loops = calibrate(sample, min_time)
+        else:
+            sample(loops)  # 预热
+        samples, references = [], []
+        for _ in range(runs):
+            if reference_loops:
+                references.append(reference(reference_loops))
+            samples.append(sample(loops))
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "reference": statistics.median(references) if references else None,
+        "runs": runs,
+        "loops": loops,
+    }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+def compare(baseline: Dict, current: Dict, threshold: float, normalize: bool = True) -> int:
+    """打印对比报告，返回回归的用例数
+
+    change 是中位数的变化，adjusted 是扣除参考工作量变化后的变化（不扣除的用例与 change 相同）。
+    两者都超过阈值（以及样本离散程度）才判定为回归或变快：机器漂移只影响前者，参考工作量的噪声只影响后者。
+    """
+    base = baseline.get("results", {})
+    results = current["results"]
+    print(f"baseline: {baseline.get('environment', {}).get('date', '-')}, "
+          f"current: {current['environment']['date']}, threshold {threshold:.0%}")
+    print(f"{'case':<30}  {'baseline':>10}  {'current':>10}  {'ops/s':>12}  {'change':>8}  {'adjusted':>8}")
+    regressions = 0
+    for name, result in results.items():
+        median = result["median"]
+        row = f"{name:<30}  "
+        reference = base.get(name)
+        if reference is None:
+            row += f"{'-':>10}  {format_time(median):>10}  {1 / median:>12,.0f}  {'new':>8}"
+            print(row)
+            continue
+        change = adjusted = median / reference["median"] - 1
+        if normalize and result.get("reference") and reference.get("reference"):
+            adjusted = (1 + change) / (result["reference"] / reference["reference"]) - 1
+        limit = max(threshold, 2 * max(result["stdev"], reference.get("stdev", 0.0)) / reference["median"])
+        verdict = ""
+        if min(change, adjusted) > limit:
+            verdict = "REGRESSION"
+            regressions += 1
+        elif max(change, adjusted) < -limit:
+            verdict = "faster"
+        row += (f"{format_time(reference['median']):>10}  {format_time(median):>10}  {1 / median:>12,.0f}  "
+                f"{change:>+8.1%}  {adjusted:>+8.1%}  {verdict}")
+        print(row.rstrip())
+    missing = sorted(set(base) - set(results))
+    if missing:
+        print(f"not measured: {', '.join(missing)}")
+    print(f"{regressions} regression(s)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filter", nargs="+", help="只运行名称包含其中任一文本的用例")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="每个样本的最短时间（秒）")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--output", type=Path, help="同时把本次结果写入文件")
+    parser.add_argument("--compare", type=Path, help="不运行，直接比较已保存的结果文件与基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--raw", action="store_true", help="不按参考工作量扣除机器漂移，直接比较中位数")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        current = json.loads(args.compare.read_text(encoding="utf-8"))
+    else:
+        cases = [case for case in all_cases()
+                 if not args.filter or any(text in case.name for text in args.filter)]
+        current = {"environment": environment(), "results": {}}
+        for case in cases:
+            current["results"][case.name] = measure(case, args.runs, args.min_time)
+            print(f"  {case.name:<30} {format_time(current['results'][case.name]['median'])}", file=sys.stderr)
+
+    text = json.dumps(current, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    if args.save_baseline:
+        if args.filter and args.baseline.exists():
+            # 只更新运行过的用例
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+            saved["results"].update(current["results"])
+            saved["environment"] = current["environment"]
+            text = json.dumps(saved, indent=2)
+        args.baseline.write_text(text + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    return 1 if compare(baseline, current, args.threshold, normalize=not args.raw) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用容器
+
+AppContainer 持有应用中每个子系统的唯一实例，第一次访问时由注册的工厂创建，之后总是返回同一个实例。
+ConfigManager 读取 config.toml 和存档并在后台线程写回，两个实例会重复读取文件，并且可能交替写同一个存档；
+main.py 只通过容器获取子系统。
+
+    config_manager  ConfigManager（QML中为 configManager）
+    game_engine     GameEngine（QML中为 gameEngine），依赖 config_manager
+"""
+
+from typing import Any, Callable, Dict, List
+
+from config_manager import ConfigManager
+from game_engine import GameEngine
+from log_config import get_logger
+
+logger = get_logger("app")
+
+# 注册到QML根上下文的子系统：容器中的名称 -> context property 名称
+QML_CONTEXT_PROPERTIES = {
+    "config_manager": "configManager",
+    "game_engine": "gameEngine",
+}
+
+
+class AppContainer:
+    """子系统注册表，每个名称只创建一个实例"""
+
+    def __init__(self, config_file="config.toml", save_file=None):
+        self._factories: Dict[str, Callable[["AppContainer"], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._creating: List[str] = []
+        self.register("config_manager", lambda container: ConfigManager(config_file, save_file=save_file))
+        self.register("game_engine", lambda container: GameEngine(container.config_manager))
+
+    def register(self, name: str, factory: Callable[["AppContainer"], Any]):
+        """登记（或在创建之前替换）子系统的工厂，工厂接收容器以获取依赖"""
+        if name in self._instances:
+            raise RuntimeError(f"{name} has already been created")
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        """返回子系统的唯一实例，第一次调用时创建"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._factories:
+            raise KeyError(f"unknown service: {name}")
+        if name in self._creating:
+            raise RuntimeError(f"circular dependency: {' -> '.join(self._creating + [name])}")
+        self._creating.append(name)
+        try:
+            instance = self._factories[name](self)
+        finally:
+            self._creating.pop()
+        self._instances[name] = instance
+        logger.debug("Created %s", name)
+        return instance
+
+    def created(self, name: str) -> bool:
+        return name in self._instances
+
+    @property
+    def config_manager(self) -> ConfigManager:
+        return self.get("config_manager")
+
+    @property
+    def game_engine(self) -> GameEngine:
+        return self.get("game_engine")
+
+    def data_files(self) -> list:
+        """配置管理器读取的文件：config.toml 和存档"""
+        return [self.config_manager.config_file, self.config_manager.save_path]
+
+    def expose_to_qml(self, context):
+        """把子系统设置为QML根上下文的属性（在加载QML之前调用）"""
+        for name, property_name in QML_CONTEXT_PROPERTIES.items():
+            context.setContextProperty(property_name, self.get(name))
+
+    def shutdown(self):
+        """退出前写出后台线程中尚未落盘的存档和设置（未创建的子系统不会被创建）"""
+        if self.created("config_manager"):
+            self._instances["config_manager"].flush()
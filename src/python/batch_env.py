@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量贪吃蛇模拟（NumPy，不依赖 PySide6）
+
+BatchSnakeEnv 把 N 局游戏保存在一组数组中，一次 step() 用向量化运算同时推进所有对局，
+用于机器人评估和平衡性扫描。规则与 SnakeSimulation 一致：CLASSIC 等模式撞墙死亡，
+FREESTYLE 穿越边界；吃到食物加 FOOD_SCORE 分并生长两格；食物优先生成在内圈。
+
+数据布局（cells = grid_width * grid_height，格子编号 y*grid_width+x）：
+    body      (N, cells) int32  环形缓冲区，head_ptr 指向蛇头，向前 length-1 格是蛇尾
+    occupied  (N, cells) uint8  占用位图
+    food      (N,)       int32  食物格子编号，-1 表示没有食物
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from simulation import (Cell, Direction, GameMode, FOOD_SCORE,
+                        grid_size_for_mode)
+
+# 方向编号与 Direction 的定义顺序一致: UP, DOWN, LEFT, RIGHT
+DIRECTIONS = tuple(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+DX = np.array([d.value[0] for d in DIRECTIONS], dtype=np.int32)
+DY = np.array([d.value[1] for d in DIRECTIONS], dtype=np.int32)
+REVERSE = np.array([DIRECTION_INDEX[Direction((-d.value[0], -d.value[1]))] for d in DIRECTIONS],
+                   dtype=np.int8)
+
+# death_reason 编码，与 StepResult.death_reason 对应
+REASON_NONE = 0
+REASON_WALL = 1
+REASON_SELF = 2
+REASON_BOARD_FULL = 3
+DEATH_REASONS = (None, "wall", "self", "board_full")
+
+# 向量化拒绝采样的轮数，之后对仍未找到空位的对局逐个扫描
+SPAWN_ATTEMPTS = 8
+
+
+@dataclass
+class BatchStepResult:
+    """一次批量推进的结果，数组长度均为 N"""
+    ate: np.ndarray    # bool，本步吃到食物
+    died: np.ndarray   # bool，本步死亡（含填满棋盘）
+    score: np.ndarray  # int32，本步结束时的分数（auto_reset 时为重置前的分数）
+
+
+class BatchSnakeEnv:
+    """N 局并行的贪吃蛇
+
+    step(actions) 的 actions 是长度为 N 的方向编号数组（见 DIRECTIONS），
+    -1 表示保持当前方向，反向移动与 SnakeSimulation 一样被忽略。
+    auto_reset=True 时死亡的对局在本步结束后立即重新开始。
+    """
+
+    def __init__(self, num_envs: int, mode: GameMode = GameMode.CLASSIC,
+                 grid_width: Optional[int] = None, grid_height: Optional[int] = None,
+                 seed=None, auto_reset: bool = False):
+        default_width, default_height = grid_size_for_mode(mode)
+        self.num_envs = num_envs
+        self.mode = mode
+        self.grid_width = grid_width or default_width
+        self.grid_height = grid_height or default_height
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        width, height = self.grid_width, self.grid_height
+        self.cells = cells = width * height
+        self.body = np.zeros((num_envs, cells), dtype=np.int32)
+        self.occupied = np.zeros((num_envs, cells), dtype=np.uint8)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int32)
+        self.length = np.zeros(num_envs, dtype=np.int32)
+        self.head_x = np.zeros(num_envs, dtype=np.int32)
+        self.head_y = np.zeros(num_envs, dtype=np.int32)
+        self.direction = np.zeros(num_envs, dtype=np.int8)
+        self.growing = np.zeros(num_envs, dtype=np.int32)
+        self.food = np.full(num_envs, -1, dtype=np.int32)
+        self.score = np.zeros(num_envs, dtype=np.int32)
+        self.alive = np.zeros(num_envs, dtype=bool)
+        self.death_reason = np.zeros(num_envs, dtype=np.int8)
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+
+        # 扁平视图和每局的起始偏移，用一次花式索引完成所有对局的读写
+        self._body_flat = self.body.reshape(-1)
+        self._occupied_flat = self.occupied.reshape(-1)
+        self._row_base = np.arange(num_envs, dtype=np.int64) * cells
+
+        index = np.arange(cells, dtype=np.int32)
+        x, y = index % width, index // width
+        inner = (x >= 1) & (x <= width - 2) & (y >= 1) & (y <= height - 2)
+        self._interior = index[inner]
+        self._border = index[~inner]
+
+        self.reset()
+
+    @property
+    def wraps(self) -> bool:
+        """是否穿越边界"""
+        return self.mode == GameMode.FREESTYLE
+
+    def reset(self, mask=None):
+        """重置全部对局，或只重置 mask 为 True 的对局"""
+        rows = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        if rows.size == 0:
+            return
+        center_x, center_y = self.grid_width // 2, self.grid_height // 2
+        center = center_y * self.grid_width + center_x
+        self.occupied[rows] = 0
+        self.occupied[rows, center] = 1
+        self.body[rows, 0] = center
+        self.head_ptr[rows] = 0
+        self.length[rows] = 1
+        self.head_x[rows] = center_x
+        self.head_y[rows] = center_y
+        self.direction[rows] = DIRECTION_INDEX[Direction.RIGHT]
+        self.growing[rows] = 0
+        self.score[rows] = 0
+        self.alive[rows] = True
+        self.death_reason[rows] = REASON_NONE
+        self.ticks[rows] = 0
+        self._spawn_food(rows)
+
+    def step(self, actions=None) -> BatchStepResult:
+        """所有存活对局推进一步"""
+        width, height, cells = self.grid_width, self.grid_height, self.cells
+        alive = self.alive
+        occupied = self._occupied_flat
+        base = self._row_base
+
+        if actions is not None:
+            actions = np.asarray(actions)
+            valid = (actions >= 0) & ((self.length < 2) | (actions != REVERSE[self.direction]))
+            np.copyto(self.direction, actions, casting="unsafe", where=valid)
+
+        direction = self.direction
+        x = self.head_x + DX[direction]
+        y = self.head_y + DY[direction]
+        if self.wraps:
+            x %= width
+            y %= height
+            hit_wall = None
+        else:
+            hit_wall = (x < 0) | (x >= width) | (y < 0) | (y >= height)
+            np.clip(x, 0, width - 1, out=x)
+            np.clip(y, 0, height - 1, out=y)
+        cell = y * width + x
+
+        # 蛇尾尚未移动，仍算占用
+        hit_self = occupied[base + cell].view(bool)
+        collided = hit_self if hit_wall is None else hit_self | hit_wall
+        died = alive & collided
+        self.ticks += alive
+
+        moved = np.flatnonzero(alive & ~collided)
+        moved_cell = cell[moved]
+        moved_base = base[moved]
+        self.head_x[moved] = x[moved]
+        self.head_y[moved] = y[moved]
+        head_ptr = self.head_ptr[moved] + 1
+        head_ptr %= cells
+        self.head_ptr[moved] = head_ptr
+        self._body_flat[moved_base + head_ptr] = moved_cell
+        occupied[moved_base + moved_cell] = 1
+        length = self.length[moved] + 1
+
+        # 没有吃到食物且不在生长时移除蛇尾
+        ate_moved = moved_cell == self.food[moved]
+        growing = self.growing[moved]
+        shrink = ~ate_moved & (growing > 0)
+        pop = ~ate_moved & ~shrink
+        self.growing[moved] = growing + ate_moved - shrink
+
+        tail_ptr = (head_ptr[pop] - length[pop] + 1) % cells
+        popped_base = moved_base[pop]
+        tail_cell = self._body_flat[popped_base + tail_ptr]
+        occupied[popped_base + tail_cell] = 0
+        length[pop] -= 1
+        self.length[moved] = length
+
+        eaters = moved[ate_moved]
+        self.score[eaters] += FOOD_SCORE
+        ate = np.zeros(self.num_envs, dtype=bool)
+        ate[eaters] = True
+
+        # 死亡原因：越界优先于撞到自己，与 SnakeSimulation.step 的判断顺序一致
+        if died.any():
+            reason = np.where(hit_self, REASON_SELF, REASON_NONE)
+            if hit_wall is not None:
+                reason = np.where(hit_wall, REASON_WALL, reason)
+            self.death_reason[died] = reason[died]
+            alive[died] = False
+
+        # 棋盘已满、无处放食物：玩家获胜，对局结束
+        full = self._spawn_food(eaters)
+        if full.size:
+            died[full] = True
+            alive[full] = False
+            self.death_reason[full] = REASON_BOARD_FULL
+
+        if self.auto_reset and died.any():
+            score = self.score.copy()
+            self.reset(died)
+            return BatchStepResult(ate=ate, died=died, score=score)
+        return BatchStepResult(ate=ate, died=died, score=self.score)
+
+    def _spawn_food(self, rows: np.ndarray) -> np.ndarray:
+        """为指定对局生成食物，返回找不到空位的对局"""
+        if rows.size == 0:
+            return rows
+        occupied = self._occupied_flat
+        pending = rows
+        interior = self._interior
+
+        # 内圈均匀拒绝采样，空位多时一两轮即可全部命中
+        if interior.size:
+            for _ in range(SPAWN_ATTEMPTS):
+                candidates = interior[self.rng.integers(interior.size, size=pending.size)]
+                free = occupied[self._row_base[pending] + candidates] == 0
+                self.food[pending[free]] = candidates[free]
+                pending = pending[~free]
+                if pending.size == 0:
+                    return pending
+
+        # 棋盘接近填满：逐个扫描剩余空位，内圈满了再用边界
+        full = []
+        for row in pending:
+            row_occupied = self.occupied[row]
+            for pool in (interior, self._border):
+                free_cells = pool[row_occupied[pool] == 0]
+                if free_cells.size:
+                    self.food[row] = free_cells[self.rng.integers(free_cells.size)]
+                    break
+            else:
+                self.food[row] = -1
+                full.append(row)
+        return np.array(full, dtype=np.int64)
+
+    def body_cells(self, env: int) -> List[Cell]:
+        """第 env 局的蛇身坐标（从蛇头到蛇尾）"""
+        ptr = self.head_ptr[env] - np.arange(self.length[env])
+        cells = self.body[env, ptr % self.cells]
+        return [(int(c % self.grid_width), int(c // self.grid_width)) for c in cells]
+
+    def food_cell(self, env: int) -> Optional[Cell]:
+        food = int(self.food[env])
+        return None if food < 0 else (food % self.grid_width, food // self.grid_width)
+
+    def reason(self, env: int) -> Optional[str]:
+        """第 env 局的死亡原因，含义与 StepResult.death_reason 相同"""
+        return DEATH_REASONS[self.death_reason[env]]
+
+    def occupancy_grid(self) -> np.ndarray:
+        """占用位图的 (N, grid_height, grid_width) 视图（不复制）"""
+        return self.occupied.reshape(self.num_envs, self.grid_height, self.grid_width)
@@ -7,6 +7,15 @@ from pathlib import Path
 from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
 from typing import Dict, Any, List
 import os
+import threading
+
+from log_config import get_logger
+from persistence import WriteBehindWriter
+
+logger = get_logger("config")
+
+# 合并写盘的默认窗口（毫秒），可在 config.toml 的 [save] save_delay_ms 中修改
+DEFAULT_SAVE_DELAY_MS = 500
 
 class ConfigManager(QObject):
     """配置管理器，负责读取和管理游戏配置"""
@@ -16,20 +25,44 @@ class ConfigManager(QObject):
     difficultyChanged = Signal(int)
     gameModeChanged = Signal(str)
     
-    def __init__(self, config_file="config.toml"):
+    def __init__(self, config_file="config.toml", save_file=None):
         super().__init__()
         self.config_file = config_file
         self.config = {}
         self._current_difficulty = 5  # 默认难度
         self._current_game_mode = "classic"  # 默认游戏模式
-        self._save_data = {}
+        # 存档（排行榜、成就、统计）启动时用不到，第一次访问 _save_data 时才读取
+        self._save_cache = None
         
         # 配置文件路径
         self._config_path = Path(__file__).parent.parent.parent / "config.toml"
-        self._save_path = Path(__file__).parent.parent.parent / "game_save.json"
+        self._save_path = Path(save_file) if save_file else Path(__file__).parent.parent.parent / "game_save.json"
+        
+        # 保护 config / _save_data：GUI线程修改，写盘线程序列化
+        self._lock = threading.RLock()
+        self._writer = WriteBehindWriter(DEFAULT_SAVE_DELAY_MS / 1000, name="config-writer")
         
         self.load_config()
-        self.load_save_data()
+        self._writer.delay = self.config.get("save", {}).get("save_delay_ms", DEFAULT_SAVE_DELAY_MS) / 1000
+    
+    @property
+    def save_path(self) -> Path:
+        return self._save_path
+    
+    @property
+    def _save_data(self):
+        with self._lock:
+            if self._save_cache is None:
+                self.load_save_data()
+            return self._save_cache
+    
+    @_save_data.setter
+    def _save_data(self, value):
+        self._save_cache = value
+    
+    def preload_save_data(self):
+        """提前读取存档（首帧显示之后调用，避免第一次打开排行榜时才读盘）"""
+        return self._save_data
     
     def get_game_config(self):
         """返回游戏基本配置"""
@@ -41,25 +74,25 @@ class ConfigManager(QObject):
             if os.path.exists(self.config_file):
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     self.config = toml.load(f)
-                print(f"配置文件加载成功: {self.config_file}")
+                logger.info("配置文件加载成功: %s", self.config_file)
                 
                 # 加载保存的难度设置
                 if 'user_settings' in self.config:
                     self._current_difficulty = self.config['user_settings'].get('difficulty', 5)
                     self._current_game_mode = self.config['user_settings'].get('game_mode', 'classic')
             else:
-                print(f"配置文件不存在，使用默认配置: {self.config_file}")
+                logger.info("配置文件不存在，使用默认配置: %s", self.config_file)
                 self.config = self._get_default_config()
                 self.save_config()
         except Exception as e:
-            print(f"加载配置文件失败: {e}")
+            logger.error("加载配置文件失败: %s", e)
             self.config = self._get_default_config()
         
         self.configChanged.emit()
     
     def save_config(self):
-        """保存配置文件"""
-        try:
+        """保存配置文件（登记到后台线程，合并窗口结束后原子写入）"""
+        with self._lock:
             # 确保用户设置部分存在
             if 'user_settings' not in self.config:
                 self.config['user_settings'] = {}
@@ -67,12 +100,13 @@ class ConfigManager(QObject):
             # 保存当前难度和游戏模式
             self.config['user_settings']['difficulty'] = self._current_difficulty
             self.config['user_settings']['game_mode'] = self._current_game_mode
-            
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                toml.dump(self.config, f)
-            print(f"配置文件保存成功: {self.config_file}")
-        except Exception as e:
-            print(f"保存配置文件失败: {e}")
+        self._writer.schedule(self.config_file, self._render_config)
+    
+    def _render_config(self):
+        """在写盘线程中序列化配置"""
+        with self._lock:
+            text = toml.dumps(self.config)
+        return text
     
     def load_save_data(self):
         """加载游戏存档数据"""
@@ -87,7 +121,7 @@ class ConfigManager(QObject):
                     "statistics": {}
                 }
         except Exception as e:
-            print(f"加载存档文件失败: {e}")
+            logger.error("加载存档文件失败: %s", e)
             self._save_data = {
                 "high_scores": {},
                 "achievements": [],
@@ -95,12 +129,19 @@ class ConfigManager(QObject):
             }
     
     def save_game_data(self):
-        """保存游戏数据"""
-        try:
-            with open(self._save_path, 'w', encoding='utf-8') as f:
-                json.dump(self._save_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"保存游戏数据失败: {e}")
+        """保存游戏数据（登记到后台线程，合并窗口结束后原子写入）"""
+        self._writer.schedule(self._save_path, self._render_save_data)
+    
+    def _render_save_data(self):
+        """在写盘线程中序列化存档，使用紧凑格式"""
+        with self._lock:
+            return json.dumps(self._save_data, ensure_ascii=False, separators=(",", ":"))
+    
+    @Slot()
+    def flush(self):
+        """立即写出所有待保存的修改（退出前调用）"""
+        if not self._writer.flush(timeout=5.0):
+            logger.error("保存数据超时，部分修改可能未写入")
     
     def _get_default_config(self) -> Dict[str, Any]:
         """获取默认配置"""
@@ -142,7 +183,13 @@ class ConfigManager(QObject):
                 "food_speed_down_color": "#B464FF",
                 "food_ghost_color": "#FFDC64",
                 "background_color": "#0C141E",
-                "obstacle_color": "#505A64"
+                "obstacle_color": "#505A64",
+                "renderer": "canvas"
+            },
+            "save": {
+                "auto_save": True,
+                "save_file": "game_save.json",
+                "save_delay_ms": DEFAULT_SAVE_DELAY_MS
             },
             "audio": {
                 "enable_sound": True,
@@ -171,7 +218,7 @@ class ConfigManager(QObject):
             self._current_difficulty = value
             self.difficultyChanged.emit(value)
             self.save_config()  # 自动保存设置
-            print(f"Difficulty changed to: {value}")
+            logger.debug("Difficulty changed to: %s", value)
     
     @Property(str, notify=gameModeChanged)
     def currentGameMode(self):
@@ -183,7 +230,7 @@ class ConfigManager(QObject):
             self._current_game_mode = value
             self.gameModeChanged.emit(value)
             self.save_config()  # 自动保存设置
-            print(f"Game mode changed to: {value}")
+            logger.debug("Game mode changed to: %s", value)
     
     @Slot(result=int)
     def getWindowWidth(self):
@@ -216,6 +263,12 @@ class ConfigManager(QObject):
         """获取图形配置"""
         return self.config.get("graphics", {})
     
+    @Slot(result=str)
+    def getRendererMode(self):
+        """获取渲染器模式: canvas（Canvas整帧重绘）或 scene（场景图增量更新）"""
+        mode = self.config.get("graphics", {}).get("renderer", "canvas")
+        return mode if mode in ("canvas", "scene") else "canvas"
+    
     @Slot(result='QVariant')
     def getAudioConfig(self):
         """获取音频配置"""
@@ -229,13 +282,15 @@ class ConfigManager(QObject):
     @Slot(str, int)
     def saveHighScore(self, mode, score):
         """保存最高分"""
-        if "high_scores" not in self._save_data:
-            self._save_data["high_scores"] = {}
-        
-        current_high = self._save_data["high_scores"].get(mode, 0)
-        if score > current_high:
+        with self._lock:
+            if "high_scores" not in self._save_data:
+                self._save_data["high_scores"] = {}
+            
+            current_high = self._save_data["high_scores"].get(mode, 0)
+            if score <= current_high:
+                return
             self._save_data["high_scores"][mode] = score
-            self.save_game_data()
+        self.save_game_data()
     
     @Slot(str, result=int)
     def getHighScore(self, mode):
@@ -253,7 +308,8 @@ class ConfigManager(QObject):
 
     def save_achievements(self, achievements_data):
         """保存成就数据"""
-        self._save_data["achievements"] = achievements_data
+        with self._lock:
+            self._save_data["achievements"] = achievements_data
         self.save_game_data()
 
     @Slot(result='QVariant')
@@ -273,13 +329,15 @@ class ConfigManager(QObject):
 
     def save_statistics(self, stats_data):
         """保存游戏统计数据"""
-        self._save_data["statistics"] = stats_data
+        with self._lock:
+            self._save_data["statistics"] = stats_data
         self.save_game_data()
 
     @Slot(str, int)
     def updateStatistic(self, stat_name, value):
         """更新统计数据"""
-        if "statistics" not in self._save_data:
-            self._save_data["statistics"] = {}
-        self._save_data["statistics"][stat_name] = value
+        with self._lock:
+            if "statistics" not in self._save_data:
+                self._save_data["statistics"] = {}
+            self._save_data["statistics"][stat_name] = value
         self.save_game_data() 
\ No newline at end of file
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程对局评估
+
+把每个游戏模式下的对局切分成分片，交给 multiprocessing 进程池，
+每个分片在工作进程中用 BatchSnakeEnv 批量推进，规则与 SnakeSimulation 相同。
+每局的结果（分数、长度、存活帧数、死亡原因）直接写入共享内存中的结构化数组，
+进程之间只传递分片描述和步数，不序列化任何逐局对象；汇总在主进程中用NumPy完成。
+
+难度只影响逻辑帧间隔（见 tick_interval_ms），不改变规则和策略，因此每个 (模式, 种子) 只模拟一次，
+各难度下的存活时间由存活帧数乘以该难度的帧间隔得到。
+
+用法: python src/python/eval_runner.py [--games N] [--processes P] [--scaling]
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import toml
+
+from batch_env import BatchSnakeEnv, DEATH_REASONS, DX, DY, REVERSE
+from simulation import GameMode, tick_interval_ms
+
+MODES = tuple(GameMode)
+DEFAULT_DIFFICULTIES = tuple(range(1, 11))
+
+RESULT_DTYPE = np.dtype([
+    ("mode", np.uint8),          # MODES 中的下标
+    ("score", np.int32),
+    ("length", np.int32),
+    ("ticks", np.int32),         # 存活的逻辑帧数
+    ("death_reason", np.uint8),  # DEATH_REASONS 中的下标，0 表示达到 max_ticks 时仍存活
+])
+
+
+def load_difficulty_levels(config_file=None) -> List[int]:
+    """读取 config.toml 中 [difficulty.levels] 定义的难度等级"""
+    path = Path(config_file) if config_file else Path(__file__).parent.parent.parent / "config.toml"
+    try:
+        levels = toml.load(path).get("difficulty", {}).get("levels", [])
+        return sorted(int(level["level"]) for level in levels) or list(DEFAULT_DIFFICULTIES)
+    except (OSError, ValueError, KeyError, toml.TomlDecodeError):
+        return list(DEFAULT_DIFFICULTIES)
+
+
+def greedy_policy(env: BatchSnakeEnv) -> np.ndarray:
+    """向量化的贪心策略：在不会立即撞墙/撞到自己的方向中选离食物最近的"""
+    width, height = env.grid_width, env.grid_height
+    x = env.head_x[:, None] + DX[None, :]
+    y = env.head_y[:, None] + DY[None, :]
+    if env.wraps:
+        x %= width
+        y %= height
+        safe = np.ones(x.shape, dtype=bool)
+    else:
+        safe = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        np.clip(x, 0, width - 1, out=x)
+        np.clip(y, 0, height - 1, out=y)
+    rows = np.arange(env.num_envs)[:, None]
+    safe &= env.occupied[rows, y * width + x] == 0
+    safe &= ~((np.arange(len(DX))[None, :] == REVERSE[env.direction][:, None]) & (env.length[:, None] >= 2))
+
+    distance_x = np.abs(x - (env.food % width)[:, None])
+    distance_y = np.abs(y - (env.food // width)[:, None])
+    if env.wraps:
+        distance_x = np.minimum(distance_x, width - distance_x)
+        distance_y = np.minimum(distance_y, height - distance_y)
+    cost = np.where(safe, distance_x + distance_y, width + height + 1)
+    return cost.argmin(axis=1)
+
+
+class ShardTask(NamedTuple):
+    """一个分片：结果写入共享数组的 [start, start+count) 行"""
+    shm_name: str
+    total: int
+    start: int
+    count: int
+    mode: int
+    max_ticks: int
+    seed: np.random.SeedSequence
+    policy: Callable[[BatchSnakeEnv], np.ndarray]
+
+
+def run_shard(task: ShardTask) -> int:
+    """在当前进程中运行一个分片，返回推进的总步数"""
+    env = BatchSnakeEnv(task.count, MODES[task.mode], seed=task.seed)
+    for _ in range(task.max_ticks):
+        if not env.alive.any():
+            break
+        env.step(task.policy(env))
+
+    shm = SharedMemory(name=task.shm_name)
+    try:
+        results = np.ndarray((task.total,), dtype=RESULT_DTYPE, buffer=shm.buf)
+        rows = results[task.start:task.start + task.count]
+        rows["mode"] = task.mode
+        rows["score"] = env.score
+        rows["length"] = env.length
+        rows["ticks"] = env.ticks
+        rows["death_reason"] = env.death_reason
+        # 释放对共享内存缓冲区的引用后才能 close
+        del results, rows
+    finally:
+        shm.close()
+    return int(env.ticks.sum())
+
+
+@dataclass
+class EvalReport:
+    """一次评估的结果"""
+    results: np.ndarray  # RESULT_DTYPE 结构化数组（已从共享内存复制出来）
+    difficulties: List[int]
+    elapsed: float       # 秒
+    steps: int           # 所有对局合计推进的步数
+    processes: int
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def run_evaluation(modes: Sequence[GameMode] = MODES, difficulties: Optional[Sequence[int]] = None,
+                   games: int = 256, shard_size: int = 256, processes: Optional[int] = None,
+                   max_ticks: int = 2000, seed: int = 0,
+                   policy: Callable[[BatchSnakeEnv], np.ndarray] = greedy_policy) -> EvalReport:
+    """每个模式运行 games 局，返回全部逐局结果；difficulties 只用于汇总各难度下的存活时间
+
+    processes=1 时在当前进程内运行，便于作为扩展效率的基准。
+    """
+    difficulties = list(difficulties or load_difficulty_levels())
+    processes = processes or os.cpu_count() or 1
+
+    # 切分：每个模式按 shard_size 拆成若干分片
+    specs = []
+    for mode in modes:
+        for offset in range(0, games, shard_size):
+            specs.append((MODES.index(mode), min(shard_size, games - offset)))
+    total = sum(count for _, count in specs)
+    seeds = np.random.SeedSequence(seed).spawn(len(specs))
+
+    shm = SharedMemory(create=True, size=max(1, total * RESULT_DTYPE.itemsize))
+    try:
+        tasks = []
+        start = 0
+        for (mode, count), shard_seed in zip(specs, seeds):
+            tasks.append(ShardTask(shm.name, total, start, count, mode, max_ticks, shard_seed, policy))
+            start += count
+
+        started = time.perf_counter()
+        if processes == 1:
+            steps = sum(map(run_shard, tasks))
+        else:
+            with Pool(processes) as pool:
+                steps = sum(pool.imap_unordered(run_shard, tasks))
+        elapsed = time.perf_counter() - started
+
+        results = np.ndarray((total,), dtype=RESULT_DTYPE, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+    return EvalReport(results, difficulties, elapsed, steps, processes)
+
+
+def summarize(results: np.ndarray, difficulties: Sequence[int]) -> List[Dict]:
+    """按模式汇总逐局结果，mean_survival_s 是各难度下的平均存活秒数"""
+    summary = []
+    for mode_index in np.unique(results["mode"]):
+        group = results[results["mode"] == mode_index]
+        reasons = np.bincount(group["death_reason"], minlength=len(DEATH_REASONS))
+        mean_ticks = float(group["ticks"].mean())
+        summary.append({
+            "mode": MODES[mode_index].value,
+            "games": len(group),
+            "mean_score": float(group["score"].mean()),
+            "max_score": int(group["score"].max()),
+            "mean_length": float(group["length"].mean()),
+            "mean_ticks": mean_ticks,
+            "mean_survival_s": {difficulty: mean_ticks * tick_interval_ms(difficulty) / 1000
+                                for difficulty in difficulties},
+            "deaths": {DEATH_REASONS[i] or "alive": int(n) for i, n in enumerate(reasons) if n},
+        })
+    return summary
+
+
+def print_summary(report: EvalReport):
+    summary = summarize(report.results, report.difficulties)
+    print(f"{'mode':>12} {'games':>6} {'score':>8} {'max':>6} {'length':>7} {'ticks':>7}  deaths")
+    for row in summary:
+        deaths = ", ".join(f"{name}={count}" for name, count in row["deaths"].items())
+        print(f"{row['mode']:>12} {row['games']:>6} {row['mean_score']:>8.1f} {row['max_score']:>6} "
+              f"{row['mean_length']:>7.1f} {row['mean_ticks']:>7.1f}  {deaths}")
+    print()
+    print(f"{'survive s':>12}" + "".join(f" {'diff ' + str(d):>8}" for d in report.difficulties))
+    for row in summary:
+        print(f"{row['mode']:>12}" + "".join(f" {row['mean_survival_s'][d]:>8.1f}" for d in report.difficulties))
+    print(f"{len(report.results)} games, {report.steps} steps in {report.elapsed:.2f}s "
+          f"({report.steps_per_second:,.0f} steps/s, {report.processes} processes)")
+
+
+def print_scaling(args, modes):
+    """不同进程数下的吞吐量和相对单进程的扩展效率"""
+    counts = sorted({1, 2, 4, 8, 16, os.cpu_count() or 1})
+    counts = [count for count in counts if count <= (os.cpu_count() or 1)]
+    print(f"{'processes':>9}  {'steps/s':>12}  {'speedup':>7}  {'efficiency':>10}")
+    baseline = None
+    for count in counts:
+        report = run_evaluation(modes, args.difficulties, args.games, args.shard_size,
+                                count, args.max_ticks, args.seed)
+        rate = report.steps_per_second
+        baseline = baseline or rate
+        speedup = rate / baseline
+        print(f"{count:>9}  {rate:>12,.0f}  {speedup:>7.2f}  {speedup / count:>10.0%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程对局评估")
+    parser.add_argument("--games", type=int, default=256, help="每个模式的对局数")
+    parser.add_argument("--shard-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modes", nargs="*", default=[m.value for m in MODES],
+                        choices=[m.value for m in MODES])
+    parser.add_argument("--difficulties", nargs="*", type=int, default=None, help="报告存活时间的难度")
+    parser.add_argument("--scaling", action="store_true", help="比较不同进程数的吞吐量")
+    args = parser.parse_args(argv)
+    modes = [GameMode(mode) for mode in args.modes]
+
+    if args.scaling:
+        print_scaling(args, modes)
+        return 0
+    report = run_evaluation(modes, args.difficulties, args.games, args.shard_size,
+                            args.processes, args.max_ticks, args.seed)
+    print_summary(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
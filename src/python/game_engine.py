@@ -2,20 +2,38 @@
 # -*- coding: utf-8 -*-
 
 import random
-import math
-import json
+import time
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Any, Optional, Set
-from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer, QPointF, QPropertyAnimation, QEasingCurve
-from PySide6.QtGui import QColor
-from PySide6.QtQml import qmlRegisterType
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer, Qt
 
-class Direction(Enum):
-    UP = (0, -1)
-    DOWN = (0, 1)
-    LEFT = (-1, 0)
-    RIGHT = (1, 0)
+from game_loop import FixedStepClock, InputQueue, LatencyHistogram
+from list_models import PositionListModel
+from log_config import get_logger
+from profiler import PhaseProfiler
+from replay import Replay, ReplayRecorder, new_seed
+from multi_simulation import MultiSnakeSimulation
+from snake_ai import AutoPilot, SquadPilot
+from simulation import (Direction, GameMode, SimulationSnapshot, SnakeSimulation, DIRECTION_NAMES, grid_size_for_mode,
+                        tick_interval_ms)
+
+# 联网对战的模块（连同 asyncio 和 QtNetwork）约占导入时间的三分之一，第一次连接服务器时才导入
+if TYPE_CHECKING:
+    from PySide6.QtNetwork import QTcpSocket
+    from net_prediction import ClientPrediction
+    from net_protocol import FrameBuffer, Welcome
+
+logger = get_logger("engine")
+
+# 每隔多少帧发送一次完整蛇身用于重新同步，其余帧只发送增量
+SNAKE_RESYNC_INTERVAL = 300
+
+# 开启性能计时时 perfStats 的刷新间隔
+PERF_STATS_INTERVAL_MS = 500
+
+# 多人对局中各玩家的颜色
+PLAYER_COLORS = ("#00FF00", "#00BFFF", "#FF8C00", "#FF69B4")
 
 class FoodType(Enum):
     NORMAL = 1
@@ -35,14 +53,6 @@ class GameState(Enum):
     ACHIEVEMENTS = "achievements"
     LEADERBOARD = "leaderboard"
 
-class GameMode(Enum):
-    CLASSIC = "classic"
-    MODERN = "modern"
-    TIME_ATTACK = "time_attack"
-    FREESTYLE = "freestyle"
-    MAZE = "maze"
-    SURVIVAL = "survival"
-
 class PowerUpType(Enum):
     SPEED_BOOST = "speed_boost"
     SLOW_MOTION = "slow_motion"
@@ -133,6 +143,8 @@ class GameEngine(QObject):
     scoreChanged = Signal(int, int)  # player_id, score
     levelChanged = Signal(int)
     snakePositionsChanged = Signal('QVariant')
+    snakeDelta = Signal(int, int, int, int, bool)  # head_x, head_y, tail_x, tail_y（未移除为-1）, grew
+    snakeLengthChanged = Signal(int)
     foodPositionsChanged = Signal('QVariant')
     foodPositionChanged = Signal('QVariant')  # 兼容简化版本
     obstaclePositionsChanged = Signal('QVariant')
@@ -147,6 +159,15 @@ class GameEngine(QObject):
     gridSizeChanged = Signal()  # 添加网格大小变化信号
     gameModeChanged = Signal(str)  # 游戏模式变化信号
     difficultyChanged = Signal(int)  # 难度变化信号
+    frameTick = Signal(float)  # 每个渲染帧发出，参数为插值系数alpha
+    seedChanged = Signal(int)  # 新一局的随机种子
+    autopilotChanged = Signal(bool)  # AI接管玩家的蛇
+    playersChanged = Signal()  # 多人对局的玩家列表变化
+    playerDelta = Signal(int, int, int, int, int, bool)  # player_id, head_x, head_y, tail_x, tail_y（未移除为-1）, grew
+    playerDied = Signal(int, str)  # player_id, reason
+    networkStatusChanged = Signal(str)  # disconnected / connecting / waiting / playing
+    profilingChanged = Signal(bool)
+    perfStatsChanged = Signal()
     
     def __init__(self, config_manager=None):
         super().__init__()
@@ -160,42 +181,72 @@ class GameEngine(QObject):
             self.config_manager.difficultyChanged.connect(self.onDifficultyChanged)
             # 初始化时应用当前难度设置
             self._difficulty = self.config_manager.currentDifficulty
-            print(f"GameEngine: Using config difficulty: {self._difficulty}")
+            logger.info("Using config difficulty: %s", self._difficulty)
         else:
-            print(f"GameEngine: Using default difficulty: {self._difficulty}")
+            logger.info("Using default difficulty: %s", self._difficulty)
         
         # Game state
         self._game_state = GameState.MENU
-        self._score = 0
+        # 最近一局的结束原因（wall / self / board_full），新一局开始时清空
+        self._game_over_reason = ""
         self._level = 1
         self._lives = 3
-        self._game_mode = GameMode.CLASSIC
         
         # Game world
-        self.grid_width = 30  # 简化版本默认值
-        self.grid_height = 20  # 简化版本默认值
         self.players: List[Player] = []
         self.foods: List[Food] = []
         self.power_ups: List[PowerUp] = []
         self.obstacles: List[Obstacle] = []
         
-        # 简化版本的蛇状态
-        self._snake_positions = [(15, 10)]  # 中心位置
-        self._snake_direction = Direction.RIGHT
-        self._next_direction = Direction.RIGHT
-        self._snake_growing = 0
-        self._food_position = (20, 10)
+        # 简化版本的蛇状态：规则由无Qt依赖的SnakeSimulation负责（初始化时已生成食物）
+        # 每个引擎拥有独立的随机数生成器，每局重新设定种子，配合方向日志即可完整复现一局
+        self._seed = new_seed()
+        self._next_seed: Optional[int] = None
+        self._rng = random.Random(self._seed)
+        self._sim = SnakeSimulation(30, 20, GameMode.CLASSIC, rng=self._rng)
+        # 多人对局（current_players > 1）由 MultiSnakeSimulation 推进，玩家0的蛇身使用 snakeModel
+        self._multi: Optional[MultiSnakeSimulation] = None
+        self._squad: Optional[SquadPilot] = None
+        self._player_models: List[PositionListModel] = []
+        # 联网对战：服务端权威，本地预测并和解（见 net_prediction.py）；本机玩家的蛇身使用 snakeModel
+        self._socket: Optional["QTcpSocket"] = None
+        self._frames: Optional["FrameBuffer"] = None
+        self._net: Optional["ClientPrediction"] = None
+        self._network_status = "disconnected"
+        self._local_player = 0
+        self._ticks_since_resync = 0
+        # 键盘玩家的按键缓冲（单人为玩家0），每个逻辑帧生效一个转向；按难度统计按键到转向的延迟
+        self._input_queues: Dict[int, InputQueue] = {}
+        self._input_latency: Dict[int, LatencyHistogram] = {}
+        self._recorder: Optional[ReplayRecorder] = None
+        self._last_replay: Optional[Replay] = None
+        # 分阶段计时，关闭时热路径上只有一次 enabled 检查；perfStats 每隔 PERF_STATS_INTERVAL_MS 刷新
+        self._profiler = PhaseProfiler()
+        self._perf_stats: Dict[str, Any] = {}
+        self._perf_published_ns = 0
+        
+        # 供QML增量绑定的模型
+        self._snake_model = PositionListModel("body", self)
+        self._food_model = PositionListModel("normal", self)
+        self._obstacle_model = PositionListModel("wall", self)
+        self._snake_model.set_positions(self._snake_positions)
+        self._sync_food_model()
         
         # Game mechanics - 根据难度计算初始速度
         self._calculate_speed_from_difficulty()
-        print(f"GameEngine: Initial speed set to {self.current_speed}ms for difficulty {self._difficulty}")
+        logger.info("Initial speed set to %sms for difficulty %s", self.current_speed, self._difficulty)
         self.game_time = 0
         self.combo_multiplier = 1.0
         self.max_combo = 0
         
-        # 游戏计时器
+        # 游戏循环：game_timer按渲染帧率触发，逻辑帧由固定步长累加器决定，
+        # 修改难度时只改变步长，不需要重启计时器
+        self._clock = FixedStepClock(self.current_speed)
+        self._interpolation_alpha = 1.0  # 不在运行时渲染器直接显示当前状态
         self.game_timer = QTimer()
-        self.game_timer.timeout.connect(self.update_game)
+        self.game_timer.setTimerType(Qt.PreciseTimer)
+        self.game_timer.setInterval(self._frame_interval())
+        self.game_timer.timeout.connect(self._on_frame)
         
         # Multiplayer
         self.max_players = 4
@@ -212,9 +263,8 @@ class GameEngine(QObject):
             'achievements_unlocked': 0
         }
         
-        # Achievements system
-        self.achievements = self._init_achievements()
-        self.load_achievements()
+        # Achievements system：第一次使用时才建立并读取存档（见 achievements）
+        self._achievements: Optional[Dict[str, Achievement]] = None
         
         # Map editor
         self.custom_maps = []
@@ -222,18 +272,69 @@ class GameEngine(QObject):
         
         # AI system
         self.ai_players = []
+        self._autopilot: Optional[AutoPilot] = None
         
         self._init_game_modes()
-        
-        # 初始化食物
-        self._spawn_food()
-        print("GameEngine initialized!")
+        logger.info("GameEngine initialized")
+
+    # 规则状态由SnakeSimulation持有，这里只读转发
+    @property
+    def simulation(self) -> SnakeSimulation:
+        return self._sim
+
+    @property
+    def achievements(self) -> Dict[str, Achievement]:
+        if self._achievements is None:
+            self._achievements = self._init_achievements()
+            self.load_achievements()
+        return self._achievements
+
+    @property
+    def grid_width(self):
+        return self._sim.grid_width
+
+    @property
+    def grid_height(self):
+        return self._sim.grid_height
+
+    @property
+    def _game_mode(self):
+        return self._sim.mode
+
+    @property
+    def _score(self):
+        if self._multi is not None:
+            return self._multi.snakes[self._local_player].score
+        return self._sim.score
+
+    @property
+    def _snake_positions(self):
+        if self._multi is not None:
+            return self._multi.snakes[self._local_player].body
+        return self._sim.body
+
+    @property
+    def _food_position(self):
+        if self._multi is not None:
+            foods = self._multi.foods
+            return foods[0] if foods else None
+        return self._sim.food
 
     # Properties
     @Property(str, notify=gameStateChanged)
     def gameState(self):
         return self._game_state.value
 
+    @Property(str, notify=gameStateChanged)
+    def gameOverReason(self):
+        """最近一局的结束原因：wall / self / board_full，进行中为空"""
+        return self._game_over_reason
+
+    @Property(bool, notify=gameStateChanged)
+    def won(self):
+        """最近一局是否填满了棋盘（board_full 即获胜）"""
+        return self._game_over_reason == "board_full"
+
     @Property(int, notify=scoreChanged)
     def score(self):
         return self._score
@@ -268,6 +369,19 @@ class GameEngine(QObject):
     def obstaclePositions(self):
         return [{"x": obs.position.x, "y": obs.position.y, "type": obs.type} for obs in self.obstacles]
 
+    @Property(QObject, constant=True)
+    def snakeModel(self):
+        """蛇身模型，第0行是蛇头"""
+        return self._snake_model
+
+    @Property(QObject, constant=True)
+    def foodModel(self):
+        return self._food_model
+
+    @Property(QObject, constant=True)
+    def obstacleModel(self):
+        return self._obstacle_model
+
     @Property(int, notify=gridSizeChanged)
     def gridWidth(self):
         return self.grid_width
@@ -301,7 +415,7 @@ class GameEngine(QObject):
         """获取当前游戏速度（毫秒）"""
         return getattr(self, 'current_speed', 200)
 
-    @Property(int)
+    @Property(int, notify=snakeLengthChanged)
     def snakeLength(self):
         """获取蛇的长度"""
         return len(self._snake_positions)
@@ -317,6 +431,384 @@ class GameEngine(QObject):
         """获取游戏时间（毫秒）"""
         return self.game_time
 
+    @Property(float, notify=frameTick)
+    def interpolationAlpha(self):
+        """当前渲染帧位于上一逻辑帧和下一逻辑帧之间的比例"""
+        return self._interpolation_alpha
+
+    @Slot(result='QVariant')
+    def getTickStats(self):
+        """逻辑帧抖动统计：ticks, dropped, mean_ms, p95_ms, max_ms"""
+        return self._clock.jitter_stats()
+
+    @Slot(result='QVariant')
+    def getInputLatencyStats(self):
+        """按键到蛇实际转向的延迟，按难度（字符串键）给出 count, mean_ms, p50_ms, p95_ms, max_ms, buckets，
+        另有 dropped_inputs：缓冲已满时丢弃的按键数"""
+        stats = {str(difficulty): histogram.stats()
+                 for difficulty, histogram in sorted(self._input_latency.items())}
+        stats["dropped_inputs"] = sum(queue.dropped for queue in self._input_queues.values())
+        return stats
+
+    @Slot()
+    def resetInputLatencyStats(self):
+        self._input_latency.clear()
+        for queue in self._input_queues.values():
+            queue.dropped = 0
+
+    @Property(bool, notify=profilingChanged)
+    def profiling(self):
+        """是否记录分阶段耗时（见 profiler.py）"""
+        return self._profiler.enabled
+
+    @profiling.setter
+    def profiling(self, enabled):
+        self.setProfiling(enabled)
+
+    @Slot(bool)
+    def setProfiling(self, enabled):
+        enabled = bool(enabled)
+        if enabled == self._profiler.enabled:
+            return
+        profiler = self._profiler
+        profiler.enabled = enabled
+        if enabled:
+            # 生成食物发生在规则推进内部，用实例属性包装计时
+            profiler.instrument(self._sim, "spawn_food", "spawn")
+            if self._multi is not None:
+                profiler.instrument(self._multi, "_spawn_food", "spawn")
+        else:
+            profiler.uninstrument()
+        logger.info("Profiling %s", "enabled" if enabled else "disabled")
+        self._publish_perf_stats(profiler.clock(), force=True)
+        self.profilingChanged.emit(enabled)
+
+    @Property('QVariant', notify=perfStatsChanged)
+    def perfStats(self):
+        """各阶段最近样本的耗时：{阶段: {count, mean_ms, p50_ms, p95_ms, max_ms, total_ms}}"""
+        return self._perf_stats
+
+    @Slot()
+    def resetPerfStats(self):
+        self._profiler.clear()
+        self._publish_perf_stats(self._profiler.clock(), force=True)
+
+    @Slot(str)
+    def beginPhase(self, phase):
+        """QML中的阶段（例如 paint）开始，只在 profiling 为真时调用"""
+        if self._profiler.enabled:
+            self._profiler.begin(phase)
+
+    @Slot(str)
+    def endPhase(self, phase):
+        if self._profiler.enabled:
+            self._profiler.end(phase)
+
+    @Slot(str, result=str)
+    def dumpPerfTrace(self, path):
+        """把最近的计时样本写成 Chrome trace JSON；path为空时写到当前目录，返回写出的路径（失败时为空）"""
+        if not path:
+            path = time.strftime("snake-trace-%Y%m%d-%H%M%S.json")
+        try:
+            events = self._profiler.dump_chrome_trace(path)
+        except OSError as e:
+            logger.error("Failed to write trace: %s", e)
+            return ""
+        logger.info("Wrote %s trace events to %s", events, path)
+        return path
+
+    def watch_window(self, window):
+        """记录窗口场景图渲染的耗时（render 阶段）；信号在渲染线程上直接调用"""
+        profiler = self._profiler
+        window.beforeRendering.connect(lambda: profiler.enabled and profiler.begin("render"),
+                                       Qt.DirectConnection)
+        window.afterRendering.connect(lambda: profiler.enabled and profiler.end("render"),
+                                      Qt.DirectConnection)
+
+    def _publish_perf_stats(self, now_ns, force=False):
+        if not force and now_ns - self._perf_published_ns < PERF_STATS_INTERVAL_MS * 1_000_000:
+            return
+        self._perf_published_ns = now_ns
+        self._perf_stats = self._profiler.stats()
+        self.perfStatsChanged.emit()
+
+    @Property(int, notify=seedChanged)
+    def seed(self):
+        """当前这一局的随机种子"""
+        return self._seed
+
+    @Slot(int)
+    def setNextSeed(self, seed):
+        """指定下一局使用的种子（用于复现某一局）"""
+        self._next_seed = seed
+
+    @property
+    def last_replay(self) -> Optional[Replay]:
+        """最近一局结束时生成的回放"""
+        return self._last_replay
+
+    @Slot(str, result=bool)
+    def saveReplay(self, path):
+        """把最近一局的回放写入文件"""
+        if self._last_replay is None:
+            return False
+        try:
+            with open(path, 'wb') as f:
+                f.write(self._last_replay.to_bytes())
+            return True
+        except OSError as e:
+            logger.error("Failed to save replay: %s", e)
+            return False
+
+    @Property(bool, notify=autopilotChanged)
+    def autopilot(self):
+        """是否由AI控制器驾驶玩家的蛇（控制器按当前难度选择）"""
+        return self._autopilot is not None
+
+    @Slot(bool)
+    def setAutopilot(self, enabled):
+        if enabled == (self._autopilot is not None):
+            return
+        self._autopilot = AutoPilot(self._sim, self._difficulty) if enabled else None
+        logger.info("Autopilot %s", "enabled" if enabled else "disabled")
+        self.autopilotChanged.emit(enabled)
+
+    @Property('QVariant', notify=playersChanged)
+    def playerInfo(self):
+        """多人对局的玩家：id, name, color, isAi, difficulty"""
+        return [{"id": p.id, "name": p.name, "color": p.color, "isAi": p.is_ai, "difficulty": p.difficulty}
+                for p in self.players]
+
+    @Property('QVariant', notify=playersChanged)
+    def playerModels(self):
+        """每个玩家一个蛇身模型（第0行是蛇头），逐帧增量更新"""
+        return self._player_models
+
+    @Slot(int, int, int)
+    def setupMultiplayer(self, humans, ai_count, ai_difficulty):
+        """配置多人对局：前 humans 个玩家由键盘控制，其余由AI控制；总数为1时回到单人模式"""
+        total = max(1, min(self.max_players, humans + ai_count))
+        humans = max(0, min(humans, total))
+        self.disconnectFromServer()
+        self._stop_loop()
+        self.current_players = total
+        if total == 1:
+            self.players = []
+            self._set_multi(None)
+            self._squad = None
+            self._player_models = []
+            self._game_state = GameState.MENU
+        else:
+            self.players = [
+                Player(id=i, name=f"Player {i + 1}" if i < humans else f"AI {i - humans + 1}",
+                       color=PLAYER_COLORS[i], is_ai=i >= humans,
+                       difficulty=max(1, min(10, ai_difficulty)) if i >= humans else 1)
+                for i in range(total)]
+            self._build_multiplayer()
+            self._game_state = GameState.MULTIPLAYER_LOBBY
+        logger.info("Multiplayer setup: %s players (%s AI)", total, total - humans)
+        self.playersChanged.emit()
+        self.gameStateChanged.emit(self._game_state.value)
+
+    def _build_multiplayer(self):
+        """按当前模式和网格尺寸创建多蛇规则引擎"""
+        self._set_multi(MultiSnakeSimulation(self.grid_width, self.grid_height, self._game_mode,
+                                             players=len(self.players), rng=self._rng))
+        self._squad = SquadPilot(self._multi, {p.id: p.difficulty for p in self.players if p.is_ai})
+        self._build_player_models()
+
+    def _set_multi(self, multi: Optional[MultiSnakeSimulation]):
+        """替换多蛇规则引擎；计时开启时把生成食物的计时从旧实例移到新实例"""
+        if self._profiler.enabled:
+            if self._multi is not None:
+                self._profiler.uninstrument(self._multi)
+            if multi is not None:
+                self._profiler.instrument(multi, "_spawn_food", "spawn")
+        self._multi = multi
+
+    def _build_player_models(self):
+        """每个玩家一个蛇身模型，本机玩家使用 snakeModel"""
+        self._player_models = [self._snake_model if player.id == self._local_player
+                               else PositionListModel("body", self) for player in self.players]
+        self._sync_player_models()
+
+    def _sync_player_models(self):
+        for model, snake in zip(self._player_models, self._multi.snakes):
+            model.set_positions(snake.body if snake.alive else ())
+        for player, snake in zip(self.players, self._multi.snakes):
+            player.score = snake.score
+
+    @Slot(int, str)
+    def setPlayerDirection(self, player_id, direction):
+        """设置某个键盘玩家的方向"""
+        if self._game_state != GameState.PLAYING or self._multi is None:
+            return
+        if not 0 <= player_id < len(self.players) or self.players[player_id].is_ai:
+            return
+        new_direction = DIRECTION_NAMES.get(direction.lower())
+        if new_direction:
+            snake = self._multi.snakes[player_id]
+            self._input_queue(player_id).push(new_direction, snake.next_direction, len(snake.body))
+
+    @Property(str, notify=networkStatusChanged)
+    def networkStatus(self):
+        """联网状态：disconnected / connecting / waiting（等待其他玩家）/ playing"""
+        return self._network_status
+
+    @Slot(result='QVariant')
+    def getNetworkStats(self):
+        """客户端预测统计：rtt_ms, ticks_ahead, lead_ticks, pending, reconciles, corrections, replayed_ticks"""
+        return self._net.stats() if self._net is not None else {}
+
+    @Slot(str, int, str, int, int)
+    def connectToServer(self, host, port, room, seats, bots):
+        """连接联网对战服务器（net_server.py）并加入房间；房间由第一个加入者按 seats / bots 创建"""
+        from PySide6.QtNetwork import QTcpSocket
+        from net_protocol import FrameBuffer, encode_join
+
+        self.disconnectFromServer()
+        self.setupMultiplayer(1, 0, 1)
+        socket = QTcpSocket(self)
+        socket.connected.connect(
+            lambda: socket.write(encode_join(room, self._game_mode, seats, bots, self._difficulty)))
+        socket.readyRead.connect(self._on_socket_ready)
+        socket.errorOccurred.connect(self._on_socket_error)
+        socket.disconnected.connect(self._leave_network)
+        self._socket = socket
+        self._frames = FrameBuffer()
+        self._set_network_status("connecting")
+        logger.info("Connecting to %s:%s, room %s", host, port, room)
+        socket.connectToHost(host, port)
+
+    @Slot()
+    def disconnectFromServer(self):
+        if self._socket is not None:
+            self._socket.abort()
+            self._leave_network()
+
+    def _set_network_status(self, status):
+        if status != self._network_status:
+            self._network_status = status
+            self.networkStatusChanged.emit(status)
+
+    def _on_socket_error(self, error):
+        from PySide6.QtNetwork import QAbstractSocket
+
+        if error == QAbstractSocket.RemoteHostClosedError:
+            return
+        logger.error("Network error: %s", self._socket.errorString() if self._socket else error)
+        self.disconnectFromServer()
+
+    def _on_socket_ready(self):
+        from net_protocol import MSG_WELCOME, ProtocolError, Welcome, decode_server_message
+
+        socket = self._socket
+        try:
+            for payload in self._frames.feed(bytes(socket.readAll())):
+                if self._net is None:
+                    # SNAPSHOT / DELTA 的格子编号需要 WELCOME 中的网格宽度才能解码
+                    if payload[:1] != bytes((MSG_WELCOME,)):
+                        raise ProtocolError("expected WELCOME")
+                    width = 0
+                else:
+                    width = self._net.welcome.grid_width
+                message = decode_server_message(payload, width)
+                if isinstance(message, Welcome):
+                    self._on_welcome(message)
+                else:
+                    self._on_server_update(message)
+        except ProtocolError as e:
+            logger.error("Invalid message from server: %s", e)
+            self.disconnectFromServer()
+
+    def _on_welcome(self, welcome: "Welcome"):
+        """加入房间：按服务端的模式和网格尺寸建立预测状态，等待第一个 SNAPSHOT"""
+        from net_prediction import ClientPrediction
+
+        logger.info("Joined as player %s of %s, tick %sms", welcome.player, welcome.seats, welcome.tick_ms)
+        self._sim.configure(welcome.mode, welcome.grid_width, welcome.grid_height)
+        self._net = ClientPrediction(welcome)
+        self._set_multi(self._net.sim)
+        self._squad = None
+        self._local_player = welcome.player
+        self.current_players = welcome.seats
+        self.players = [Player(id=i, name="You" if i == welcome.player else f"Player {i + 1}",
+                               color=PLAYER_COLORS[i]) for i in range(welcome.seats)]
+        self._build_player_models()
+        self._game_state = GameState.MULTIPLAYER_LOBBY
+        self._set_network_status("waiting")
+        self.gameModeChanged.emit(welcome.mode.value)
+        self.gridSizeChanged.emit()
+        self.playersChanged.emit()
+        self.gameStateChanged.emit(self._game_state.value)
+
+    def _on_server_update(self, message):
+        """应用服务端的 SNAPSHOT / DELTA：和解后只重新显示预测发生变化的蛇"""
+        from net_protocol import Delta, Snapshot
+
+        multi = self._multi
+        profiler = self._profiler if self._profiler.enabled else None
+        if profiler is not None:
+            start = profiler.clock()
+        outcome = self._net.receive(message)
+        if profiler is not None:
+            profiler.lap("reconcile", start)
+        if isinstance(message, Snapshot):
+            # 新的一局（或刚加入）：房间开始推进后的第一个 DELTA 再启动本地时钟
+            self._sync_player_models()
+            self._on_food_spawned()
+            self._resync_snake(reset_model=False)
+            for player in self.players:
+                player.score = self._net.world.scores[player.id]
+                self.scoreChanged.emit(player.id, player.score)
+            return
+        if not isinstance(message, Delta):
+            return
+        world = self._net.world
+        if self._game_state != GameState.PLAYING and world.alive[self._local_player]:
+            self._game_state = GameState.PLAYING
+            self._set_network_status("playing")
+            self._start_loop()
+            self.gameStateChanged.emit(self._game_state.value)
+
+        for player_id in outcome.changed:
+            snake = multi.snakes[player_id]
+            self._player_models[player_id].set_positions(snake.body if snake.alive else ())
+        if self._local_player in outcome.changed:
+            self._resync_snake(reset_model=False)
+        if outcome.foods_changed:
+            self._on_food_spawned()
+        # 分数和死亡只以服务端为准
+        for event in message.events:
+            if event.died:
+                self.playerDied.emit(event.player, event.death_reason)
+            elif event.ate:
+                self.players[event.player].score = world.scores[event.player]
+                self.scoreChanged.emit(event.player, world.scores[event.player])
+        if self._game_state == GameState.PLAYING and not world.alive[self._local_player]:
+            # 服务端在所有键盘玩家死亡后重新开始一局，届时收到新的 SNAPSHOT
+            self._game_over(multi.snakes[self._local_player].death_reason or "self")
+
+    def _leave_network(self):
+        """断开连接，回到单人菜单"""
+        socket, self._socket = self._socket, None
+        if socket is None:
+            return
+        socket.disconnected.disconnect(self._leave_network)
+        socket.deleteLater()
+        logger.info("Disconnected from server")
+        self._stop_loop()
+        self._net = None
+        self._set_multi(None)
+        self._local_player = 0
+        self.current_players = 1
+        self.players = []
+        self._player_models = []
+        self._game_state = GameState.MENU
+        self._set_network_status("disconnected")
+        self.playersChanged.emit()
+        self.gameStateChanged.emit(self._game_state.value)
+
     @Property(bool, notify=gameStateChanged)
     def isReady(self):
         """检查游戏是否处于准备状态"""
@@ -326,20 +818,24 @@ class GameEngine(QObject):
     @Slot(str, int)
     def setGameMode(self, mode, difficulty):
         """设置游戏模式和难度 - 优化速度设置"""
-        print(f"Setting game mode: {mode}, difficulty: {difficulty}")
-        
-        mode_map = {
-            "classic": GameMode.CLASSIC,
-            "modern": GameMode.MODERN,
-            "time_attack": GameMode.TIME_ATTACK,
-            "freestyle": GameMode.FREESTYLE,
-            "maze": GameMode.MAZE,
-            "survival": GameMode.SURVIVAL
-        }
+        logger.info("Setting game mode: %s, difficulty: %s", mode, difficulty)
+        
+        try:
+            game_mode = GameMode(mode)
+        except ValueError:
+            game_mode = None
         
-        if mode in mode_map:
-            self._game_mode = mode_map[mode]
-            self.gameModeChanged.emit(self._game_mode.value)
+        if game_mode is not None and self._net is not None:
+            # 联网对战的模式和网格尺寸由房间决定
+            logger.info("Ignoring mode change while connected to a server")
+            game_mode = None
+        if game_mode is not None:
+            # 根据模式调整网格大小
+            grid_width, grid_height = grid_size_for_mode(game_mode)
+            self._sim.configure(game_mode, grid_width, grid_height)
+            if self._multi is not None:
+                self._build_multiplayer()
+            self.gameModeChanged.emit(game_mode.value)
         
         # 设置难度并重新计算速度
         old_difficulty = self._difficulty
@@ -348,83 +844,69 @@ class GameEngine(QObject):
         self._calculate_speed_from_difficulty()
         self.difficultyChanged.emit(self._difficulty)
         
-        print(f"Mode set: {mode}, difficulty changed from {old_difficulty} to {self._difficulty}")
-        print(f"Speed changed from {old_speed}ms to {self.current_speed}ms")
-        
-        # 如果游戏正在运行，立即更新定时器间隔
-        if self._game_state == GameState.PLAYING and self.game_timer.isActive():
-            print("Game is running, updating timer interval immediately")
-            self.game_timer.stop()
-            self.game_timer.start(self.current_speed)
-        
-        # 根据模式调整网格大小
-        if self._game_mode == GameMode.MODERN:
-            self.grid_width = 40
-            self.grid_height = 25
-        elif self._game_mode == GameMode.TIME_ATTACK:
-            self.grid_width = 25
-            self.grid_height = 15
-        else:
-            self.grid_width = 30
-            self.grid_height = 20
+        logger.info("Mode set: %s, difficulty changed from %s to %s", mode, old_difficulty, self._difficulty)
+        logger.debug("Speed changed from %sms to %sms", old_speed, self.current_speed)
+        
+        # 立即更新逻辑帧步长，游戏循环无需重启
+        self._clock.set_step_ms(self._logic_step_ms())
         
         self.gridSizeChanged.emit()
 
     @Slot()
     def startGame(self):
         """开始游戏"""
+        if self._net is not None:
+            # 联网对战由服务端开始
+            return
         if self._game_state == GameState.READY:
             # 如果已经处于准备状态，按空格键后才真正开始游戏
-            print("Starting game from READY state")
+            logger.info("Starting game from READY state")
             self._game_state = GameState.PLAYING
-            self.game_timer.start(self.current_speed)
+            self._start_loop()
         else:
             # 刚进入游戏界面，进入准备状态
-            print(f"Entering READY state. Mode: {self._game_mode.value}, difficulty: {self._difficulty}")
+            logger.info("Entering READY state. Mode: %s, difficulty: %s", self._game_mode.value, self._difficulty)
             self._game_state = GameState.READY
-            # 重置蛇的位置到中心
-            self._snake_positions = [(self.grid_width // 2, self.grid_height // 2)]
-            # 重置方向
-            self._snake_direction = Direction.RIGHT
-            self._next_direction = Direction.RIGHT
-            # 生成食物
-            self._spawn_food()
+            # 蛇回到中心、重置方向并生成食物
+            self._new_round()
+            self._on_food_spawned()
+            self._sync_obstacle_model()
+            self.scoreChanged.emit(0, self._score)
         
         # 发送状态变化信号
         self.gameStateChanged.emit(self._game_state.value)
-        self.snakePositionsChanged.emit(self.snakePositions)
+        self._resync_snake()
 
     @Slot()
     def pauseGame(self):
         """暂停/恢复游戏"""
+        if self._net is not None:
+            # 服务端不会暂停
+            return
         if self._game_state == GameState.PLAYING:
-            print("Pausing game...")
+            logger.info("Pausing game")
             self._game_state = GameState.PAUSED
-            self.game_timer.stop()
+            self._stop_loop()
         elif self._game_state == GameState.PAUSED:
-            print("Resuming game...")
+            logger.info("Resuming game")
             self._game_state = GameState.PLAYING
-            self.game_timer.start(self.current_speed)
+            self._start_loop()
         self.gameStateChanged.emit(self._game_state.value)
 
     @Slot()
     def resetGame(self):
         """重置游戏"""
-        print("Resetting game...")
+        logger.info("Resetting game")
+        self.disconnectFromServer()
         self._game_state = GameState.MENU
-        self._score = 0
-        self._snake_positions = [(self.grid_width // 2, self.grid_height // 2)]
-        self._snake_direction = Direction.RIGHT
-        self._next_direction = Direction.RIGHT
-        self._snake_growing = 0
-        
-        self.game_timer.stop()
-        self._spawn_food()
+        self._stop_loop()
+        self._new_round()
+        self._on_food_spawned()
         
         # 发送信号
         self.gameStateChanged.emit(self._game_state.value)
         self.scoreChanged.emit(0, self._score)
-        self.snakePositionsChanged.emit(self.snakePositions)
+        self._resync_snake()
         self.foodPositionChanged.emit(self.foodPosition)
 
     @Slot(str)
@@ -434,88 +916,74 @@ class GameEngine(QObject):
         if self._game_state != GameState.PLAYING:
             return
         
-        direction_map = {
-            "up": Direction.UP,
-            "down": Direction.DOWN,
-            "left": Direction.LEFT,
-            "right": Direction.RIGHT
-        }
-        
-        new_direction = direction_map.get(direction.lower())
+        new_direction = DIRECTION_NAMES.get(direction.lower())
         if not new_direction:
             return
         
-        # 简化逻辑：直接设置方向，如果有效的话
-        if self._is_valid_direction(new_direction):
-            self._next_direction = new_direction
-            print(f"Direction set to: {direction}")  # 调试信息
+        if self._net is not None:
+            # 立即写入预测状态，同时发送给服务端
+            pending = self._net.input(new_direction)
+            if pending is not None:
+                from net_protocol import encode_input
+                self._socket.write(encode_input(pending.seq, pending.direction, pending.tick))
+            return
 
-    def _is_valid_direction(self, direction: Direction) -> bool:
-        """检查方向是否有效（不能反向移动）- 优化版本"""
-        # 如果蛇长度小于2，任何方向都有效
-        if len(self._snake_positions) < 2:
-            return True
-        
-        # 简化的反向检查：直接比较方向值
-        current_dx, current_dy = self._snake_direction.value
-        new_dx, new_dy = direction.value
+        if self._multi is not None:
+            self.setPlayerDirection(0, direction)
+            return
         
-        # 如果新方向与当前方向相反，则无效
-        return not (current_dx == -new_dx and current_dy == -new_dy)
+        # 进入按键缓冲，下一个没有转向的逻辑帧生效
+        if self._input_queue(0).push(new_direction, self._sim.next_direction, len(self._sim.body)):
+            logger.debug("Direction queued: %s", direction)
+
+    def _input_queue(self, player_id: int) -> InputQueue:
+        queue = self._input_queues.get(player_id)
+        if queue is None:
+            queue = self._input_queues[player_id] = InputQueue()
+        return queue
+
+    def _record_input_latency(self, queue: InputQueue, pressed_ns: int):
+        """缓冲的转向已经体现在蛇头的移动上"""
+        histogram = self._input_latency.get(self._difficulty)
+        if histogram is None:
+            histogram = self._input_latency[self._difficulty] = LatencyHistogram()
+        histogram.add(queue.elapsed_ms(pressed_ns))
+
+    def _is_valid_direction(self, direction: Direction) -> bool:
+        """检查方向是否有效（不能反向移动）"""
+        return self._sim.is_valid_direction(direction)
 
     def _spawn_food(self):
         """生成食物"""
-        if not hasattr(self, 'grid_width') or not hasattr(self, 'grid_height'):
-            print("Error: Grid dimensions not set")
-            return
-        
-        if self.grid_width <= 0 or self.grid_height <= 0:
-            print(f"Error: Invalid grid dimensions ({self.grid_width}, {self.grid_height})")
-            return
-        
-        print(f"Spawning food in grid: {self.grid_width}x{self.grid_height}")
-        
-        attempts = 0
-        max_attempts = 100
-        
-        # 确保范围安全
-        safe_width = max(5, self.grid_width)
-        safe_height = max(5, self.grid_height)
-        
-        while attempts < max_attempts:
-            # 限制在安全范围内生成食物，远离边界1格
-            x = random.randint(1, safe_width - 2)
-            y = random.randint(1, safe_height - 2)
-            
-            # 检查是否与蛇身重叠
-            if (x, y) not in self._snake_positions:
-                self._food_position = (x, y)
-                print(f"Food spawned at ({x}, {y})")
-                self.foodPositionChanged.emit(self.foodPosition)
-                return True
-            attempts += 1
-        
-        # 如果尝试多次仍无法生成，强制选择一个位置
-        print("Warning: Could not find free space for food, forcing position")
-        # 从中心位置开始搜索
-        center_x = safe_width // 2
-        center_y = safe_height // 2
-        
-        for x_offset in range(-5, 6):
-            for y_offset in range(-5, 6):
-                test_x = (center_x + x_offset) % safe_width
-                test_y = (center_y + y_offset) % safe_height
-                if (test_x, test_y) not in self._snake_positions:
-                    self._food_position = (test_x, test_y)
-                    print(f"Forced food spawn at ({test_x}, {test_y})")
-                    self.foodPositionChanged.emit(self.foodPosition)
-                    return True
-        
-        # 最后的备选方案：放在(1,1)位置
-        self._food_position = (1, 1)
-        print("Emergency food placement at (1, 1)")
+        found = self._sim.spawn_food()
+        self._on_food_spawned(found)
+        return found
+
+    def _on_food_spawned(self, found=True):
+        """食物位置变化后通知QML"""
+        if not found:
+            logger.warning("Could not find free space for food")
+        logger.debug("Food spawned at %s", self._food_position)
+        self._sync_food_model()
         self.foodPositionChanged.emit(self.foodPosition)
-        return False
+
+    def _sync_food_model(self):
+        """食物模型：完整版本的foods列表，否则为简化版本的单个食物"""
+        if self._multi is not None:
+            self._food_model.set_positions(self._multi.foods)
+        elif self.foods:
+            self._food_model.set_items(
+                (food.position.x, food.position.y, food.type) for food in self.foods)
+        elif self._food_position:
+            self._food_model.set_positions([self._food_position])
+        else:
+            self._food_model.set_items([])
+
+    def _sync_obstacle_model(self):
+        """障碍物变化时调用"""
+        self._obstacle_model.set_items(
+            (obs.position.x, obs.position.y, obs.type) for obs in self.obstacles)
+        self.obstaclePositionsChanged.emit(self.obstaclePositions)
 
     def _init_achievements(self):
         """初始化成就系统"""
@@ -645,74 +1113,262 @@ class GameEngine(QObject):
                 achievement.unlocked = True
                 self.achievementUnlocked.emit(achievement_id, achievement.name)
                 self.save_achievements()
-                print(f"Achievement unlocked: {achievement.name}")
+                logger.info("Achievement unlocked: %s", achievement.name)
+
+    def _new_round(self):
+        """新的一局：设定种子、重置规则状态并开始记录回放"""
+        if self._next_seed is not None:
+            self._seed, self._next_seed = self._next_seed, None
+        else:
+            self._seed = new_seed()
+        self._rng.seed(self._seed)
+        self._game_over_reason = ""
+        if self._multi is not None:
+            # 多人对局暂不记录回放
+            self._multi.reset()
+            self._squad.reset()
+            self._sync_player_models()
+            self._recorder = None
+            self.seedChanged.emit(self._seed)
+            return
+        self._sim.reset()
+        if self._autopilot is not None:
+            self._autopilot.difficulty = self._difficulty
+            self._autopilot.reset()
+        self._recorder = ReplayRecorder(self._seed, self._game_mode, self._difficulty,
+                                        self.grid_width, self.grid_height)
+        self.seedChanged.emit(self._seed)
+
+    def _frame_interval(self):
+        """渲染帧间隔（毫秒），来自配置的fps"""
+        fps = self.config_manager.getFPS() if self.config_manager else 60
+        return max(1, round(1000 / max(1, fps)))
+
+    def _logic_step_ms(self):
+        """逻辑帧步长：联网对战使用服务端的帧间隔，否则由难度决定"""
+        return self._net.welcome.tick_ms if self._net is not None else self.current_speed
+
+    def _start_loop(self):
+        self._clock.set_step_ms(self._logic_step_ms())
+        self._clock.start()
+        self.game_timer.start()
+
+    def _stop_loop(self):
+        self.game_timer.stop()
+        self._clock.stop()
+        for queue in self._input_queues.values():
+            queue.clear()
+        self._interpolation_alpha = 1.0
+        self.frameTick.emit(self._interpolation_alpha)
+
+    def _on_frame(self):
+        """每个渲染帧调用：按固定步长补齐应执行的逻辑帧，然后通知插值系数"""
+        profiler = self._profiler if self._profiler.enabled else None
+        if profiler is not None:
+            start = profiler.clock()
+        for _ in range(self._clock.advance()):
+            self.update_game()
+            if self._game_state != GameState.PLAYING:
+                break
+        else:
+            self._interpolation_alpha = self._clock.alpha
+            self.frameTick.emit(self._interpolation_alpha)
+        if profiler is not None:
+            self._publish_perf_stats(profiler.lap("frame", start))
 
     def update_game(self):
-        """游戏主循环 - 优化性能和响应性"""
+        """推进一个逻辑帧"""
         if self._game_state != GameState.PLAYING:
             return
-        
-        # 更新蛇的方向（直接使用，无需缓冲区处理）
-        self._snake_direction = self._next_direction
-        
-        # 移动蛇
-        head_x, head_y = self._snake_positions[0]
-        dx, dy = self._snake_direction.value
-        new_head = (head_x + dx, head_y + dy)
-        
-        # 根据游戏模式处理边界
-        if self._game_mode == GameMode.FREESTYLE:
-            # 自由模式：穿越边界
-            new_head = (new_head[0] % self.grid_width, new_head[1] % self.grid_height)
-        else:
-            # 其他模式：边界碰撞
-            if (new_head[0] < 0 or new_head[0] >= self.grid_width or 
-                new_head[1] < 0 or new_head[1] >= self.grid_height):
-                self._game_over()
-                return
-        
-        # 检查自身碰撞
-        if new_head in self._snake_positions:
-            self._game_over()
+        if self._net is not None:
+            self._update_network()
+            return
+        if self._multi is not None:
+            self._update_multiplayer()
             return
         
-        # 移动蛇头
-        self._snake_positions.insert(0, new_head)
+        profiler = self._profiler if self._profiler.enabled else None
+        if profiler is not None:
+            start = profiler.clock()
+        queue = self._input_queue(0)
+        turn = queue.pop(self._sim.set_direction) if queue else None
+        autopilot = self._autopilot
+        if autopilot is not None:
+            autopilot.steer()
+        if profiler is not None:
+            start = profiler.lap("ai", start)
+        result = self._sim.step()
+        if profiler is not None:
+            start = profiler.lap("simulate", start)
+        if autopilot is not None:
+            autopilot.observe(result)
+        if turn is not None and result.alive and self._sim.direction == turn[0]:
+            self._record_input_latency(queue, turn[1])
+        if self._recorder is not None:
+            self._recorder.record(self._sim.direction)
+        self._publish_step(result)
+        if profiler is not None:
+            profiler.lap("signals", start)
+
+    def _publish_step(self, result):
+        """把单人逻辑帧的结果写入模型并通知QML"""
+        if not result.alive:
+            if result.ate:
+                # 吃掉最后一个食物后棋盘已满
+                self.scoreChanged.emit(0, self._score)
+                self._snake_model.push_front(*result.head)
+            self._game_over(result.death_reason)
+            return
         
-        # 检查食物碰撞
-        if new_head == self._food_position:
-            self._score += 10
-            self._snake_growing += 1
+        if result.ate:
             self.scoreChanged.emit(0, self._score)
-            self._spawn_food()
-        else:
-            # 如果没有吃到食物且不在生长，移除尾部
-            if self._snake_growing > 0:
-                self._snake_growing -= 1
-            else:
-                self._snake_positions.pop()
+            self._on_food_spawned()
+        
+        # 模型始终增量更新
+        self._snake_model.push_front(*result.head)
+        if result.tail is not None:
+            self._snake_model.pop_back()
         
-        # 发送位置更新信号
+        # 只发送蛇头/蛇尾增量，定期发送完整蛇身重新同步
+        self._ticks_since_resync += 1
+        if self._ticks_since_resync >= SNAKE_RESYNC_INTERVAL:
+            self._resync_snake(reset_model=False)
+            return
+        if result.tail is None:
+            self.snakeDelta.emit(result.head[0], result.head[1], -1, -1, True)
+            self.snakeLengthChanged.emit(len(self._snake_positions))
+        else:
+            self.snakeDelta.emit(result.head[0], result.head[1], result.tail[0], result.tail[1], False)
+
+    def _update_multiplayer(self):
+        """推进一个多人逻辑帧：只对发生变化的玩家发送增量信号"""
+        multi = self._multi
+        profiler = self._profiler if self._profiler.enabled else None
+        if profiler is not None:
+            start = profiler.clock()
+        turns = {}
+        for player_id, queue in self._input_queues.items():
+            if queue and player_id < len(multi.snakes):
+                turn = queue.pop(multi.snakes[player_id].set_direction)
+                if turn is not None:
+                    turns[player_id] = queue, turn
+        self._squad.steer()
+        if profiler is not None:
+            start = profiler.lap("ai", start)
+        result = multi.step()
+        if profiler is not None:
+            start = profiler.lap("simulate", start)
+        self._squad.observe(result)
+        for player_id, (queue, (direction, pressed_ns)) in turns.items():
+            snake = multi.snakes[player_id]
+            if snake.alive and snake.direction == direction:
+                self._record_input_latency(queue, pressed_ns)
+
+        for event in result.events:
+            player_id = event.player
+            model = self._player_models[player_id]
+            if event.died:
+                model.set_items([])
+                self.playerDied.emit(player_id, event.death_reason)
+                continue
+            model.push_front(*event.head)
+            head_x, head_y = event.head
+            tail_x, tail_y = event.tail if event.tail is not None else (-1, -1)
+            if event.tail is not None:
+                model.pop_back()
+            self.playerDelta.emit(player_id, head_x, head_y, tail_x, tail_y, event.tail is None)
+            if player_id == 0:
+                # 单人渲染器只绘制玩家0
+                self.snakeDelta.emit(head_x, head_y, tail_x, tail_y, event.tail is None)
+            if event.ate:
+                score = multi.snakes[player_id].score
+                self.players[player_id].score = score
+                self.scoreChanged.emit(player_id, score)
+
+        if result.eaten or result.spawned:
+            self._on_food_spawned(len(multi.foods) == multi.food_count)
+        if profiler is not None:
+            profiler.lap("signals", start)
+
+        # 键盘玩家全部死亡（全部为AI时为所有蛇死亡）后结束
+        humans = [snake for snake, player in zip(multi.snakes, self.players) if not player.is_ai]
+        if not any(snake.alive for snake in humans or multi.snakes):
+            self._game_over(multi.snakes[0].death_reason or "self")
+
+    def _update_network(self):
+        """本地预测推进一个逻辑帧；服务端确认前不发送分数和死亡"""
+        profiler = self._profiler if self._profiler.enabled else None
+        if profiler is not None:
+            start = profiler.clock()
+        result = self._net.advance()
+        if profiler is not None:
+            start = profiler.lap("simulate", start)
+        for event in result.events:
+            model = self._player_models[event.player]
+            if event.died:
+                model.set_items([])
+                continue
+            model.push_front(*event.head)
+            head_x, head_y = event.head
+            tail_x, tail_y = event.tail if event.tail is not None else (-1, -1)
+            if event.tail is not None:
+                model.pop_back()
+            self.playerDelta.emit(event.player, head_x, head_y, tail_x, tail_y, event.tail is None)
+            if event.player == self._local_player:
+                self.snakeDelta.emit(head_x, head_y, tail_x, tail_y, event.tail is None)
+        if result.eaten:
+            self._on_food_spawned()
+        if profiler is not None:
+            profiler.lap("signals", start)
+
+    def snapshot_state(self) -> SimulationSnapshot:
+        """单人规则状态的快照（O(1)），用 restore_state() 回到这一帧"""
+        return self._sim.snapshot()
+
+    def restore_state(self, snapshot: SimulationSnapshot):
+        """恢复到 snapshot_state() 时的状态，重建蛇身和食物模型和AI的距离场，录像截断到该帧"""
+        self._sim.restore(snapshot)
+        if self._autopilot is not None:
+            # 距离场只靠每帧的增量修复，恢复后必须按新的棋盘重建
+            self._autopilot.reset()
+        if self._recorder is not None:
+            self._recorder.truncate(self._sim.tick)
+        self.scoreChanged.emit(0, self._score)
+        self._on_food_spawned()
+        self._resync_snake()
+
+    def _resync_snake(self, reset_model=True):
+        """发送完整蛇身，QML据此重建本地副本；重置时同时重建蛇身模型"""
+        self._ticks_since_resync = 0
+        if reset_model:
+            self._snake_model.set_positions(self._snake_positions)
         self.snakePositionsChanged.emit(self.snakePositions)
+        self.snakeLengthChanged.emit(len(self._snake_positions))
 
-    def _game_over(self):
-        """游戏结束"""
-        print(f"Game Over! Final Score: {self._score}")
+    def _game_over(self, reason="self"):
+        """游戏结束，reason为 wall / self / board_full"""
+        logger.info("Game over, final score: %s, reason: %s", self._score, reason)
+        if self._recorder is not None:
+            self._last_replay = self._recorder.finish(self._score, reason)
+            self._recorder = None
+        # 结算界面读取 snakePositions，结束时发送一次完整蛇身
+        self._resync_snake(reset_model=False)
+        self._game_over_reason = reason
         self._game_state = GameState.GAME_OVER
-        self.game_timer.stop()
+        self._stop_loop()
         self.gameStateChanged.emit(self._game_state.value)
+        self.gameOverSignal.emit(self._score, reason)
 
     def _calculate_speed_from_difficulty(self):
         """根据难度计算初始速度 - 优化版本"""
         # 使用更合理的速度范围：难度1=500ms（很慢），难度10=100ms（较快）
-        # 使用线性递减公式：500 - (difficulty-1) * 44.4
-        self.base_speed = max(100, 500 - (self._difficulty - 1) * 44)
+        self.base_speed = tick_interval_ms(self._difficulty)
         self.current_speed = self.base_speed
-        print(f"Speed calculated: difficulty={self._difficulty}, speed={self.current_speed}ms")
+        logger.debug("Speed calculated: difficulty=%s, speed=%sms", self._difficulty, self.current_speed)
 
     def onDifficultyChanged(self, new_difficulty):
         """处理难度变化 - 增强版本"""
-        print(f"Difficulty changing from {self._difficulty} to {new_difficulty}")
+        logger.debug("Difficulty changing from %s to %s", self._difficulty, new_difficulty)
         self._difficulty = new_difficulty
         self.difficultyChanged.emit(self._difficulty)
         
@@ -720,13 +1376,11 @@ class GameEngine(QObject):
         old_speed = getattr(self, 'current_speed', 200)
         self._calculate_speed_from_difficulty()
         
-        # 如果游戏正在运行，立即更新定时器间隔
-        if self._game_state == GameState.PLAYING and self.game_timer.isActive():
-            print(f"Updating game speed from {old_speed}ms to {self.current_speed}ms")
-            self.game_timer.stop()
-            self.game_timer.start(self.current_speed)
+        # 立即更新逻辑帧步长，游戏循环无需重启
+        self._clock.set_step_ms(self._logic_step_ms())
+        logger.debug("Updating game speed from %sms to %sms", old_speed, self.current_speed)
         
-        print(f"Difficulty changed to {self._difficulty}, new speed: {self.current_speed}ms")
+        logger.info("Difficulty changed to %s, new speed: %sms", self._difficulty, self.current_speed)
 
 def register_qml_types():
     """注册QML类型，使GameEngine类可以在QML中使用"""
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+固定步长游戏循环（不依赖 PySide6）
+
+FixedStepClock 使用单调时钟累加经过的时间，每次 advance() 返回本帧应当执行的
+逻辑帧数：渲染帧率和模拟帧率互不影响，事件循环繁忙时会按顺序补上错过的逻辑帧，
+而不是像 QTimer.start(interval) 那样逐渐漂移。alpha 给出两次逻辑帧之间的插值系数。
+
+InputQueue 缓冲两个逻辑帧之间的按键，每帧按顺序生效一个转向，同一帧内的快速连按不会互相覆盖；
+LatencyHistogram 统计按键到蛇实际转向的延迟。
+"""
+
+import bisect
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from simulation import Direction, is_reverse
+
+# 每个玩家最多缓冲的按键数（超过时丢弃新的按键）
+MAX_BUFFERED_INPUTS = 3
+# 输入延迟直方图各个桶的上界（毫秒），最后一个桶收集更大的值
+LATENCY_BUCKETS_MS = (10, 25, 50, 75, 100, 150, 200, 300, 400, 500, 750, 1000)
+
+
+class FixedStepClock:
+    """固定步长累加器"""
+
+    def __init__(self, step_ms: float, max_catch_up: int = 5,
+                 clock: Callable[[], int] = time.perf_counter_ns, jitter_window: int = 256):
+        self._clock = clock
+        self._step_ns = int(step_ms * 1_000_000)
+        self.max_catch_up = max_catch_up
+        self._accumulator = 0
+        self._last = None
+        # 每个逻辑帧实际执行时刻与理想时刻的偏差（纳秒）
+        self._lateness = deque(maxlen=jitter_window)
+        self._next_due = None
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+    @property
+    def running(self) -> bool:
+        return self._last is not None
+
+    @property
+    def step_ms(self) -> float:
+        return self._step_ns / 1_000_000
+
+    def set_step_ms(self, step_ms: float):
+        """修改步长，已累加的时间保留，不需要重启"""
+        self._step_ns = max(1, int(step_ms * 1_000_000))
+        if self._last is not None:
+            # 下一个逻辑帧按新步长计算，否则之后每一帧都会记录一个固定的假延迟
+            self._next_due = self._last + self._step_ns - self._accumulator
+
+    def start(self):
+        """开始或从暂停恢复计时；暂停期间的时间不会被补帧"""
+        self._last = self._clock()
+        self._accumulator = 0
+        self._next_due = self._last + self._step_ns
+
+    def stop(self):
+        self._last = None
+        self._next_due = None
+
+    def advance(self) -> int:
+        """累加自上次调用以来的时间，返回需要执行的逻辑帧数
+
+        超过 max_catch_up 的积压帧会被丢弃（计入 dropped_ticks），
+        避免长时间卡顿后一次性执行大量逻辑帧。
+        """
+        if self._last is None:
+            return 0
+        now = self._clock()
+        self._accumulator += now - self._last
+        self._last = now
+
+        step = self._step_ns
+        due = self._accumulator // step
+        if due > self.max_catch_up:
+            self.dropped_ticks += due - self.max_catch_up
+            self._accumulator -= (due - self.max_catch_up) * step
+            self._next_due += (due - self.max_catch_up) * step
+            due = self.max_catch_up
+        self._accumulator -= due * step
+
+        for _ in range(due):
+            self._lateness.append(now - self._next_due)
+            self._next_due += step
+        self.ticks += due
+        return due
+
+    @property
+    def alpha(self) -> float:
+        """当前时刻位于两个逻辑帧之间的比例 [0, 1)，用于渲染插值"""
+        if self._last is None:
+            return 0.0
+        return min(1.0, self._accumulator / self._step_ns)
+
+    def jitter_stats(self) -> Dict[str, float]:
+        """最近若干逻辑帧的延迟统计（毫秒）"""
+        samples = sorted(self._lateness)
+        if not samples:
+            return {"ticks": self.ticks, "dropped": self.dropped_ticks,
+                    "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "ticks": self.ticks,
+            "dropped": self.dropped_ticks,
+            "mean_ms": sum(samples) / len(samples) / 1_000_000,
+            "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)] / 1_000_000,
+            "max_ms": samples[-1] / 1_000_000,
+        }
+
+
+class InputQueue:
+    """一个玩家的按键缓冲
+
+    push() 按到达顺序保存方向和单调时钟时间戳。与前一个按键（队列为空时为下一步方向）相同或相反的按键
+    在它之后也不可能生效，直接忽略；队列已满时丢弃新的按键（计入 dropped）。
+    每个逻辑帧推进前调用 pop()，从队首起依次尝试，第一个被接受的方向在本帧生效。
+    """
+
+    def __init__(self, capacity: int = MAX_BUFFERED_INPUTS, clock: Callable[[], int] = time.perf_counter_ns):
+        self.capacity = capacity
+        self._clock = clock
+        self._entries: Deque[Tuple[Direction, int]] = deque()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def push(self, direction: Direction, next_direction: Direction, length: int) -> bool:
+        """记录一次按键，返回是否进入队列；next_direction 和 length 是蛇当前的下一步方向和长度"""
+        entries = self._entries
+        last = entries[-1][0] if entries else next_direction
+        if direction == last or (length > 1 and is_reverse(last, direction)):
+            return False
+        if len(entries) >= self.capacity:
+            self.dropped += 1
+            return False
+        entries.append((direction, self._clock()))
+        return True
+
+    def pop(self, apply: Callable[[Direction], bool]) -> Optional[Tuple[Direction, int]]:
+        """把队首第一个被 apply 接受的方向用于本帧，返回 (方向, 按键时刻)；没有时返回None"""
+        entries = self._entries
+        while entries:
+            entry = entries.popleft()
+            if apply(entry[0]):
+                return entry
+        return None
+
+    def elapsed_ms(self, pressed_ns: int) -> float:
+        """自按键时刻起经过的毫秒数"""
+        return (self._clock() - pressed_ns) / 1_000_000
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（毫秒）：记录开销是一次二分查找，不保存样本"""
+
+    def __init__(self, bounds_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts: List[int] = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction: float) -> float:
+        """样本所在桶的上界（落在最后一个桶时为最大值）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * fraction))
+        seen = 0
+        for bound, count in zip(self.bounds_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def stats(self) -> Dict[str, object]:
+        """count, mean_ms, p50_ms, p95_ms, max_ms，以及 buckets：各桶上界（最后一个为-1）和计数"""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": [{"le": bound, "count": count}
+                        for bound, count in zip(self.bounds_ms + (-1,), self.counts)],
+        }
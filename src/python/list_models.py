@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+供QML绑定的格子列表模型
+
+蛇身、食物和障碍物都通过 PositionListModel 暴露给QML，
+变化时只发送 rowsInserted / rowsRemoved / dataChanged 通知，
+QML视图据此增量更新，不需要每帧把整个列表复制过Python/QML边界。
+"""
+
+from collections import deque
+from typing import Iterable, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal, Slot, Property, QByteArray
+
+Item = Tuple[int, int, str]
+
+
+class PositionListModel(QAbstractListModel):
+    """格子坐标列表模型，角色: x, y, type"""
+
+    XRole = Qt.UserRole + 1
+    YRole = Qt.UserRole + 2
+    TypeRole = Qt.UserRole + 3
+
+    countChanged = Signal()
+
+    def __init__(self, default_type="normal", parent=None):
+        super().__init__(parent)
+        self._default_type = default_type
+        # deque让蛇头插入和蛇尾移除都是O(1)
+        self._items = deque()
+
+    # QAbstractListModel 接口
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row < 0 or row >= len(self._items):
+            return None
+        x, y, item_type = self._items[row]
+        if role == self.XRole:
+            return x
+        if role == self.YRole:
+            return y
+        if role == self.TypeRole or role == Qt.DisplayRole:
+            return item_type
+        return None
+
+    def roleNames(self):
+        return {
+            self.XRole: QByteArray(b"x"),
+            self.YRole: QByteArray(b"y"),
+            self.TypeRole: QByteArray(b"type"),
+        }
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return len(self._items)
+
+    @Slot(int, result='QVariant')
+    def get(self, row):
+        """返回单行数据（供Canvas等JavaScript代码按需读取）"""
+        if row < 0 or row >= len(self._items):
+            return None
+        x, y, item_type = self._items[row]
+        return {"x": x, "y": y, "type": item_type}
+
+    # Python端修改接口
+    def push_front(self, x: int, y: int, item_type: str = None):
+        """在第0行插入（新蛇头）"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._items.appendleft((x, y, item_type or self._default_type))
+        self.endInsertRows()
+        self.countChanged.emit()
+
+    def pop_back(self):
+        """移除最后一行（蛇尾）"""
+        last = len(self._items) - 1
+        if last < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), last, last)
+        self._items.pop()
+        self.endRemoveRows()
+        self.countChanged.emit()
+
+    def set_items(self, items: Iterable[Item]):
+        """替换全部内容；行数不变时只发送dataChanged，否则重置模型"""
+        items = deque(items)
+        if len(items) == len(self._items):
+            changed = [row for row, item in enumerate(items) if item != self._items[row]]
+            self._items = items
+            if changed:
+                self.dataChanged.emit(self.index(min(changed)), self.index(max(changed)))
+            return
+        self.beginResetModel()
+        self._items = items
+        self.endResetModel()
+        self.countChanged.emit()
+
+    def set_positions(self, positions: Iterable[Tuple[int, int]], item_type: str = None):
+        """用坐标列表替换全部内容"""
+        item_type = item_type or self._default_type
+        self.set_items((x, y, item_type) for x, y in positions)
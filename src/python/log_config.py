@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志配置
+
+每个子系统使用 "snake.<子系统>" 命名的logger（engine / config / app ...），
+调用处使用 %s 占位符延迟格式化；按键、逐帧等热路径只输出DEBUG级别，
+默认INFO级别下这些调用在 isEnabledFor 检查后立即返回。
+
+环境变量:
+    SNAKE_LOG_LEVEL   全局级别，默认 INFO
+    SNAKE_LOG_LEVELS  子系统级别，例如 "engine=DEBUG,config=WARNING"
+    SNAKE_LOG_ASYNC   设为 1 时通过队列在后台线程写出，调用线程只做入队
+"""
+
+import atexit
+import logging
+import os
+import sys
+
+ROOT_LOGGER = "snake"
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener = None
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """返回子系统logger，例如 get_logger("engine") -> snake.engine"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+
+def _parse_subsystem_levels(spec: str):
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level=None, use_queue=None, stream=None, subsystem_levels=None):
+    """配置 snake.* logger，可重复调用（会替换之前的处理器）"""
+    global _listener
+
+    level = level or os.environ.get("SNAKE_LOG_LEVEL", "INFO")
+    if use_queue is None:
+        use_queue = os.environ.get("SNAKE_LOG_ASYNC", "") not in ("", "0")
+    if subsystem_levels is None:
+        subsystem_levels = _parse_subsystem_levels(os.environ.get("SNAKE_LOG_LEVELS", ""))
+
+    shutdown_logging()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    if use_queue:
+        # 调用线程只把记录放入队列，格式化和写出都在监听线程完成
+        # logging.handlers 连带导入 socket / pickle 等，只在需要时导入（缩短启动时间）
+        import queue
+        from logging.handlers import QueueHandler, QueueListener
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root.addHandler(handler)
+
+    for name, sub_level in subsystem_levels.items():
+        get_logger(name).setLevel(sub_level)
+
+    return root
+
+
+def shutdown_logging():
+    """停止后台日志线程并写出队列中剩余的记录"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
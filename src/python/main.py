@@ -4,10 +4,14 @@
 贪吃蛇游戏主程序
 """
 
+import time
+# 启动计时的起点（见 startup.py），在导入 PySide6 之前
+STARTED_NS = time.perf_counter_ns()
+
 import sys
 import os
 from pathlib import Path
-from PySide6.QtCore import QUrl, QObject, Signal, Slot, Property
+from PySide6.QtCore import QUrl, Qt, QTimer
 from PySide6.QtGui import QGuiApplication, QIcon
 from PySide6.QtQml import QQmlApplicationEngine
 
@@ -15,8 +19,12 @@ from PySide6.QtQml import QQmlApplicationEngine
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-from game_engine import GameEngine, register_qml_types
-from config_manager import ConfigManager
+from log_config import get_logger, setup_logging
+from app_container import AppContainer
+from game_engine import register_qml_types
+from startup import FIRST_FRAME_TARGET_MS, FileReadTrace, StartupProfile
+
+logger = get_logger("app")
 
 def get_qml_path():
     """获取QML文件路径，支持开发环境和打包环境"""
@@ -26,13 +34,13 @@ def get_qml_path():
         # PyInstaller打包环境
         base_path = Path(sys._MEIPASS)
         qml_path = base_path / "src" / "qml" / "main.qml"
-        print(f"Running in packaged environment, QML path: {qml_path}")
+        logger.info("Running in packaged environment, QML path: %s", qml_path)
         return qml_path
     else:
         # 开发环境
         current_dir = Path(__file__).parent
         qml_path = current_dir.parent / "qml" / "main.qml"
-        print(f"Running in development environment, QML path: {qml_path}")
+        logger.info("Running in development environment, QML path: %s", qml_path)
         return qml_path
 
 def get_icon_path():
@@ -61,54 +69,53 @@ def get_icon_path():
         # 尝试所有可能的图标路径
         for icon_path in icon_paths:
             if icon_path.exists():
-                print(f"Found application icon: {icon_path}")
+                logger.info("Found application icon: %s", icon_path)
                 return str(icon_path)
         
-        print("Warning: Application icon not found!")
+        logger.warning("Application icon not found")
         return None
     except Exception as e:
-        print(f"Error in get_icon_path: {e}")
+        logger.error("Error in get_icon_path: %s", e)
         return None
 
-class GameInitializer(QObject):
-    """游戏初始化类，确保游戏引擎正确地传递给QML"""
-    
-    def __init__(self, engine, parent=None):
-        super().__init__(parent)
-        self.engine = engine
-        self.game_engine = None
-        self.config_manager = None
-    
-    def initialize(self):
-        """初始化游戏组件并连接到QML"""
-        # 创建配置管理器
-        self.config_manager = ConfigManager()
-        
-        # 创建游戏引擎
-        self.game_engine = GameEngine(self.config_manager)
-        
-        # 注册Python对象到QML
-        self.engine.rootContext().setContextProperty("gameEngine", self.game_engine)
-        self.engine.rootContext().setContextProperty("configManager", self.config_manager)
-        
-        print("Game engine and config manager initialized and registered with QML")
-        return True
+def defer_until_first_frame(window, profile, work):
+    """第一次帧交换之后记录首帧时间，再在事件循环的下一轮执行 work（不阻塞首帧）"""
+    def on_first_frame():
+        window.frameSwapped.disconnect(on_first_frame)
+        elapsed = profile.mark("first frame")
+        if elapsed > FIRST_FRAME_TARGET_MS:
+            logger.warning("First frame after %.0f ms (target %s ms)", elapsed, FIRST_FRAME_TARGET_MS)
+        else:
+            logger.info("First frame after %.0f ms", elapsed)
+        QTimer.singleShot(0, work)
+
+    # 线程化渲染循环在渲染线程中发出 frameSwapped，排队到GUI线程处理
+    window.frameSwapped.connect(on_first_frame, Qt.QueuedConnection)
 
 def main():
-    print("Starting Snake Game...")
+    profile = StartupProfile(STARTED_NS)
+    profile.mark("imports")
+    # SNAKE_STARTUP_REPORT=1 输出启动各阶段耗时，并记录每个数据文件的读取次数
+    report = os.environ.get("SNAKE_STARTUP_REPORT", "") not in ("", "0")
+    reads = FileReadTrace() if report else None
+    if reads is not None:
+        reads.start()
+    setup_logging()
+    logger.info("Starting Snake Game")
     app = QGuiApplication(sys.argv)
+    profile.mark("QGuiApplication")
     
     try:
         # 设置应用图标 - 安全方式，确保错误不会传播
         icon_path = get_icon_path()
         if icon_path:
             try:
-                print(f"Setting application icon: {icon_path}")
+                logger.debug("Setting application icon: %s", icon_path)
                 app.setWindowIcon(QIcon(icon_path))
             except Exception as e:
-                print(f"Error setting window icon: {e}")
+                logger.error("Error setting window icon: %s", e)
     except Exception as e:
-        print(f"Error in icon initialization: {e}")
+        logger.error("Error in icon initialization: %s", e)
     
     # 注册QML类型
     register_qml_types()
@@ -116,46 +123,78 @@ def main():
     # 创建QML引擎
     engine = QQmlApplicationEngine()
     
-    # 创建游戏组件
-    config_manager = ConfigManager()
-    game_engine = GameEngine(config_manager)
+    # 创建游戏组件：每个子系统只有容器中的一个实例
+    container = AppContainer()
+    config_manager = container.config_manager
+    profile.mark("ConfigManager")
+    game_engine = container.game_engine
+    profile.mark("GameEngine")
+    # 退出前写出后台线程中尚未落盘的存档和设置
+    app.aboutToQuit.connect(container.shutdown)
     
     # 获取QML文件路径
     main_qml = get_qml_path()
     
     # 检查QML文件是否存在
     if not main_qml.exists():
-        print(f"Error: QML file not found at {main_qml}")
-        print("Searching for QML files...")
+        logger.error("QML file not found at %s", main_qml)
+        logger.info("Searching for QML files")
         
         # 尝试查找QML文件
         if getattr(sys, 'frozen', False):
             # 在打包环境中搜索
             base_path = Path(sys._MEIPASS)
             for qml_file in base_path.rglob("main.qml"):
-                print(f"Found QML file: {qml_file}")
+                logger.info("Found QML file: %s", qml_file)
                 main_qml = qml_file
                 break
         
         if not main_qml.exists():
-            print("Failed to locate QML file!")
+            logger.critical("Failed to locate QML file")
             return 1
     
     # 注册Python对象到QML（先设置context property）
-    print("Setting context properties...")
-    engine.rootContext().setContextProperty("gameEngine", game_engine)
-    engine.rootContext().setContextProperty("configManager", config_manager)
+    logger.debug("Setting context properties")
+    container.expose_to_qml(engine.rootContext())
     
-    print(f"Loading QML from: {main_qml}")
+    logger.info("Loading QML from: %s", main_qml)
     
     # 加载QML文件
     engine.load(QUrl.fromLocalFile(str(main_qml)))
     
     if not engine.rootObjects():
-        print("Failed to load QML!")
+        logger.critical("Failed to load QML")
         return 1
+    profile.mark("QML load")
+    window = engine.rootObjects()[0]
+    
+    # 存档和成就在首帧之后读取
+    def deferred_init():
+        config_manager.preload_save_data()
+        game_engine.achievements
+        profile.mark("deferred")
+        if reads is not None:
+            reads.stop()
+            files = container.data_files()
+            for path, count in reads.duplicates(files):
+                logger.warning("%s was read %s times during startup", path, count)
+            print(profile.report(), file=sys.stderr)
+            print(reads.report(files), file=sys.stderr, flush=True)
+        if os.environ.get("SNAKE_STARTUP_EXIT", "") not in ("", "0"):
+            app.quit()
+    
+    defer_until_first_frame(window, profile, deferred_init)
+    
+    # 性能计时：SNAKE_PROFILE=1 启动时开启，SNAKE_PROFILE_TRACE=<路径> 退出时写出Chrome trace
+    game_engine.watch_window(window)
+    if os.environ.get("SNAKE_PROFILE", "") not in ("", "0"):
+        game_engine.setProfiling(True)
+    trace_path = os.environ.get("SNAKE_PROFILE_TRACE")
+    if trace_path:
+        game_engine.setProfiling(True)
+        app.aboutToQuit.connect(lambda: game_engine.dumpPerfTrace(trace_path))
     
-    print("Game started successfully!")
+    logger.info("Game started successfully")
     return app.exec()
 
 if __name__ == "__main__":
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多蛇规则核心（不依赖 PySide6）
+
+最多 max_players 条蛇在同一块棋盘上同时移动。所有蛇共享一个按 y*grid_width+x
+索引的占用位图，值为 玩家编号+1（0表示空闲），因此每帧的碰撞检测只与蛇的数量有关，
+与蛇身总长度无关。
+
+同一帧内的冲突按移动前的棋盘统一判定，与蛇的编号顺序无关：
+    撞墙                      "wall"（FREESTYLE 穿越边界）
+    撞到自己                  "self"
+    撞到其它蛇的身体          "snake"（包括头对头交换位置：对方的蛇头在移动前已占用格子）
+    两个蛇头进入同一个格子    "head_on"，双方都死亡
+与单人规则一致，蛇尾在本帧移动之前仍算占用。死亡的蛇身在本帧结束时从棋盘上移除
+（SnakeState.body 保留最后的位置，但不再占用格子）。
+"""
+
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from simulation import (DIRECTION_DELTAS, FOOD_SCORE, Cell, Direction, FreeCellIndex, GameMode,
+                        _board_template, is_reverse)
+
+
+@dataclass
+class SnakeEvent:
+    """一条蛇在这一帧的变化（只包含本帧开始时存活的蛇）"""
+    player: int
+    head: Optional[Cell] = None   # 新蛇头（死亡时为None）
+    tail: Optional[Cell] = None   # 被移除的蛇尾（生长或死亡时为None）
+    ate: bool = False
+    death_reason: Optional[str] = None
+    direction: Optional[Direction] = None  # 本帧的移动方向（死亡时为None）
+
+    @property
+    def died(self) -> bool:
+        return self.death_reason is not None
+
+
+@dataclass
+class MultiStepResult:
+    """一帧的结果"""
+    events: List[SnakeEvent] = field(default_factory=list)
+    eaten: List[Cell] = field(default_factory=list)     # 被吃掉的食物
+    spawned: List[Cell] = field(default_factory=list)   # 新生成的食物
+    removed: List[Cell] = field(default_factory=list)   # 死亡的蛇身释放的格子
+
+
+class SnakeState:
+    """一条蛇的状态
+
+    同时提供 AI 控制器需要的棋盘视图（grid_width / grid_height / wraps / occupied / food），
+    food 为离蛇头最近的食物，contested 为其它蛇下一帧可能进入的格子。
+    """
+
+    __slots__ = ("world", "player", "body", "direction", "next_direction", "growing",
+                 "score", "alive", "death_reason")
+
+    def __init__(self, world: "MultiSnakeSimulation", player: int):
+        self.world = world
+        self.player = player
+        self.body: Deque[Cell] = deque()
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.growing = 0
+        self.score = 0
+        self.alive = True
+        self.death_reason: Optional[str] = None
+
+    @property
+    def grid_width(self) -> int:
+        return self.world.grid_width
+
+    @property
+    def grid_height(self) -> int:
+        return self.world.grid_height
+
+    @property
+    def wraps(self) -> bool:
+        return self.world.wraps
+
+    @property
+    def occupied(self) -> bytearray:
+        return self.world.occupied
+
+    @property
+    def head(self) -> Cell:
+        return self.body[0]
+
+    @property
+    def food(self) -> Optional[Cell]:
+        foods = self.world.foods
+        if not foods:
+            return None
+        x, y = self.body[0]
+        return min(foods, key=lambda cell: abs(cell[0] - x) + abs(cell[1] - y))
+
+    @property
+    def contested(self) -> Set[int]:
+        """其它存活的蛇头下一帧可能进入的格子编号（与它们抢同一格会双双死亡）"""
+        world = self.world
+        width, height = world.grid_width, world.grid_height
+        cells = set()
+        for other in world.snakes:
+            if other is self or not other.alive:
+                continue
+            head_x, head_y = other.body[0]
+            for dx, dy in DIRECTION_DELTAS.values():
+                x, y = head_x + dx, head_y + dy
+                if world.wraps:
+                    x %= width
+                    y %= height
+                elif not (0 <= x < width and 0 <= y < height):
+                    continue
+                cells.add(y * width + x)
+        return cells
+
+    def is_valid_direction(self, direction: Direction) -> bool:
+        """蛇长度小于2时任何方向都有效，否则不能反向移动"""
+        return len(self.body) < 2 or not is_reverse(self.direction, direction)
+
+    def set_direction(self, direction: Direction) -> bool:
+        if self.alive and self.is_valid_direction(direction):
+            self.next_direction = direction
+            return True
+        return False
+
+
+def start_positions(width: int, height: int, count: int) -> List[Tuple[Cell, Direction]]:
+    """各玩家的出生位置和初始方向：分布在四个象限，朝向棋盘内侧"""
+    if count == 1:
+        return [((width // 2, height // 2), Direction.RIGHT)]
+    left, right = width // 4, width - 1 - width // 4
+    top, bottom = height // 4, height - 1 - height // 4
+    return [
+        ((left, top), Direction.RIGHT),
+        ((right, bottom), Direction.LEFT),
+        ((right, top), Direction.DOWN),
+        ((left, bottom), Direction.UP),
+    ][:count]
+
+
+class MultiSnakeSimulation:
+    """多蛇规则引擎，每帧所有存活的蛇同时移动"""
+
+    def __init__(self, grid_width: int = 40, grid_height: int = 25, mode: GameMode = GameMode.MODERN,
+                 players: int = 2, food_count: Optional[int] = None, rng=None):
+        if not 1 <= players <= 4:
+            raise ValueError("players must be between 1 and 4")
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.mode = mode
+        self.wraps = mode == GameMode.FREESTYLE
+        self.rng = rng if rng is not None else random
+        # 默认每条蛇一个食物
+        self.food_count = food_count if food_count is not None else players
+        # 吃掉的食物是否立即补充（客户端预测时为False，新食物以服务端为准）
+        self.respawn_food = True
+        self.snakes = [SnakeState(self, player) for player in range(players)]
+        self.tick = 0
+        self._occupied = bytearray(grid_width * grid_height)
+        self._foods: Dict[int, Cell] = {}
+        self.reset()
+
+    @property
+    def occupied(self) -> bytearray:
+        """占用位图，值为 玩家编号+1，只读使用"""
+        return self._occupied
+
+    @property
+    def foods(self) -> List[Cell]:
+        return list(self._foods.values())
+
+    @property
+    def alive_count(self) -> int:
+        return sum(snake.alive for snake in self.snakes)
+
+    def reset(self):
+        """所有蛇回到出生位置，清空分数并重新生成食物"""
+        width, height = self.grid_width, self.grid_height
+        self.tick = 0
+        self._occupied = occupied = bytearray(width * height)
+        interior, border, is_border = _board_template(width, height)
+        self._free_pools: Tuple[FreeCellIndex, FreeCellIndex] = (interior.copy(), border.copy())
+        self._is_border = is_border
+        self._foods = {}
+        for snake, (cell, direction) in zip(self.snakes, start_positions(width, height, len(self.snakes))):
+            snake.body = deque([cell])
+            snake.direction = snake.next_direction = direction
+            snake.growing = 0
+            snake.score = 0
+            snake.alive = True
+            snake.death_reason = None
+            index = cell[1] * width + cell[0]
+            occupied[index] = snake.player + 1
+            self._free_pools[is_border[index]].discard(index)
+        for _ in range(self.food_count):
+            self._spawn_food()
+
+    def load_state(self, tick: int, snakes: Iterable[Tuple[Iterable[Cell], Direction, int, int, bool]],
+                   foods: Iterable[Cell]):
+        """直接放置所有蛇和食物，snakes 按玩家编号给出 (蛇身, 方向, 待生长, 分数, 存活)
+
+        用于客户端预测：从服务端确认的状态重新开始推进。死亡的蛇不占用格子。
+        """
+        width, height = self.grid_width, self.grid_height
+        self.tick = tick
+        self._occupied = occupied = bytearray(width * height)
+        interior, border, is_border = _board_template(width, height)
+        self._free_pools = pools = (interior.copy(), border.copy())
+        self._is_border = is_border
+        for snake, (body, direction, growing, score, alive) in zip(self.snakes, snakes):
+            snake.body = deque(body)
+            snake.direction = snake.next_direction = direction
+            snake.growing = growing
+            snake.score = score
+            snake.alive = alive
+            snake.death_reason = None
+            if not alive:
+                continue
+            for x, y in snake.body:
+                index = y * width + x
+                occupied[index] = snake.player + 1
+                pools[is_border[index]].discard(index)
+        self._foods = {}
+        for x, y in foods:
+            index = y * width + x
+            self._foods[index] = (x, y)
+            pools[is_border[index]].discard(index)
+
+    def _spawn_food(self) -> Optional[Cell]:
+        """在空闲格子上生成一个食物（优先远离边界），没有空闲格子时返回None"""
+        interior, border = self._free_pools
+        pool = interior if interior else border
+        if not pool:
+            return None
+        index = pool.choice(self.rng)
+        # 食物格子不被占用，但不能再放第二个食物
+        pool.discard(index)
+        cell = (index % self.grid_width, index // self.grid_width)
+        self._foods[index] = cell
+        return cell
+
+    def _release(self, index: int):
+        self._occupied[index] = 0
+        self._free_pools[self._is_border[index]].add(index)
+
+    def step(self) -> MultiStepResult:
+        """所有存活的蛇同时推进一步"""
+        result = MultiStepResult()
+        self.tick += 1
+        width, height = self.grid_width, self.grid_height
+        occupied = self._occupied
+        wraps = self.wraps
+
+        # 第一阶段：按移动前的棋盘判定每条蛇的去向
+        moves = []
+        heads: Dict[int, int] = {}
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            snake.direction = snake.next_direction
+            head_x, head_y = snake.body[0]
+            dx, dy = DIRECTION_DELTAS[snake.direction]
+            x, y = head_x + dx, head_y + dy
+            if wraps:
+                x %= width
+                y %= height
+            elif x < 0 or x >= width or y < 0 or y >= height:
+                moves.append((snake, -1, None, "wall"))
+                continue
+            index = y * width + x
+            owner = occupied[index]
+            if owner:
+                reason = "self" if owner == snake.player + 1 else "snake"
+            else:
+                reason = None
+                heads[index] = heads.get(index, 0) + 1
+            moves.append((snake, index, (x, y), reason))
+
+        # 第二阶段：存活的蛇前进，吃食物或移动蛇尾
+        dead = []
+        pools = self._free_pools
+        is_border = self._is_border
+        for snake, index, cell, reason in moves:
+            event = SnakeEvent(snake.player)
+            result.events.append(event)
+            if reason is None and heads[index] > 1:
+                reason = "head_on"
+            if reason is not None:
+                event.death_reason = reason
+                dead.append((snake, reason))
+                continue
+            event.head = cell
+            event.direction = snake.direction
+            snake.body.appendleft(cell)
+            occupied[index] = snake.player + 1
+            pools[is_border[index]].discard(index)
+            if index in self._foods:
+                del self._foods[index]
+                result.eaten.append(cell)
+                snake.score += FOOD_SCORE
+                snake.growing += 1
+                event.ate = True
+            elif snake.growing > 0:
+                snake.growing -= 1
+            else:
+                event.tail = tail = snake.body.pop()
+                self._release(tail[1] * width + tail[0])
+
+        # 第三阶段：移除死亡的蛇，补充食物
+        for snake, reason in dead:
+            snake.alive = False
+            snake.death_reason = reason
+            for x, y in snake.body:
+                self._release(y * width + x)
+            result.removed.extend(snake.body)
+        for _ in result.eaten if self.respawn_food else ():
+            cell = self._spawn_food()
+            if cell is not None:
+                result.spawned.append(cell)
+        return result
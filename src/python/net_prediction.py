@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+联网对战的客户端预测与和解（不依赖 PySide6）
+
+服务端（net_server.py）是权威的，但等它确认再显示方向变化会让每次按键都慢一个往返。
+ClientPrediction 因此在本地持有一份 MultiSnakeSimulation：
+    input()    方向立即写入预测状态并分配序号，调用者把它发送给服务端
+    advance()  本地时钟每过一个逻辑帧推进一帧（其它蛇按当前方向直线推进）
+    receive()  收到 SNAPSHOT / DELTA 时更新权威状态 WorldState，回到服务端确认的那一帧，
+               丢弃已确认（序号 <= ack）的输入，再按原来的帧号重放未确认的输入，追上本地帧号
+
+输入带有预测时使用的帧号，服务端在该帧之前保留它，因此只要输入按时到达，预测就不需要修正。
+本地帧号领先服务端大约一个往返的帧数：输入迟到（生效帧晚于预测帧）时加大领先，
+服务端报告输入提前多帧到达时减小领先。服务端每帧最多处理每个玩家一个输入，
+因此迟到的输入在重放时也是每帧一个。
+新食物只能由服务端生成，预测中吃掉的食物要等服务端确认后才出现新的。
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+from multi_simulation import MultiSnakeSimulation, MultiStepResult
+from net_protocol import Delta, Snapshot, Welcome, WorldState
+from simulation import Cell, Direction, is_reverse
+
+# 最多领先服务端的帧数（往返时间再长也不继续外推）
+MAX_PREDICTION_TICKS = 8
+# 收到第一个确认之前假定的领先帧数
+INITIAL_LEAD_TICKS = 2
+# 输入在服务端等待超过这么多帧时减小领先
+MAX_INPUT_SLACK = 1
+# 往返时间的平滑系数（与TCP的RTT估计相同）
+RTT_SMOOTHING = 0.125
+
+
+@dataclass
+class PendingInput:
+    """已发送但服务端尚未确认的输入"""
+    seq: int
+    tick: int          # 发送给服务端的生效帧号
+    direction: Direction
+    sent_ns: int
+
+
+@dataclass
+class Reconciliation:
+    """一次和解的结果：需要重新显示的玩家和食物"""
+    changed: List[int] = field(default_factory=list)  # 预测蛇身发生变化的玩家
+    foods_changed: bool = False
+    corrected: bool = False   # 本地蛇在确认帧的位置与当时的预测不同
+
+
+class ClientPrediction:
+    """本地玩家的预测状态"""
+
+    def __init__(self, welcome: Welcome, max_ahead: int = MAX_PREDICTION_TICKS,
+                 clock: Callable[[], int] = time.perf_counter_ns):
+        self.welcome = welcome
+        self.player = welcome.player
+        self.max_ahead = max_ahead
+        self._clock = clock
+        self.world = WorldState()
+        self.sim = MultiSnakeSimulation(welcome.grid_width, welcome.grid_height, welcome.mode,
+                                        players=welcome.seats)
+        self.sim.respawn_food = False
+        self.pending: Deque[PendingInput] = deque()
+        self.seq = 0
+        self.ack = 0
+        self.lead_ticks = INITIAL_LEAD_TICKS
+        self.rtt_ms: Optional[float] = None
+        # 未确认的输入在预测中生效的帧号 -> 方向（迟到的输入顺延，每帧一个）
+        self._schedule: Dict[int, Direction] = {}
+        # 本地蛇头的预测位置（按帧号），用于判断服务端确认时预测是否正确
+        self._predicted_heads: Dict[int, Optional[Cell]] = {}
+        self.reconciles = 0
+        self.corrections = 0
+        self.replayed_ticks = 0
+
+    @property
+    def tick(self) -> int:
+        """预测的帧号"""
+        return self.sim.tick
+
+    @property
+    def ticks_ahead(self) -> int:
+        return self.sim.tick - self.world.tick
+
+    def input(self, direction: Direction) -> Optional[PendingInput]:
+        """记录本地输入并返回要发送的输入（序号、帧号、方向）；与最后一个方向相同或相反时忽略，返回None
+
+        同一帧内的多个输入依次排到之后的帧，与服务端每帧处理一个输入一致。
+        """
+        snake = self.sim.snakes[self.player]
+        if not snake.alive:
+            return None
+        last = self.pending[-1].direction if self.pending else snake.next_direction
+        if direction == last or (len(snake.body) > 1 and is_reverse(last, direction)):
+            return None
+        tick = max(self.sim.tick, max(self._schedule, default=0)) + 1
+        self.seq += 1
+        pending = PendingInput(self.seq, tick, direction, self._clock())
+        self.pending.append(pending)
+        self._schedule[tick] = direction
+        if tick == self.sim.tick + 1:
+            snake.set_direction(direction)
+        return pending
+
+    def advance(self) -> MultiStepResult:
+        """本地推进一帧"""
+        sim = self.sim
+        if sim.tick - self.world.tick >= self.max_ahead:
+            # 太久没有收到服务端消息，停止外推
+            return MultiStepResult()
+        result = self._step()
+        self._predicted_heads[sim.tick] = self._local_head()
+        return result
+
+    def receive(self, message) -> Optional[Reconciliation]:
+        """应用服务端消息并和解；其它消息返回None"""
+        world = self.world
+        if isinstance(message, Snapshot):
+            world.apply_snapshot(message)
+            self.pending.clear()
+            self._schedule.clear()
+            self._predicted_heads.clear()
+            target = world.tick
+        elif isinstance(message, Delta):
+            world.apply_delta(message)
+            self._acknowledge(message)
+            # 本地时钟落后时追上，领先过多时退回
+            target = max(self.sim.tick, world.tick + self.lead_ticks)
+            target = min(target, world.tick + self.lead_ticks + 1, world.tick + self.max_ahead)
+        else:
+            return None
+        return self._reconcile(target)
+
+    def _acknowledge(self, delta: Delta):
+        """丢弃已确认的输入，按最后一个输入实际生效的帧调整领先帧数"""
+        pending = self.pending
+        acked = None
+        while pending and pending[0].seq <= delta.ack:
+            acked = pending.popleft()
+        self.ack = delta.ack
+        if acked is None:
+            return
+        late = delta.tick - acked.tick
+        if late > 0:
+            self.lead_ticks = min(self.max_ahead, self.lead_ticks + late)
+        elif delta.slack > MAX_INPUT_SLACK:
+            self.lead_ticks = max(0, self.lead_ticks - 1)
+        # 扣除输入在服务端等待的时间，近似为网络往返时间
+        sample = (self._clock() - acked.sent_ns) / 1_000_000 - delta.slack * self.welcome.tick_ms
+        sample = max(0.0, sample)
+        self.rtt_ms = sample if self.rtt_ms is None else self.rtt_ms + RTT_SMOOTHING * (sample - self.rtt_ms)
+
+    def _reconcile(self, target: int) -> Reconciliation:
+        """回到服务端确认的帧，重放未确认的输入直到 target 帧"""
+        sim = self.sim
+        world = self.world
+        before = [tuple(snake.body) if snake.alive else () for snake in sim.snakes]
+        foods_before = set(sim.foods)
+        predicted = self._predicted_heads.pop(world.tick, None)
+        for tick in [tick for tick in self._predicted_heads if tick < world.tick]:
+            del self._predicted_heads[tick]
+
+        sim.load_state(world.tick, [
+            (world.bodies[player], world.directions[player], world.growing[player],
+             world.scores[player], world.alive[player]) for player in range(len(sim.snakes))],
+            world.foods)
+        # 仍在途中的输入最早在下一帧生效，之后每帧一个
+        self._schedule = schedule = {}
+        tick = world.tick
+        for pending in self.pending:
+            tick = max(pending.tick, tick + 1)
+            schedule[tick] = pending.direction
+        while sim.tick < target:
+            self._step()
+            self._predicted_heads[sim.tick] = self._local_head()
+            self.replayed_ticks += 1
+
+        self.reconciles += 1
+        outcome = Reconciliation()
+        bodies = world.bodies[self.player]
+        if predicted is not None and predicted != (bodies[0] if bodies else None):
+            outcome.corrected = True
+            self.corrections += 1
+        outcome.changed = [snake.player for snake, body in zip(sim.snakes, before)
+                           if (tuple(snake.body) if snake.alive else ()) != body]
+        outcome.foods_changed = set(sim.foods) != foods_before
+        return outcome
+
+    def _step(self) -> MultiStepResult:
+        sim = self.sim
+        direction = self._schedule.get(sim.tick + 1)
+        if direction is not None:
+            sim.snakes[self.player].set_direction(direction)
+        return sim.step()
+
+    def _local_head(self) -> Optional[Cell]:
+        snake = self.sim.snakes[self.player]
+        return snake.body[0] if snake.alive else None
+
+    def stats(self) -> Dict[str, float]:
+        """预测统计：rtt_ms, ticks_ahead, lead_ticks, pending, reconciles, corrections, replayed_ticks"""
+        return {
+            "rtt_ms": self.rtt_ms or 0.0,
+            "ticks_ahead": self.ticks_ahead,
+            "lead_ticks": self.lead_ticks,
+            "pending": len(self.pending),
+            "reconciles": self.reconciles,
+            "corrections": self.corrections,
+            "replayed_ticks": self.replayed_ticks,
+        }
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+联网对战协议（不依赖 PySide6）
+
+TCP连接上传输长度前缀的二进制帧：<u32 长度><u8 消息类型><正文>，整数均为小端。
+格子用 y*grid_width+x 的 u16 编号表示。
+
+客户端 → 服务端
+    JOIN     <模式 u8><座位数 u8><AI数 u8><AI难度 u8><房间名 utf-8>
+    INPUT    <序号 u32><帧号 u32><方向 u8>           序号由客户端递增，服务端在 DELTA 中确认；
+             帧号为希望生效的帧（客户端预测使用的帧号，0表示尽快），服务端在该帧之前保留输入
+服务端 → 客户端
+    WELCOME  <玩家编号 u8><座位数 u8><模式 u8><宽 u16><高 u16><帧间隔ms u16>
+    SNAPSHOT <帧号 u32><蛇数 u8>{<玩家 u8><存活 u8><方向 u8><待生长 u8><分数 u32><长度 u16><格子 u16...>}
+             <食物数 u8><格子 u16...>
+             新一局开始或加入进行中的房间时发送完整状态
+    DELTA    <帧号 u32><确认序号 u32><提前帧数 u8><事件数 u8>{<玩家 u8><标志 u8><蛇头 u16><蛇尾 u16>}<新食物数 u8><格子 u16...>
+             每帧一个，只包含本帧存活的蛇的蛇头/蛇尾变化和新生成的食物；
+             提前帧数为被确认的输入到达服务端后等待了几帧才生效（客户端据此调整预测领先的帧数）；
+             标志低3位为 吃到食物/移除了蛇尾/死亡，高4位为死亡原因编号（死亡时）或移动方向（存活时）
+"""
+
+import asyncio
+import struct
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from multi_simulation import SnakeEvent
+from simulation import FOOD_SCORE, Cell, Direction, GameMode
+
+FRAME_HEADER = struct.Struct("<I")
+MAX_FRAME_BYTES = 1 << 20
+
+MSG_JOIN = 0x01
+MSG_INPUT = 0x02
+MSG_WELCOME = 0x81
+MSG_SNAPSHOT = 0x82
+MSG_DELTA = 0x83
+
+JOIN = struct.Struct("<BBBBB")
+INPUT = struct.Struct("<BIIB")
+WELCOME = struct.Struct("<BBBBHHH")
+SNAPSHOT_HEADER = struct.Struct("<BIB")
+SNAKE_HEADER = struct.Struct("<BBBBIH")
+DELTA_HEADER = struct.Struct("<BIIB")
+EVENT = struct.Struct("<BBHH")
+
+MODES = tuple(GameMode)
+DIRECTIONS = tuple(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+DEATH_REASONS = (None, "wall", "self", "snake", "head_on")
+
+FLAG_ATE = 0x01
+FLAG_TAIL = 0x02
+FLAG_DIED = 0x04
+
+NO_CELL = 0xFFFF
+
+
+class ProtocolError(ValueError):
+    """收到无法解析的帧"""
+
+
+def frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """读取一帧的正文（含消息类型），连接关闭时返回None"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        (size,) = FRAME_HEADER.unpack(header)
+        if size == 0 or size > MAX_FRAME_BYTES:
+            raise ProtocolError(f"invalid frame size {size}")
+        return await reader.readexactly(size)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+
+
+class FrameBuffer:
+    """从任意切分的字节流中取出完整的帧（供不使用 asyncio 的客户端，如 QTcpSocket）"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """追加收到的字节，返回其中所有完整帧的正文"""
+        buffer = self._buffer
+        buffer += data
+        payloads = []
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            (size,) = FRAME_HEADER.unpack_from(buffer, offset)
+            if size == 0 or size > MAX_FRAME_BYTES:
+                raise ProtocolError(f"invalid frame size {size}")
+            end = offset + FRAME_HEADER.size + size
+            if end > len(buffer):
+                break
+            payloads.append(bytes(buffer[offset + FRAME_HEADER.size:end]))
+            offset = end
+        del buffer[:offset]
+        return payloads
+
+
+def _pack_cells(cells, width: int) -> bytes:
+    return struct.pack(f"<{len(cells)}H", *(y * width + x for x, y in cells))
+
+
+def _unpack_cells(data: bytes, offset: int, count: int, width: int) -> Tuple[List[Cell], int]:
+    end = offset + 2 * count
+    if end > len(data):
+        raise ProtocolError("truncated cell list")
+    indices = struct.unpack_from(f"<{count}H", data, offset)
+    return [(index % width, index // width) for index in indices], end
+
+
+# 客户端 → 服务端
+
+def encode_join(room: str, mode: GameMode = GameMode.MODERN, seats: int = 2,
+                bots: int = 0, bot_difficulty: int = 5) -> bytes:
+    return frame(JOIN.pack(MSG_JOIN, MODES.index(mode), seats, bots, bot_difficulty) + room.encode("utf-8"))
+
+
+def encode_input(seq: int, direction: Direction, tick: int = 0) -> bytes:
+    return frame(INPUT.pack(MSG_INPUT, seq, tick, DIRECTION_INDEX[direction]))
+
+
+@dataclass
+class Join:
+    room: str
+    mode: GameMode
+    seats: int
+    bots: int
+    bot_difficulty: int
+
+
+@dataclass
+class Input:
+    seq: int
+    direction: Direction
+    tick: int = 0            # 希望生效的帧号，0表示尽快
+
+
+# 服务端 → 客户端
+
+@dataclass
+class Welcome:
+    player: int
+    seats: int
+    mode: GameMode
+    grid_width: int
+    grid_height: int
+    tick_ms: int
+
+
+@dataclass
+class SnakeSnapshot:
+    player: int
+    alive: bool
+    score: int
+    body: List[Cell]
+    direction: Direction = Direction.RIGHT
+    growing: int = 0
+
+
+@dataclass
+class Snapshot:
+    tick: int
+    snakes: List[SnakeSnapshot]
+    foods: List[Cell]
+
+
+@dataclass
+class Delta:
+    tick: int
+    ack: int                 # 服务端已处理的该客户端最后一个输入序号
+    slack: int               # 该输入到达后等待了几帧才生效
+    events: List[SnakeEvent]
+    spawned: List[Cell]
+
+
+def encode_welcome(welcome: Welcome) -> bytes:
+    return frame(WELCOME.pack(MSG_WELCOME, welcome.player, welcome.seats, MODES.index(welcome.mode),
+                              welcome.grid_width, welcome.grid_height, welcome.tick_ms))
+
+
+def encode_snapshot(sim) -> bytes:
+    """MultiSnakeSimulation 的完整状态"""
+    width = sim.grid_width
+    parts = [SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, sim.tick, len(sim.snakes))]
+    for snake in sim.snakes:
+        body = snake.body if snake.alive else ()
+        parts.append(SNAKE_HEADER.pack(snake.player, snake.alive, DIRECTION_INDEX[snake.direction],
+                                       min(255, snake.growing), snake.score, len(body)))
+        parts.append(_pack_cells(body, width))
+    foods = sim.foods
+    parts.append(bytes((len(foods),)))
+    parts.append(_pack_cells(foods, width))
+    return frame(b"".join(parts))
+
+
+def encode_delta_body(result, width: int) -> bytes:
+    """一帧的事件和新食物（所有客户端共用，见 encode_delta）"""
+    events = result.events
+    parts = [bytes((len(events),))]
+    for event in events:
+        flags = 0
+        head = tail = NO_CELL
+        if event.death_reason is not None:
+            flags = FLAG_DIED | DEATH_REASONS.index(event.death_reason) << 4
+        else:
+            head = event.head[1] * width + event.head[0]
+            flags = DIRECTION_INDEX[event.direction] << 4
+            if event.ate:
+                flags |= FLAG_ATE
+            if event.tail is not None:
+                flags |= FLAG_TAIL
+                tail = event.tail[1] * width + event.tail[0]
+        parts.append(EVENT.pack(event.player, flags, head, tail))
+    parts.append(bytes((len(result.spawned),)))
+    parts.append(_pack_cells(result.spawned, width))
+    return b"".join(parts)
+
+
+def encode_delta(tick: int, ack: int, body: bytes, slack: int = 0) -> bytes:
+    """为某个客户端加上帧号、确认序号和该输入等待的帧数"""
+    header = DELTA_HEADER.pack(MSG_DELTA, tick, ack, min(255, slack))
+    return FRAME_HEADER.pack(DELTA_HEADER.size + len(body)) + header + body
+
+
+def decode_client_message(payload: bytes):
+    kind = payload[0]
+    try:
+        if kind == MSG_JOIN:
+            _, mode, seats, bots, difficulty = JOIN.unpack_from(payload)
+            if mode >= len(MODES):
+                raise ProtocolError("invalid mode")
+            return Join(payload[JOIN.size:].decode("utf-8"), MODES[mode], seats, bots, difficulty)
+        if kind == MSG_INPUT:
+            _, seq, tick, direction = INPUT.unpack(payload)
+            if direction >= len(DIRECTIONS):
+                raise ProtocolError("invalid direction")
+            return Input(seq, DIRECTIONS[direction], tick)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(str(e)) from None
+    raise ProtocolError(f"unknown message type {kind:#x}")
+
+
+def decode_server_message(payload: bytes, width: int = 0):
+    """解码服务端消息；SNAPSHOT 和 DELTA 需要 WELCOME 中的网格宽度"""
+    if not payload:
+        raise ProtocolError("empty message")
+    kind = payload[0]
+    if kind in (MSG_SNAPSHOT, MSG_DELTA) and width <= 0:
+        raise ProtocolError("expected WELCOME")
+    try:
+        if kind == MSG_WELCOME:
+            _, player, seats, mode, grid_width, grid_height, tick_ms = WELCOME.unpack(payload)
+            return Welcome(player, seats, MODES[mode], grid_width, grid_height, tick_ms)
+        if kind == MSG_SNAPSHOT:
+            _, tick, count = SNAPSHOT_HEADER.unpack_from(payload)
+            offset = SNAPSHOT_HEADER.size
+            snakes = []
+            for _ in range(count):
+                player, alive, direction, growing, score, length = SNAKE_HEADER.unpack_from(payload, offset)
+                body, offset = _unpack_cells(payload, offset + SNAKE_HEADER.size, length, width)
+                snakes.append(SnakeSnapshot(player, bool(alive), score, body, DIRECTIONS[direction], growing))
+            foods, _ = _unpack_cells(payload, offset + 1, payload[offset], width)
+            return Snapshot(tick, snakes, foods)
+        if kind == MSG_DELTA:
+            _, tick, ack, slack = DELTA_HEADER.unpack_from(payload)
+            count = payload[DELTA_HEADER.size]
+            offset = DELTA_HEADER.size + 1
+            events = []
+            for _ in range(count):
+                player, flags, head, tail = EVENT.unpack_from(payload, offset)
+                offset += EVENT.size
+                event = SnakeEvent(player)
+                if flags & FLAG_DIED:
+                    event.death_reason = DEATH_REASONS[flags >> 4]
+                else:
+                    event.head = (head % width, head // width)
+                    event.direction = DIRECTIONS[flags >> 4]
+                    event.ate = bool(flags & FLAG_ATE)
+                    if flags & FLAG_TAIL:
+                        event.tail = (tail % width, tail // width)
+                events.append(event)
+            spawned, _ = _unpack_cells(payload, offset + 1, payload[offset], width)
+            return Delta(tick, ack, slack, events, spawned)
+    except (struct.error, IndexError) as e:
+        raise ProtocolError(str(e)) from None
+    raise ProtocolError(f"unknown message type {kind:#x}")
+
+
+@dataclass
+class WorldState:
+    """客户端根据 SNAPSHOT / DELTA 重建的权威状态"""
+    tick: int = 0
+    bodies: Dict[int, Deque[Cell]] = field(default_factory=dict)
+    alive: Dict[int, bool] = field(default_factory=dict)
+    scores: Dict[int, int] = field(default_factory=dict)
+    foods: Set[Cell] = field(default_factory=set)
+    directions: Dict[int, Direction] = field(default_factory=dict)
+    growing: Dict[int, int] = field(default_factory=dict)
+
+    def apply_snapshot(self, snapshot: Snapshot):
+        self.tick = snapshot.tick
+        self.bodies = {snake.player: deque(snake.body) for snake in snapshot.snakes}
+        self.alive = {snake.player: snake.alive for snake in snapshot.snakes}
+        self.scores = {snake.player: snake.score for snake in snapshot.snakes}
+        self.foods = set(snapshot.foods)
+        self.directions = {snake.player: snake.direction for snake in snapshot.snakes}
+        self.growing = {snake.player: snake.growing for snake in snapshot.snakes}
+
+    def apply_delta(self, delta: Delta):
+        self.tick = delta.tick
+        for event in delta.events:
+            body = self.bodies[event.player]
+            if event.death_reason is not None:
+                self.alive[event.player] = False
+                body.clear()
+                continue
+            body.appendleft(event.head)
+            self.directions[event.player] = event.direction
+            if event.ate:
+                self.foods.discard(event.head)
+                self.scores[event.player] += FOOD_SCORE
+                self.growing[event.player] += 1
+            elif event.tail is not None:
+                body.pop()
+            else:
+                self.growing[event.player] -= 1
+        self.foods.update(delta.spawned)
+
+
+class GameClient:
+    """asyncio客户端：加入房间、发送方向、接收并应用服务端消息"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.welcome: Optional[Welcome] = None
+        self.world = WorldState()
+        self.seq = 0
+        self.ack = 0
+        self.bytes_received = 0
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "GameClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def join(self, room: str, mode: GameMode = GameMode.MODERN, seats: int = 2,
+                   bots: int = 0, bot_difficulty: int = 5) -> Welcome:
+        self.writer.write(encode_join(room, mode, seats, bots, bot_difficulty))
+        message = await self.receive()
+        if not isinstance(message, Welcome):
+            raise ProtocolError("expected WELCOME")
+        return message
+
+    def send_input(self, direction: Direction, tick: int = 0) -> int:
+        """发送方向（tick 为希望生效的帧号），返回该输入的序号"""
+        self.seq += 1
+        self.writer.write(encode_input(self.seq, direction, tick))
+        return self.seq
+
+    async def receive(self):
+        """读取并应用下一条消息，连接关闭时返回None"""
+        payload = await read_frame(self.reader)
+        if payload is None:
+            return None
+        self.bytes_received += FRAME_HEADER.size + len(payload)
+        width = self.welcome.grid_width if self.welcome else 0
+        message = decode_server_message(payload, width)
+        if isinstance(message, Welcome):
+            self.welcome = message
+        elif isinstance(message, Snapshot):
+            self.world.apply_snapshot(message)
+        elif isinstance(message, Delta):
+            self.world.apply_delta(message)
+            self.ack = message.ack
+        return message
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+权威联网对战服务器（asyncio，不依赖 PySide6）
+
+每个房间持有一个 MultiSnakeSimulation，以固定帧间隔推进；客户端只发送方向输入（见 net_protocol.py），
+服务端每帧把蛇头/蛇尾变化和食物事件编码成一个二进制 DELTA，所有客户端共用同一份正文，
+只有确认序号不同。新一局开始或中途加入时才发送完整的 SNAPSHOT。
+
+房间由第一个加入的客户端按 JOIN 中的参数创建：seats 个座位中后 bots 个由 AI 控制，
+其余座位坐满后开始推进（MULTIPLAYER_LOBBY → 对局）；所有键盘玩家死亡后等待
+RESTART_DELAY_MS 重新开始一局，所有客户端断开后房间关闭。一个进程可以同时运行很多房间。
+
+用法: python src/python/net_server.py [--host H] [--port P] [--tick-ms N]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, Optional, Tuple
+
+from log_config import get_logger, setup_logging
+from multi_simulation import MultiSnakeSimulation
+from net_protocol import (Input, Join, ProtocolError, Welcome, decode_client_message, encode_delta,
+                          encode_delta_body, encode_snapshot, encode_welcome, read_frame)
+from replay import new_seed
+from simulation import Direction, grid_size_for_mode
+from snake_ai import SquadPilot
+
+logger = get_logger("net")
+
+DEFAULT_TICK_MS = 100
+RESTART_DELAY_MS = 1000
+# 每个客户端最多排队的输入数，超出时丢弃最早的
+MAX_QUEUED_INPUTS = 8
+# 输入指定的帧号最多比当前帧晚这么多帧，更晚的（例如上一局遗留的）立即生效
+MAX_INPUT_LEAD = 16
+# 发送缓冲超过这个大小的客户端视为跟不上，断开连接
+MAX_WRITE_BUFFER = 256 * 1024
+
+
+@dataclass
+class RoomStats:
+    """房间的推进耗时和发送量"""
+    ticks: int = 0
+    tick_ns: int = 0
+    max_tick_ns: int = 0
+    bytes_out: int = 0
+    frames_out: int = 0
+
+    @property
+    def mean_tick_us(self) -> float:
+        return self.tick_ns / self.ticks / 1000 if self.ticks else 0.0
+
+
+class ClientConnection:
+    """一个已连接的客户端"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.room: Optional["Room"] = None
+        self.player = -1
+        # (序号, 希望生效的帧号, 方向, 到达时的帧号)
+        self.inputs: Deque[Tuple[int, int, Direction, int]] = deque(maxlen=MAX_QUEUED_INPUTS)
+        self.ack = 0
+        self.slack = 0
+
+    def send(self, data: bytes) -> int:
+        if self.writer.is_closing():
+            return 0
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            logger.warning("Dropping slow client in room %s (player %s)", self.room and self.room.name, self.player)
+            self.writer.close()
+            return 0
+        self.writer.write(data)
+        return len(data)
+
+
+class Room:
+    """一个房间：权威模拟、座位和固定步长推进任务"""
+
+    def __init__(self, name: str, join: Join, tick_ms: int, seed: int):
+        seats = max(1, min(4, join.seats))
+        bots = max(0, min(seats - 1, join.bots))
+        width, height = grid_size_for_mode(join.mode)
+        self.name = name
+        self.mode = join.mode
+        self.seats = seats
+        self.humans = seats - bots
+        self.tick_ms = tick_ms
+        self.seed = seed
+        self.sim = MultiSnakeSimulation(width, height, join.mode, players=seats, rng=random.Random(seed))
+        self.squad = SquadPilot(self.sim, {player: join.bot_difficulty for player in range(self.humans, seats)})
+        self.clients: Dict[int, ClientConnection] = {}
+        self.stats = RoomStats()
+        self.started = False
+        self._restart_in = -1
+        self._task: Optional[asyncio.Task] = None
+
+    def add_client(self, conn: ClientConnection) -> bool:
+        """分配一个空闲的键盘玩家座位，没有空位时返回False"""
+        free = [player for player in range(self.humans) if player not in self.clients]
+        if not free:
+            return False
+        conn.room = self
+        conn.player = free[0]
+        self.clients[conn.player] = conn
+        conn.send(encode_welcome(Welcome(conn.player, self.seats, self.mode, self.sim.grid_width,
+                                         self.sim.grid_height, self.tick_ms)))
+        conn.send(encode_snapshot(self.sim))
+        if not self.started and len(self.clients) == self.humans:
+            self.started = True
+            self._task = asyncio.get_running_loop().create_task(self.run())
+            logger.info("Room %s started with %s players (%s AI)", self.name, self.seats, self.seats - self.humans)
+        return True
+
+    def remove_client(self, conn: ClientConnection):
+        if self.clients.get(conn.player) is conn:
+            del self.clients[conn.player]
+
+    @property
+    def closed(self) -> bool:
+        return not self.clients
+
+    async def run(self):
+        """固定步长推进；落后超过一帧时放弃追赶，避免积压"""
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000
+        deadline = loop.time()
+        while self.clients:
+            self.tick()
+            deadline += interval
+            delay = deadline - loop.time()
+            if delay < -interval:
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0.0, delay))
+        logger.info("Room %s closed after %s ticks", self.name, self.stats.ticks)
+
+    def tick(self):
+        """推进一帧并广播增量"""
+        start = time.perf_counter_ns()
+        sim = self.sim
+        if self._restart_in == 0:
+            self._restart()
+        elif self._restart_in > 0:
+            self._restart_in -= 1
+
+        # 每个玩家每帧最多处理一个输入；客户端预测的帧号未到时继续保留
+        next_tick = sim.tick + 1
+        for player, conn in self.clients.items():
+            if conn.inputs:
+                seq, tick, direction, arrived = conn.inputs[0]
+                if tick <= next_tick or tick > next_tick + MAX_INPUT_LEAD:
+                    conn.inputs.popleft()
+                    sim.snakes[player].set_direction(direction)
+                    conn.ack = seq
+                    conn.slack = max(0, next_tick - arrived - 1)
+        self.squad.steer()
+        result = sim.step()
+        self.squad.observe(result)
+
+        body = encode_delta_body(result, sim.grid_width)
+        stats = self.stats
+        for conn in list(self.clients.values()):
+            stats.bytes_out += conn.send(encode_delta(sim.tick, conn.ack, body, conn.slack))
+            stats.frames_out += 1
+
+        if self._restart_in < 0 and not any(sim.snakes[player].alive for player in range(self.humans)):
+            self._restart_in = max(0, RESTART_DELAY_MS // self.tick_ms)
+
+        elapsed = time.perf_counter_ns() - start
+        stats.ticks += 1
+        stats.tick_ns += elapsed
+        stats.max_tick_ns = max(stats.max_tick_ns, elapsed)
+
+    def _restart(self):
+        self._restart_in = -1
+        self.sim.reset()
+        self.squad.reset()
+        snapshot = encode_snapshot(self.sim)
+        for conn in self.clients.values():
+            conn.inputs.clear()
+            self.stats.bytes_out += conn.send(snapshot)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+class GameServer:
+    """接受TCP连接并按房间名分配到 Room"""
+
+    def __init__(self, tick_ms: int = DEFAULT_TICK_MS, seed: Optional[int] = None):
+        self.tick_ms = tick_ms
+        self.rooms: Dict[str, Room] = {}
+        self._seed = seed
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+        self._handlers = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """开始监听（port=0 时由系统分配端口，见 address）"""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        logger.info("Game server listening on %s:%s", *self.address)
+        return self
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+        for room in list(self.rooms.values()):
+            await room.stop()
+        self.rooms.clear()
+        # 关闭连接后等待处理协程自然结束，不在事件循环关闭时被取消
+        for conn in list(self._connections):
+            conn.writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def stats(self) -> Dict[str, dict]:
+        """各房间的统计：ticks, mean_tick_us, max_tick_us, bytes_out, bytes_per_tick"""
+        report = {}
+        for name, room in self.rooms.items():
+            stats = room.stats
+            report[name] = dict(asdict(stats), mean_tick_us=stats.mean_tick_us,
+                                max_tick_us=stats.max_tick_ns / 1000, clients=len(room.clients),
+                                bytes_per_tick=stats.bytes_out / stats.ticks if stats.ticks else 0.0)
+        return report
+
+    def _room_seed(self) -> int:
+        if self._seed is None:
+            return new_seed()
+        self._seed += 1
+        return self._seed
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        conn = ClientConnection(writer)
+        self._connections.add(conn)
+        self._handlers.add(asyncio.current_task())
+        try:
+            payload = await read_frame(reader)
+            if payload is None:
+                return
+            join = decode_client_message(payload)
+            if not isinstance(join, Join):
+                raise ProtocolError("expected JOIN")
+            room = self.rooms.get(join.room)
+            if room is None or room.closed:
+                room = self.rooms[join.room] = Room(join.room, join, self.tick_ms, self._room_seed())
+            if not room.add_client(conn):
+                logger.info("Room %s is full", join.room)
+                return
+            while True:
+                payload = await read_frame(reader)
+                if payload is None:
+                    break
+                message = decode_client_message(payload)
+                if isinstance(message, Input):
+                    conn.inputs.append((message.seq, message.tick, message.direction, room.sim.tick))
+        except ProtocolError as e:
+            logger.warning("Protocol error from %s: %s", writer.get_extra_info("peername"), e)
+        finally:
+            self._connections.discard(conn)
+            self._handlers.discard(asyncio.current_task())
+            room = conn.room
+            if room is not None:
+                room.remove_client(conn)
+                if room.closed and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+            writer.close()
+
+
+async def serve(host: str, port: int, tick_ms: int, stats_interval: float):
+    server = await GameServer(tick_ms).start(host, port)
+    try:
+        while True:
+            await asyncio.sleep(stats_interval)
+            for name, stats in server.stats().items():
+                logger.info("Room %s: %s ticks, %.1f us/tick (max %.1f), %.0f bytes/tick",
+                            name, stats["ticks"], stats["mean_tick_us"], stats["max_tick_us"],
+                            stats["bytes_per_tick"])
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="联网对战服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--tick-ms", type=int, default=DEFAULT_TICK_MS)
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="输出房间统计的间隔（秒）")
+    args = parser.parse_args(argv)
+    setup_logging()
+    try:
+        asyncio.run(serve(args.host, args.port, args.tick_ms, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台持久化（不依赖 PySide6）
+
+WriteBehindWriter 在调用线程只登记“某个文件需要重写”，真正的序列化和写盘在
+工作线程完成。同一文件在合并窗口内的多次修改只写一次；写入先落到同目录的临时文件，
+再用 os.replace 原子替换，崩溃时不会留下写了一半的存档。
+"""
+
+import atexit
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, Tuple, Union
+
+from log_config import get_logger
+
+logger = get_logger("persistence")
+
+Payload = Union[str, bytes]
+
+_writers = weakref.WeakSet()
+
+
+def _read_umask() -> int:
+    # 只能通过设置来读取，在导入时（还没有写盘线程）读一次
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def _target_mode(path: Path) -> int:
+    """替换后的文件权限：沿用已有文件的权限，新文件与 open() 创建时相同（0o666 & ~umask）"""
+    try:
+        return path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path, data: Payload, fsync: bool = True):
+    """写入临时文件后原子替换目标文件，保留目标文件的权限"""
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp 以 0600 创建临时文件，替换后目标文件会变成只有所有者可读
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _target_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindWriter:
+    """合并写入的后台写盘线程
+
+    schedule(path, render) 登记一次写入：render 在工作线程中调用并返回文件内容，
+    因此调用方只需保证 render 读取数据时的线程安全（例如持有同一把锁）。
+    第一次登记后经过 delay 秒写盘，窗口内的后续登记只替换 render，不推迟写盘时间。
+    """
+
+    def __init__(self, delay: float = 0.5, fsync: bool = True, name: str = "write-behind"):
+        self.delay = max(0.0, delay)
+        self.fsync = fsync
+        self.writes = 0
+        self.coalesced = 0
+        self._pending: Dict[str, Tuple[float, Callable[[], Payload]]] = {}
+        self._writing = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        _writers.add(self)
+
+    def schedule(self, path, render: Callable[[], Payload]):
+        """登记一次写入，立即返回"""
+        key = str(path)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindWriter is closed")
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = (time.monotonic() + self.delay, render)
+                self._cond.notify()
+            else:
+                self._pending[key] = (entry[0], render)
+                self.coalesced += 1
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending) + self._writing
+
+    def flush(self, timeout: float = None) -> bool:
+        """立即写出所有待写文件并等待完成，返回是否在超时前完成"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._pending = {key: (0.0, render) for key, (_, render) in self._pending.items()}
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = None):
+        """写出剩余内容并停止工作线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed and not self._pending:
+                        return
+                    now = time.monotonic()
+                    due = [key for key, (when, _) in self._pending.items() if when <= now]
+                    if due:
+                        break
+                    if self._pending:
+                        self._cond.wait(min(when for when, _ in self._pending.values()) - now)
+                    else:
+                        self._cond.wait()
+                jobs = [(key, self._pending.pop(key)[1]) for key in due]
+                self._writing = len(jobs)
+
+            for key, render in jobs:
+                try:
+                    atomic_write(key, render(), self.fsync)
+                    self.writes += 1
+                    logger.debug("保存成功: %s", key)
+                except Exception:
+                    logger.exception("后台写入失败: %s", key)
+
+            with self._cond:
+                self._writing = 0
+                self._cond.notify_all()
+
+
+def _flush_all():
+    for writer in list(_writers):
+        writer.close(timeout=5.0)
+
+
+atexit.register(_flush_all)
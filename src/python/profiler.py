@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段性能计时（不依赖 PySide6）
+
+PhaseProfiler 为每个阶段保存最近 capacity 次的 (开始时刻, 耗时)，存放在固定长度的环形缓冲中，
+stats() 给出每个阶段的耗时统计，chrome_trace() 导出 Chrome trace（chrome://tracing、Perfetto）格式。
+
+引擎中的阶段：
+    frame     一个渲染帧的定时器回调（包含其中的全部逻辑帧）
+    ai        按键缓冲和AI转向
+    simulate  规则推进（碰撞检测是占用位图上的一次查表，包含在内）
+    spawn     生成食物（包含在 simulate 内）
+    signals   更新列表模型并发送信号
+    reconcile 联网对战收到服务端消息后的和解
+    paint     QML Canvas 的 onPaint
+    render    场景图渲染（渲染线程）
+
+render 阶段在渲染线程中记录，读写环形缓冲都持有同一把锁，stats() 和 chrome_trace() 在锁内复制样本后再计算。
+关闭时调用方只检查一次 enabled，不产生其它开销；instrument() 用实例属性包装方法，
+uninstrument() 删除实例属性后恢复为类上的原方法。计时器只保存被包装对象的弱引用，
+不会让调用方已经替换掉的对象继续存活。
+"""
+
+import functools
+import json
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+# 每个阶段保存的最近样本数
+PROFILE_CAPACITY = 2048
+# 固定顺序，未出现过的阶段不输出
+PHASES = ("frame", "ai", "simulate", "spawn", "signals", "reconcile", "paint", "render")
+
+
+class PhaseProfiler:
+    """分阶段计时器"""
+
+    def __init__(self, capacity: int = PROFILE_CAPACITY, clock: Callable[[], int] = time.perf_counter_ns):
+        self.capacity = capacity
+        self.clock = clock
+        self.enabled = False
+        self._rings: Dict[str, Deque[Tuple[int, int, int]]] = {}
+        self._open: Dict[str, int] = {}
+        self._instrumented: List[Tuple[weakref.ref, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, phase: str, start_ns: int, end_ns: int):
+        """记录一次 [start_ns, end_ns) 的阶段耗时"""
+        sample = (start_ns, end_ns - start_ns, threading.get_ident())
+        with self._lock:
+            ring = self._rings.get(phase)
+            if ring is None:
+                ring = self._rings[phase] = deque(maxlen=self.capacity)
+            ring.append(sample)
+
+    def lap(self, phase: str, start_ns: int) -> int:
+        """记录从 start_ns 到现在的阶段耗时，返回现在的时刻，作为下一个阶段的开始"""
+        now = self.clock()
+        self.record(phase, start_ns, now)
+        return now
+
+    def begin(self, phase: str):
+        """开始一个跨调用的阶段（例如QML中的onPaint），由 end() 结束"""
+        self._open[phase] = self.clock()
+
+    def end(self, phase: str):
+        start = self._open.pop(phase, None)
+        if start is not None:
+            self.record(phase, start, self.clock())
+
+    def instrument(self, obj, name: str, phase: str):
+        """用计时包装 obj.name，直到 uninstrument()"""
+        # 通过类上的函数调用，包装函数不持有绑定方法，obj 不会因为自己的实例属性而多一个引用环
+        function = getattr(type(obj), name)
+        ref = weakref.ref(obj)
+        record = self.record
+        clock = self.clock
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(ref(), *args, **kwargs)
+            finally:
+                record(phase, start, clock())
+
+        setattr(obj, name, timed)
+        self._instrumented = [(other, other_name) for other, other_name in self._instrumented
+                              if other() is not None]
+        self._instrumented.append((ref, name))
+
+    def uninstrument(self, obj=None):
+        """恢复 obj（默认为全部）被包装的方法"""
+        remaining = []
+        for ref, name in self._instrumented:
+            target = ref()
+            if target is None:
+                continue
+            if obj is not None and target is not obj:
+                remaining.append((ref, name))
+                continue
+            try:
+                delattr(target, name)
+            except AttributeError:
+                pass
+        self._instrumented = remaining
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+            self._open.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """每个阶段最近样本的统计：count, mean_ms, p50_ms, p95_ms, max_ms, total_ms"""
+        stats = {}
+        for phase, samples in self._samples():
+            durations = sorted(duration for _, duration, _ in samples)
+            count = len(durations)
+            total = sum(durations)
+            stats[phase] = {
+                "count": count,
+                "mean_ms": total / count / 1_000_000,
+                "p50_ms": durations[count // 2] / 1_000_000,
+                "p95_ms": durations[max(0, int(count * 0.95) - 1)] / 1_000_000,
+                "max_ms": durations[-1] / 1_000_000,
+                "total_ms": total / 1_000_000,
+            }
+        return stats
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace 事件格式：每个样本一个完整事件（ph="X"），时间单位为微秒"""
+        events = []
+        threads = {}
+        for phase, samples in self._samples():
+            for start, duration, thread in samples:
+                tid = threads.setdefault(thread, len(threads) + 1)
+                events.append({"name": phase, "cat": "engine", "ph": "X", "pid": 1, "tid": tid,
+                               "ts": start / 1000, "dur": duration / 1000})
+        events.sort(key=lambda event: (event["ts"], -event["dur"]))
+        main_thread = threading.main_thread().ident
+        for thread, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                           "args": {"name": "main" if thread == main_thread else f"thread-{tid}"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path: str) -> int:
+        """写出 Chrome trace JSON，返回事件数"""
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return len(trace["traceEvents"])
+
+    def _samples(self) -> List[Tuple[str, List[Tuple[int, int, int]]]]:
+        """按固定顺序复制每个阶段的样本（渲染线程可能同时在记录）"""
+        with self._lock:
+            rings = {phase: list(ring) for phase, ring in self._rings.items() if ring}
+        known = [phase for phase in PHASES if phase in rings]
+        ordered = known + sorted(phase for phase in rings if phase not in PHASES)
+        return [(phase, rings[phase]) for phase in ordered]
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可复现的回放（不依赖 PySide6）
+
+一局游戏由 种子 + 模式 + 难度 + 网格尺寸 + 每帧实际采用的方向 完全决定：
+食物位置只取决于随机数生成器，因此回放中不需要保存任何棋盘状态。
+
+方向日志按游程编码：每段 (方向, 连续帧数) 写成一个LEB128变长整数，
+低2位是方向编号，其余位是 帧数-1。蛇大部分时间直线前进，一局几千帧通常只需要几百字节。
+每段至少一帧，因此段数不超过帧数；段数更多的日志在 from_bytes() 中就被拒绝，不会被解码。
+
+文件格式（小端）:
+    头部  magic "SNRP", 版本, 模式, 难度, 宽, 高, 种子, 帧数, 分数, 死亡原因
+    正文  游程编码的方向日志
+"""
+
+import random
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from simulation import DEATH_REASONS, Direction, GameMode, SnakeSimulation, grid_size_for_mode
+
+REPLAY_MAGIC = b"SNRP"
+REPLAY_VERSION = 1
+HEADER = struct.Struct("<4sBBBHHQIIB")
+
+MODES = tuple(GameMode)
+DIRECTIONS = tuple(Direction)
+DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+# 回放播放时每隔多少帧保存一个关键帧，用于快速跳转
+DEFAULT_KEYFRAME_INTERVAL = 1000
+
+# 帧数是u32，一段的编码值小于 2**34，最多5个字节
+MAX_RUN_BYTES = 5
+_CONTINUATION_BYTES = bytes(range(0x80, 0x100))
+
+Run = Tuple[Direction, int]
+
+_system_random = random.SystemRandom()
+
+
+class ReplayError(ValueError):
+    """回放数据损坏，或与规则不一致（例如记录了反向移动）"""
+
+
+def new_seed() -> int:
+    """生成新对局的随机种子（31位，可直接作为QML整数属性）"""
+    return _system_random.getrandbits(31)
+
+
+def encode_runs(runs: List[Run]) -> bytes:
+    data = bytearray()
+    for direction, count in runs:
+        value = DIRECTION_INDEX[direction] | (count - 1) << 2
+        while value >= 0x80:
+            data.append((value & 0x7F) | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def read_run(data: bytes, pos: int) -> Tuple[Run, int]:
+    """解码从 pos 开始的一段，返回 (游程, 下一段的位置)"""
+    value = shift = 0
+    for end in range(pos, min(len(data), pos + MAX_RUN_BYTES)):
+        byte = data[end]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return (DIRECTIONS[value & 3], (value >> 2) + 1), end + 1
+        shift += 7
+    raise ReplayError("truncated direction log" if len(data) - pos < MAX_RUN_BYTES else "run too long")
+
+
+def decode_runs(data: bytes) -> Iterator[Run]:
+    pos = 0
+    while pos < len(data):
+        run, pos = read_run(data, pos)
+        yield run
+
+
+def count_runs(data: bytes) -> int:
+    """日志中的段数（每段以一个最高位为0的字节结束）"""
+    return len(data.translate(None, _CONTINUATION_BYTES))
+
+
+@dataclass(frozen=True)
+class Replay:
+    """一局游戏的完整回放"""
+    seed: int
+    mode: GameMode
+    difficulty: int
+    grid_width: int
+    grid_height: int
+    ticks: int                   # 推进的逻辑帧数（含死亡的那一帧）
+    runs: bytes                  # 游程编码的方向日志
+    score: int = 0
+    death_reason: Optional[str] = None
+
+    def directions(self) -> Iterator[Run]:
+        return decode_runs(self.runs)
+
+    def to_bytes(self) -> bytes:
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, MODES.index(self.mode), self.difficulty,
+                             self.grid_width, self.grid_height, self.seed, self.ticks, self.score,
+                             DEATH_REASONS.index(self.death_reason))
+        return header + self.runs
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        if len(data) < HEADER.size:
+            raise ReplayError("replay too short")
+        (magic, version, mode, difficulty, width, height,
+         seed, ticks, score, reason) = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ReplayError("unsupported replay format")
+        if mode >= len(MODES) or reason >= len(DEATH_REASONS):
+            raise ReplayError("invalid replay header")
+        body = len(data) - HEADER.size
+        # 先用字节数排除明显过长的日志，再数段数，都不需要解码
+        if body > ticks * MAX_RUN_BYTES or count_runs(data[HEADER.size:]) > ticks:
+            raise ReplayError("direction log longer than the replay")
+        return cls(seed, MODES[mode], difficulty, width, height, ticks,
+                   bytes(data[HEADER.size:]), score, DEATH_REASONS[reason])
+
+
+class ReplayRecorder:
+    """逐帧记录实际采用的方向"""
+
+    def __init__(self, seed: int, mode: GameMode, difficulty: int,
+                 grid_width: Optional[int] = None, grid_height: Optional[int] = None):
+        default_width, default_height = grid_size_for_mode(mode)
+        self.seed = seed
+        self.mode = mode
+        self.difficulty = difficulty
+        self.grid_width = grid_width or default_width
+        self.grid_height = grid_height or default_height
+        self.ticks = 0
+        self._runs: List[Run] = []
+        self._direction: Optional[Direction] = None
+        self._count = 0
+
+    def record(self, direction: Direction):
+        """记录一帧，在 SnakeSimulation.step() 之后以 sim.direction 调用"""
+        self.ticks += 1
+        if direction is self._direction:
+            self._count += 1
+            return
+        if self._count:
+            self._runs.append((self._direction, self._count))
+        self._direction = direction
+        self._count = 1
+
+    def truncate(self, ticks: int):
+        """只保留前 ticks 帧的记录（规则状态恢复到更早的快照时调用）"""
+        runs = self._runs + ([(self._direction, self._count)] if self._count else [])
+        excess = self.ticks - ticks
+        while excess > 0:
+            direction, count = runs.pop()
+            if count > excess:
+                runs.append((direction, count - excess))
+            excess -= count
+        self.ticks = min(self.ticks, ticks)
+        self._direction, self._count = runs.pop() if runs else (None, 0)
+        self._runs = runs
+
+    def finish(self, score: int = 0, death_reason: Optional[str] = None) -> Replay:
+        runs = self._runs + ([(self._direction, self._count)] if self._count else [])
+        return Replay(self.seed, self.mode, self.difficulty, self.grid_width, self.grid_height,
+                      self.ticks, encode_runs(runs), score, death_reason)
+
+
+def new_simulation(replay: Replay) -> SnakeSimulation:
+    """按回放的种子和设置创建一局刚开始的游戏"""
+    return SnakeSimulation(replay.grid_width, replay.grid_height, replay.mode,
+                           rng=random.Random(replay.seed))
+
+
+class ReplayPlayer:
+    """无界面地重新模拟回放
+
+    方向日志在播放时逐段解码，不预先展开。播放过程中每隔 keyframe_interval 帧保存一个关键帧
+    （SnakeSimulation.to_bytes()，比 clone() 小一个数量级，以及日志中的位置），
+    seek() 从不晚于目标的最近关键帧恢复后再向前推进。keyframe_interval=0 时不保存关键帧，
+    只需要从头播放到结尾（例如校验分数）时使用。
+    """
+
+    def __init__(self, replay: Replay, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self.replay = replay
+        self.keyframe_interval = max(0, keyframe_interval)
+        self._keyframes: Dict[int, Tuple[bytes, int, int]] = {}
+        self._restart()
+
+    def _restart(self):
+        self.sim = new_simulation(self.replay)
+        self._seek_log(0, 0)
+
+    def _seek_log(self, pos: int, offset: int):
+        """定位到从日志第 pos 字节开始的一段，其中已经推进了 offset 帧"""
+        self._pos = pos  # 当前段在日志中的位置
+        self._offset = offset  # 当前段中已经推进的帧数
+        self._run: Optional[Run] = None
+        self._next_pos = pos
+        if pos < len(self.replay.runs):
+            self._run, self._next_pos = read_run(self.replay.runs, pos)
+
+    @property
+    def tick(self) -> int:
+        return self.sim.tick
+
+    @property
+    def finished(self) -> bool:
+        return not self.sim.alive or self._run is None
+
+    @property
+    def death_reason(self) -> Optional[str]:
+        return self.sim.death_reason
+
+    @property
+    def log_exhausted(self) -> bool:
+        """方向日志是否已经全部播放完"""
+        return self._run is None
+
+    def advance(self, ticks: int) -> SnakeSimulation:
+        """最多推进 ticks 帧（日志结束或蛇死亡时提前停止）"""
+        sim = self.sim
+        interval = self.keyframe_interval
+        target = sim.tick + ticks
+        while sim.tick < target and sim.alive and self._run is not None:
+            direction, count = self._run
+            if self._offset == 0 and not sim.set_direction(direction):
+                raise ReplayError(f"reverse move at tick {sim.tick + 1}")
+            advance = sim.advance
+            steps = min(count - self._offset, target - sim.tick)
+            taken = 0
+            while taken < steps:
+                taken += 1
+                if not advance():
+                    break
+                if interval and sim.tick % interval == 0 and sim.tick not in self._keyframes:
+                    self._keyframes[sim.tick] = (sim.to_bytes(), self._pos, self._offset + taken)
+            self._offset += taken
+            if self._offset == count:
+                self._seek_log(self._next_pos, 0)
+        return sim
+
+    def run(self) -> SnakeSimulation:
+        """播放到结尾，返回最终状态"""
+        return self.advance(self.replay.ticks - self.sim.tick)
+
+    def seek(self, tick: int) -> SnakeSimulation:
+        """跳转到第 tick 帧之后的状态"""
+        tick = max(0, min(tick, self.replay.ticks))
+        best = max((t for t in self._keyframes if t <= tick), default=None)
+        if tick < self.sim.tick or (best is not None and best > self.sim.tick):
+            if best is None:
+                self._restart()
+            else:
+                frame, pos, offset = self._keyframes[best]
+                self.sim = SnakeSimulation.from_bytes(frame)
+                self._seek_log(pos, offset)
+        return self.advance(tick - self.sim.tick)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+高分校验服务
+
+排行榜不能信任客户端提交的分数：客户端提交回放（种子 + 方向日志，见 replay.py），
+服务端用 SnakeSimulation 无界面重新模拟，只有回放合法、日志恰好在死亡那一帧结束、
+并且重算的分数与声明一致时才接受。
+
+三种用法:
+    verify_replay(data)           单个回放，在当前线程校验
+    verify_many(items, processes) 批量校验，processes>1 时使用进程池
+    make_server(host, port)       本地HTTP服务:
+        POST /verify?mode=classic&difficulty=5&score=120   请求体为回放字节
+        POST /verify/batch                                  请求体为若干 <u32 长度><回放字节>
+        GET  /health
+
+用法: python src/python/replay_verifier.py serve [--port P] [--processes N]
+      python src/python/replay_verifier.py verify FILE...
+"""
+
+import argparse
+import json
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from log_config import get_logger, setup_logging
+from replay import Replay, ReplayError, ReplayPlayer
+from simulation import grid_size_for_mode
+
+logger = get_logger("verifier")
+
+DIFFICULTY_RANGE = range(1, 11)
+# 单个回放允许的最大帧数，防止恶意提交超长日志占用服务端
+DEFAULT_MAX_TICKS = 1_000_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+FRAME_HEADER = struct.Struct("<I")
+
+
+@dataclass
+class VerifyResult:
+    """校验结果，reason 为 "ok" 或拒绝的原因"""
+    ok: bool
+    reason: str
+    score: int = 0
+    ticks: int = 0
+
+
+def verify_replay(data: bytes, mode: Optional[str] = None, difficulty: Optional[int] = None,
+                  score: Optional[int] = None, max_ticks: int = DEFAULT_MAX_TICKS) -> VerifyResult:
+    """重新模拟回放；mode/difficulty/score 为客户端另外声明的值（可选），必须与回放一致"""
+    try:
+        replay = Replay.from_bytes(data)
+    except ReplayError:
+        return VerifyResult(False, "malformed")
+
+    if (replay.grid_width, replay.grid_height) != grid_size_for_mode(replay.mode):
+        return VerifyResult(False, "grid_mismatch")
+    if replay.difficulty not in DIFFICULTY_RANGE:
+        return VerifyResult(False, "bad_difficulty")
+    if ((mode is not None and mode != replay.mode.value)
+            or (difficulty is not None and difficulty != replay.difficulty)
+            or (score is not None and score != replay.score)):
+        return VerifyResult(False, "claim_mismatch")
+    if replay.ticks > max_ticks:
+        return VerifyResult(False, "too_long")
+
+    try:
+        player = ReplayPlayer(replay, keyframe_interval=0)
+        sim = player.run()
+    except ReplayError:
+        return VerifyResult(False, "illegal_move")
+
+    result = VerifyResult(False, "ok", sim.score, sim.tick)
+    if sim.alive:
+        result.reason = "still_alive"
+    elif sim.tick != replay.ticks or not player.log_exhausted:
+        result.reason = "length_mismatch"
+    elif player.death_reason != replay.death_reason:
+        result.reason = "death_mismatch"
+    elif sim.score != replay.score:
+        result.reason = "score_mismatch"
+    else:
+        result.ok = True
+    return result
+
+
+def _verify_bytes(data: bytes) -> VerifyResult:
+    return verify_replay(data)
+
+
+def verify_many(items: Iterable[bytes], processes: int = 1, chunksize: int = 64,
+                executor: Optional[ProcessPoolExecutor] = None) -> List[VerifyResult]:
+    """批量校验；传入 executor 时复用已有的进程池"""
+    if executor is not None:
+        return list(executor.map(_verify_bytes, items, chunksize=chunksize))
+    if processes <= 1:
+        return [verify_replay(data) for data in items]
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(_verify_bytes, items, chunksize=chunksize))
+
+
+def pack_batch(replays: Iterable[bytes]) -> bytes:
+    """批量请求体：每个回放前加4字节长度"""
+    return b"".join(FRAME_HEADER.pack(len(data)) + data for data in replays)
+
+
+def unpack_batch(body: bytes) -> List[bytes]:
+    items = []
+    offset = 0
+    while offset < len(body):
+        if offset + FRAME_HEADER.size > len(body):
+            raise ValueError("truncated batch")
+        (size,) = FRAME_HEADER.unpack_from(body, offset)
+        offset += FRAME_HEADER.size
+        if offset + size > len(body):
+            raise ValueError("truncated batch")
+        items.append(body[offset:offset + size])
+        offset += size
+    return items
+
+
+class VerificationServer(ThreadingHTTPServer):
+    """HTTP校验服务，processes>1 时批量请求交给进程池"""
+
+    daemon_threads = True
+
+    def __init__(self, address, processes: int = 1):
+        super().__init__(address, VerificationHandler)
+        self.executor = ProcessPoolExecutor(processes) if processes > 1 else None
+
+    def server_close(self):
+        super().server_close()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class VerificationHandler(BaseHTTPRequestHandler):
+    server: VerificationServer
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send_json(HTTPStatus.OK, {"ok": True})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._read_body()
+        if body is None:
+            return
+        if url.path == "/verify":
+            query = parse_qs(url.query)
+            try:
+                claims = {
+                    "mode": query["mode"][0] if "mode" in query else None,
+                    "difficulty": int(query["difficulty"][0]) if "difficulty" in query else None,
+                    "score": int(query["score"][0]) if "score" in query else None,
+                }
+            except ValueError:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": "invalid query"})
+                return
+            result = verify_replay(body, **claims)
+            self._send_json(HTTPStatus.OK, asdict(result))
+        elif url.path == "/verify/batch":
+            try:
+                items = unpack_batch(body)
+            except ValueError as e:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                return
+            results = verify_many(items, executor=self.server.executor)
+            self._send_json(HTTPStatus.OK, {"results": [asdict(result) for result in results]})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def _read_body(self) -> Optional[bytes]:
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length required"})
+            return None
+        if length > MAX_BODY_BYTES:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"})
+            return None
+        return self.rfile.read(length)
+
+    def _send_json(self, status: HTTPStatus, payload):
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, processes: int = 1) -> VerificationServer:
+    """创建校验服务（port=0 时由系统分配端口，见 server.server_address）"""
+    return VerificationServer((host, port), processes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="回放高分校验")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="启动本地HTTP校验服务")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--processes", type=int, default=1)
+    verify = sub.add_parser("verify", help="校验回放文件")
+    verify.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.command == "serve":
+        server = make_server(args.host, args.port, args.processes)
+        logger.info("Verification server listening on http://%s:%s", *server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    failed = 0
+    for path in args.files:
+        with open(path, "rb") as f:
+            result = verify_replay(f.read())
+        failed += not result.ok
+        print(f"{path}: {result.reason} score={result.score} ticks={result.ticks}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+强化学习环境（Gym风格接口，不依赖 PySide6）
+
+SnakeEnv 包装 SnakeSimulation，VectorSnakeEnv 包装 BatchSnakeEnv，接口都是
+reset() -> (obs, info) 和 step(action) -> (obs, reward, terminated, truncated, info)。
+
+观测是预先分配的 uint8 数组，形状为 (通道, grid_height, grid_width)，
+通道依次为 蛇身 / 蛇头 / 食物 / 障碍物。每一步只写入发生变化的格子（新蛇头、
+移走的蛇尾、新旧食物），单步开销与棋盘大小无关。step() 每次返回同一个数组对象，
+需要保留历史观测时请自行 copy()。当前规则中没有障碍物，障碍物通道保持为0。
+"""
+
+import random
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from batch_env import BatchSnakeEnv, REASON_BOARD_FULL
+from simulation import DIRECTION_NAMES, GameMode, SnakeSimulation, grid_size_for_mode
+
+# 动作编号与 GameEngine.setDirection 的方向名称一致，顺序与 batch_env.DIRECTIONS 相同
+ACTIONS = ("up", "down", "left", "right")
+
+CHANNEL_BODY = 0
+CHANNEL_HEAD = 1
+CHANNEL_FOOD = 2
+CHANNEL_OBSTACLE = 3
+NUM_CHANNELS = 4
+
+REWARD_FOOD = 1.0
+REWARD_DEATH = -1.0
+
+
+class SnakeEnv:
+    """单局环境
+
+    action 为 ACTIONS 中的下标；反向移动与游戏中一样被忽略（蛇保持原方向）。
+    max_ticks 不为 None 时，存活到该帧数后 truncated=True。
+    """
+
+    def __init__(self, mode: GameMode = GameMode.CLASSIC, grid_width: Optional[int] = None,
+                 grid_height: Optional[int] = None, seed=None, max_ticks: Optional[int] = None):
+        default_width, default_height = grid_size_for_mode(mode)
+        self.grid_width = grid_width or default_width
+        self.grid_height = grid_height or default_height
+        self.max_ticks = max_ticks
+        self.rng = random.Random(seed)
+        self.sim = SnakeSimulation(self.grid_width, self.grid_height, mode, rng=self.rng)
+        self.observation_shape = (NUM_CHANNELS, self.grid_height, self.grid_width)
+        self.action_count = len(ACTIONS)
+        self.obs = np.zeros(self.observation_shape, dtype=np.uint8)
+        self._directions = [DIRECTION_NAMES[name] for name in ACTIONS]
+
+    def reset(self, seed=None) -> Tuple[np.ndarray, Dict]:
+        if seed is not None:
+            self.rng.seed(seed)
+        self.sim.reset()
+        obs = self.obs
+        obs.fill(0)
+        for x, y in self.sim.body:
+            obs[CHANNEL_BODY, y, x] = 1
+        head_x, head_y = self.sim.head
+        obs[CHANNEL_HEAD, head_y, head_x] = 1
+        if self.sim.food is not None:
+            obs[CHANNEL_FOOD, self.sim.food[1], self.sim.food[0]] = 1
+        return obs, self._info()
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        sim = self.sim
+        obs = self.obs
+        sim.set_direction(self._directions[action])
+        old_head = sim.head
+        old_food = sim.food
+        result = sim.step()
+
+        if result.head is not None:
+            x, y = old_head
+            obs[CHANNEL_HEAD, y, x] = 0
+            x, y = result.head
+            obs[CHANNEL_HEAD, y, x] = 1
+            obs[CHANNEL_BODY, y, x] = 1
+        if result.tail is not None:
+            x, y = result.tail
+            obs[CHANNEL_BODY, y, x] = 0
+        if sim.food != old_food:
+            if old_food is not None:
+                obs[CHANNEL_FOOD, old_food[1], old_food[0]] = 0
+            if sim.food is not None:
+                obs[CHANNEL_FOOD, sim.food[1], sim.food[0]] = 1
+
+        reward = REWARD_FOOD if result.ate else 0.0
+        terminated = not result.alive
+        if terminated and result.death_reason != "board_full":
+            reward = REWARD_DEATH
+        truncated = not terminated and self.max_ticks is not None and sim.tick >= self.max_ticks
+        return obs, reward, terminated, truncated, self._info(result.death_reason)
+
+    def _info(self, death_reason=None) -> Dict:
+        return {"score": self.sim.score, "length": len(self.sim.body),
+                "tick": self.sim.tick, "death_reason": death_reason}
+
+
+class VectorSnakeEnv:
+    """N 局并行环境，结束的对局在同一次 step() 中自动重开
+
+    obs 形状为 (N, 通道, grid_height, grid_width)。重开的对局需要整局重写观测，
+    其余对局只写入变化的格子。info["score"] 是本步结束（重开之前）的分数。
+    """
+
+    def __init__(self, num_envs: int, mode: GameMode = GameMode.CLASSIC,
+                 grid_width: Optional[int] = None, grid_height: Optional[int] = None,
+                 seed=None, max_ticks: Optional[int] = None):
+        self.env = BatchSnakeEnv(num_envs, mode, grid_width, grid_height, seed=seed)
+        self.num_envs = num_envs
+        self.grid_width = self.env.grid_width
+        self.grid_height = self.env.grid_height
+        self.max_ticks = max_ticks
+        self.observation_shape = (NUM_CHANNELS, self.grid_height, self.grid_width)
+        self.action_count = len(ACTIONS)
+        self.obs = np.zeros((num_envs,) + self.observation_shape, dtype=np.uint8)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+
+        cells = self.env.cells
+        self._obs_flat = self.obs.reshape(-1)
+        self._obs_base = np.arange(num_envs, dtype=np.int64) * (NUM_CHANNELS * cells)
+
+    def reset(self, seed=None) -> Tuple[np.ndarray, Dict]:
+        if seed is not None:
+            self.env.rng = np.random.default_rng(seed)
+        self.env.reset()
+        self._write_full(np.arange(self.num_envs))
+        return self.obs, {"score": self.env.score.copy()}
+
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        env = self.env
+        cells = env.cells
+        base = env._row_base
+        body = env._body_flat
+
+        # 推进前记录蛇头、蛇尾和食物所在格子
+        head_ptr = env.head_ptr
+        old_head = body[base + head_ptr]
+        old_tail = body[base + (head_ptr - env.length + 1) % cells]
+        old_food = env.food.copy()
+
+        result = env.step(actions)
+        died = result.died
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_ticks is not None:
+            truncated = ~died & (env.ticks >= self.max_ticks)
+
+        rewards = self.rewards
+        rewards[:] = result.ate
+        rewards[died & (env.death_reason != REASON_BOARD_FULL)] = REWARD_DEATH
+        info = {"score": env.score.copy(), "death_reason": env.death_reason.copy()}
+
+        # 只写入变化的格子
+        rows = np.flatnonzero(~died & ~truncated)
+        obs = self._obs_flat
+        obs_base = self._obs_base[rows]
+        row_base = base[rows]
+        new_head = body[row_base + env.head_ptr[rows]]
+        tail = old_tail[rows]
+        obs[obs_base + CHANNEL_BODY * cells + tail] = env._occupied_flat[row_base + tail]
+        obs[obs_base + CHANNEL_BODY * cells + new_head] = 1
+        obs[obs_base + CHANNEL_HEAD * cells + old_head[rows]] = 0
+        obs[obs_base + CHANNEL_HEAD * cells + new_head] = 1
+        obs[obs_base + CHANNEL_FOOD * cells + old_food[rows]] = 0
+        obs[obs_base + CHANNEL_FOOD * cells + env.food[rows]] = 1
+
+        done = died | truncated
+        if done.any():
+            env.reset(done)
+            self._write_full(np.flatnonzero(done))
+        return self.obs, rewards, died, truncated, info
+
+    def _write_full(self, rows: np.ndarray):
+        """整局重写观测（reset 和对局重开时）"""
+        env = self.env
+        obs = self.obs[rows]
+        obs[:] = 0
+        obs[:, CHANNEL_BODY] = env.occupied[rows].reshape(-1, self.grid_height, self.grid_width)
+        head = env.body[rows, env.head_ptr[rows]]
+        index = np.arange(rows.size)
+        obs[index, CHANNEL_HEAD, head // self.grid_width, head % self.grid_width] = 1
+        food = env.food[rows]
+        has_food = food >= 0
+        obs[index[has_food], CHANNEL_FOOD, food[has_food] // self.grid_width,
+            food[has_food] % self.grid_width] = 1
+        self.obs[rows] = obs
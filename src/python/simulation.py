@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+贪吃蛇规则核心（不依赖 PySide6）
+
+SnakeSimulation 只负责移动、边界/自身碰撞、吃食物和生长，
+不需要 QGuiApplication，可以在服务器、测试和机器人中以最快速度逐帧推进。
+GameEngine 包装它，负责计时器、状态机和向 QML 发送信号。
+"""
+
+import random
+import struct
+from collections import deque
+from enum import Enum
+from dataclasses import dataclass
+from types import FunctionType
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+
+class Direction(Enum):
+    UP = (0, -1)
+    DOWN = (0, 1)
+    LEFT = (-1, 0)
+    RIGHT = (1, 0)
+
+
+class GameMode(Enum):
+    CLASSIC = "classic"
+    MODERN = "modern"
+    TIME_ATTACK = "time_attack"
+    FREESTYLE = "freestyle"
+    MAZE = "maze"
+    SURVIVAL = "survival"
+
+
+# 各模式的网格尺寸（与 GameEngine.setGameMode 保持一致）
+GRID_SIZES = {
+    GameMode.MODERN: (40, 25),
+    GameMode.TIME_ATTACK: (25, 15),
+}
+DEFAULT_GRID_SIZE = (30, 20)
+
+DIRECTION_NAMES = {
+    "up": Direction.UP,
+    "down": Direction.DOWN,
+    "left": Direction.LEFT,
+    "right": Direction.RIGHT
+}
+
+# 避免在每一步中访问 Enum.value
+DIRECTION_DELTAS = {direction: direction.value for direction in Direction}
+
+FOOD_SCORE = 10
+
+# 撤销日志的最大条数（约为最近这么多帧）；超出时丢弃较早的一半，早于保留部分的快照随之失效
+SNAPSHOT_JOURNAL_LIMIT = 50_000
+
+DEATH_REASONS = (None, "wall", "self", "board_full")
+
+# SnakeSimulation.to_bytes() 的格式（小端）：头部、蛇身/内圈空闲/边界空闲格子编号（u16）、随机数状态
+STATE_MAGIC = b"SNST"
+STATE_VERSION = 1
+STATE_HEADER = struct.Struct("<4sBBHHIBBIIBBHHBIHH")
+NO_CELL = 0xFFFF
+_MT_STATE = struct.Struct("<625I")
+
+
+def grid_size_for_mode(mode: GameMode) -> Tuple[int, int]:
+    """返回游戏模式对应的网格尺寸 (宽, 高)"""
+    return GRID_SIZES.get(mode, DEFAULT_GRID_SIZE)
+
+
+def tick_interval_ms(difficulty: int) -> int:
+    """难度对应的逻辑帧间隔：难度1=500ms（很慢），难度10=104ms，最快不低于100ms"""
+    return max(100, 500 - (difficulty - 1) * 44)
+
+
+def is_reverse(current: Direction, new: Direction) -> bool:
+    """判断新方向是否与当前方向相反"""
+    current_dx, current_dy = current.value
+    new_dx, new_dy = new.value
+    return current_dx == -new_dx and current_dy == -new_dy
+
+
+@dataclass
+class StepResult:
+    """单步推进的结果"""
+    alive: bool = True
+    head: Optional[Cell] = None  # 新蛇头
+    tail: Optional[Cell] = None  # 被移除的蛇尾（生长时为None）
+    ate: bool = False
+    death_reason: Optional[str] = None  # "wall" / "self" / "board_full"（填满棋盘即胜利）
+
+
+class FreeCellIndex:
+    """空闲格子索引
+
+    cells 是空闲格子编号的紧凑数组，slots[格子编号] 记录它在数组中的位置（-1表示不空闲）。
+    删除时把末尾元素换到被删位置，因此增删和均匀随机抽取都是O(1)。
+    """
+
+    __slots__ = ("cells", "slots")
+
+    def __init__(self, size: int, cells: Iterable[int] = ()):
+        self.cells: List[int] = []
+        self.slots: List[int] = [-1] * size
+        for cell in cells:
+            self.add(cell)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell: int):
+        return self.slots[cell] >= 0
+
+    def add(self, cell: int):
+        slots = self.slots
+        if slots[cell] < 0:
+            slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell: int) -> int:
+        """删除格子，返回它原来的位置（不存在时返回-1），供 reinsert 撤销"""
+        slots = self.slots
+        slot = slots[cell]
+        if slot < 0:
+            return slot
+        cells = self.cells
+        last = cells.pop()
+        if last != cell:
+            cells[slot] = last
+            slots[last] = slot
+        slots[cell] = -1
+        return slot
+
+    def reinsert(self, cell: int, slot: int):
+        """撤销 discard：格子回到原来的位置，被换过去的末尾元素回到末尾
+
+        与 remove_last 一起按操作的相反顺序调用时，cells 的排列与操作前完全相同。
+        """
+        cells = self.cells
+        slots = self.slots
+        if slot < len(cells):
+            last = cells[slot]
+            slots[last] = len(cells)
+            cells.append(last)
+            cells[slot] = cell
+        else:
+            cells.append(cell)
+        slots[cell] = slot
+
+    def remove_last(self, cell: int):
+        """撤销 add：cell 必须是最后加入的格子"""
+        self.cells.pop()
+        self.slots[cell] = -1
+
+    def choice(self, rng) -> int:
+        """均匀随机取一个空闲格子，调用前需确认非空"""
+        return self.cells[rng.randrange(len(self.cells))]
+
+    @classmethod
+    def from_cells(cls, size: int, cells: Iterable[int]) -> "FreeCellIndex":
+        """按给定顺序建立索引（cells 中不能有重复）"""
+        index = cls.__new__(cls)
+        index.cells = list(cells)
+        index.slots = slots = [-1] * size
+        for slot, cell in enumerate(index.cells):
+            slots[cell] = slot
+        return index
+
+    def copy(self) -> "FreeCellIndex":
+        other = FreeCellIndex.__new__(FreeCellIndex)
+        other.cells = self.cells.copy()
+        other.slots = self.slots.copy()
+        return other
+
+
+# 每种网格尺寸的空棋盘模板：(内圈索引, 边界索引, 每个格子是否属于边界)，新一局时复制使用
+_board_templates: Dict[Tuple[int, int], Tuple[FreeCellIndex, FreeCellIndex, bytes]] = {}
+
+
+def _board_template(width: int, height: int) -> Tuple[FreeCellIndex, FreeCellIndex, bytes]:
+    template = _board_templates.get((width, height))
+    if template is None:
+        size = width * height
+        interior = FreeCellIndex(size)
+        border = FreeCellIndex(size)
+        is_border = bytearray(size)
+        for index in range(size):
+            x, y = index % width, index // width
+            if 1 <= x <= width - 2 and 1 <= y <= height - 2:
+                interior.add(index)
+            else:
+                border.add(index)
+                is_border[index] = 1
+        template = _board_templates[(width, height)] = (interior, border, bytes(is_border))
+    return template
+
+
+def _pack_cell(cell: Optional[Cell], width: int) -> int:
+    return NO_CELL if cell is None else cell[1] * width + cell[0]
+
+
+def _unpack_cell(index: int, width: int) -> Optional[Cell]:
+    return None if index == NO_CELL else (index % width, index // width)
+
+
+class SimulationSnapshot(NamedTuple):
+    """SnakeSimulation 的快照：标量状态加上撤销日志中的位置，创建是O(1)的"""
+    owner: Any
+    epoch: int
+    position: int      # 撤销日志的长度（包括已丢弃的较早部分）
+    entry: Any         # 日志中最后一条记录（用于判断日志是否已被截断后重新写入）
+    tick: int
+    direction: Direction
+    next_direction: Direction
+    growing: int
+    food: Optional[Cell]
+    score: int
+    alive: bool
+    death_reason: Optional[str]
+    last_tail: Optional[Cell]
+    last_ate: bool
+
+
+class SnakeSimulation:
+    """单蛇规则引擎，CLASSIC撞墙死亡，FREESTYLE穿越边界
+
+    蛇身保存在deque中（蛇头在左端），同时维护一个按 y*grid_width+x
+    索引的占用位图，移动和碰撞检测都是O(1)，与蛇的长度无关。
+
+    空闲格子分成内圈（远离边界1格）和边界两个FreeCellIndex，随蛇头进入、
+    蛇尾离开同步更新；生成食物时优先从内圈均匀抽取，O(1)完成。
+
+    snapshot() 之后每帧在撤销日志中记录 (蛇头格子, 它在空闲索引中的位置, 移除的蛇尾格子)，
+    生成食物前记录随机数状态。restore() 按相反顺序撤销到快照的位置，耗时只与之后推进的帧数有关，
+    并且空闲索引的排列和随机数状态都与快照时完全相同，之后生成的食物也一样。
+    恢复到较早的快照会截断日志，在它之后拍的快照随之失效；reset()/configure()/load_body() 使所有快照失效。
+    日志最多保留 SNAPSHOT_JOURNAL_LIMIT 条，一直不调用 discard_snapshots() 时内存也不会无限增长。
+    """
+
+    def __init__(self, grid_width: int = 30, grid_height: int = 20,
+                 mode: GameMode = GameMode.CLASSIC, rng=None):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.mode = mode
+        self._wraps = mode == GameMode.FREESTYLE
+        # 默认使用全局random模块，与原有行为一致
+        self.rng = rng if rng is not None else random
+
+        self.body: Deque[Cell] = deque()
+        self._occupied = bytearray(grid_width * grid_height)
+        self._free_interior = FreeCellIndex(0)
+        self._free_border = FreeCellIndex(0)
+        # _free_pools[_is_border[格子编号]] 是该格子所属的空闲索引
+        self._free_pools: Tuple[FreeCellIndex, FreeCellIndex] = (self._free_interior, self._free_border)
+        self._is_border = b""
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.growing = 0
+        self.food: Optional[Cell] = None
+        self.score = 0
+        self.alive = True
+        self.tick = 0
+        self.death_reason: Optional[str] = None  # "wall" / "self" / "board_full"
+        self.last_tail: Optional[Cell] = None
+        self.last_ate = False
+        # 撤销日志，拍第一个快照时开始记录；_journal_base 是已丢弃的较早条数，_base_entry 是其中最后一条
+        self._journal: Optional[list] = None
+        self._journal_base = 0
+        self._base_entry = None
+        self._epoch = 0
+
+        self.reset()
+
+    @property
+    def wraps(self) -> bool:
+        """是否穿越边界"""
+        return self._wraps
+
+    @property
+    def head(self) -> Cell:
+        return self.body[0]
+
+    @property
+    def occupied(self) -> bytearray:
+        """占用位图（按 y * grid_width + x 索引），只读使用"""
+        return self._occupied
+
+    def clone(self) -> "SnakeSimulation":
+        """复制完整状态，包括随机数状态和空闲格子的排列顺序（两者共同决定之后的食物位置）
+
+        复制出的对象拥有独立的随机数生成器，推进它不会影响原对象。
+        """
+        other = SnakeSimulation.__new__(SnakeSimulation)
+        other.__dict__.update(self.__dict__)
+        # 实例上的方法包装（PhaseProfiler.instrument）绑定在原对象上，不复制
+        for name in [name for name, value in other.__dict__.items() if isinstance(value, FunctionType)]:
+            del other.__dict__[name]
+        other.rng = random.Random()
+        other.rng.setstate(self.rng.getstate())
+        other.body = deque(self.body)
+        other._occupied = bytearray(self._occupied)
+        other._free_interior = self._free_interior.copy()
+        other._free_border = self._free_border.copy()
+        other._free_pools = (other._free_interior, other._free_border)
+        other._journal = None
+        other._journal_base = 0
+        other._base_entry = None
+        return other
+
+    def configure(self, mode: GameMode, grid_width: int, grid_height: int):
+        """切换模式和网格尺寸（蛇的位置在下一次reset时回到中心）"""
+        self.mode = mode
+        self._wraps = mode == GameMode.FREESTYLE
+        if (grid_width, grid_height) != (self.grid_width, self.grid_height):
+            self.grid_width = grid_width
+            self.grid_height = grid_height
+            self._rebuild_occupancy()
+
+    def reset(self):
+        """蛇回到中心，清空分数并重新生成食物"""
+        self.load_body([(self.grid_width // 2, self.grid_height // 2)])
+        self.direction = Direction.RIGHT
+        self.next_direction = Direction.RIGHT
+        self.growing = 0
+        self.score = 0
+        self.alive = True
+        self.tick = 0
+        self.death_reason = None
+        self.last_tail = None
+        self.last_ate = False
+        self.spawn_food()
+
+    def load_body(self, cells: Iterable[Cell], direction: Optional[Direction] = None):
+        """直接放置蛇身（cells从蛇头到蛇尾），用于测试、基准和回放"""
+        self.body = deque(cells)
+        if direction is not None:
+            self.direction = direction
+            self.next_direction = direction
+        self._rebuild_occupancy()
+
+    def _rebuild_occupancy(self):
+        self.discard_snapshots()
+        width = self.grid_width
+        height = self.grid_height
+        size = width * height
+        self._occupied = occupied = bytearray(size)
+
+        # 从空棋盘模板复制空闲索引，再去掉蛇身占用的格子，不需要逐格重建
+        interior, border, is_border = _board_template(width, height)
+        self._free_interior = interior = interior.copy()
+        self._free_border = border = border.copy()
+        self._free_pools = pools = (interior, border)
+        self._is_border = is_border
+        for x, y in self.body:
+            if 0 <= x < width and 0 <= y < height:
+                index = y * width + x
+                occupied[index] = 1
+                pools[is_border[index]].discard(index)
+
+    @property
+    def free_cell_count(self) -> int:
+        """未被蛇身占用的格子数"""
+        return len(self._free_interior) + len(self._free_border)
+
+    def is_occupied(self, cell: Cell) -> bool:
+        """格子是否被蛇身占用（越界视为未占用）"""
+        x, y = cell
+        if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+            return self._occupied[y * self.grid_width + x] == 1
+        return False
+
+    def is_valid_direction(self, direction: Direction) -> bool:
+        """检查方向是否有效（不能反向移动）"""
+        # 如果蛇长度小于2，任何方向都有效
+        if len(self.body) < 2:
+            return True
+        return not is_reverse(self.direction, direction)
+
+    def set_direction(self, direction: Direction) -> bool:
+        """设置下一步方向，无效方向被忽略"""
+        if self.is_valid_direction(direction):
+            self.next_direction = direction
+            return True
+        return False
+
+    def step(self) -> StepResult:
+        """推进一步"""
+        if not self.alive:
+            return StepResult(alive=False)
+        if self.advance():
+            return StepResult(head=self.body[0], tail=self.last_tail, ate=self.last_ate)
+        if self.death_reason == "board_full":
+            return StepResult(alive=False, head=self.body[0], ate=True, death_reason="board_full")
+        return StepResult(alive=False, death_reason=self.death_reason)
+
+    def advance(self) -> bool:
+        """推进一步但不构造 StepResult，返回是否存活
+
+        本步的结果保存在 last_tail（被移除的蛇尾，生长时为None）、last_ate 和 death_reason 中，
+        回放校验等只关心最终状态的场景直接调用它。
+        """
+        if not self.alive:
+            return False
+
+        self.tick += 1
+        self.direction = self.next_direction
+
+        width = self.grid_width
+        height = self.grid_height
+        head_x, head_y = self.body[0]
+        dx, dy = DIRECTION_DELTAS[self.direction]
+        x = head_x + dx
+        y = head_y + dy
+
+        # 根据游戏模式处理边界
+        if self._wraps:
+            x %= width
+            y %= height
+        elif x < 0 or x >= width or y < 0 or y >= height:
+            return self._die("wall")
+
+        # 检查自身碰撞（蛇尾尚未移动，仍算占用）
+        occupied = self._occupied
+        index = y * width + x
+        if occupied[index]:
+            return self._die("self")
+
+        new_head = (x, y)
+        self.body.appendleft(new_head)
+        occupied[index] = 1
+        slot = self._free_pools[self._is_border[index]].discard(index)
+        journal = self._journal
+        if journal is not None and len(journal) >= SNAPSHOT_JOURNAL_LIMIT:
+            self._trim_journal()
+
+        if new_head == self.food:
+            if journal is not None:
+                journal.append((index, slot, -1))
+            self.score += FOOD_SCORE
+            self.growing += 1
+            self.last_ate = True
+            self.last_tail = None
+            if not self.spawn_food():
+                # 没有空闲格子可以放食物：棋盘已被填满，玩家获胜
+                return self._die("board_full")
+            return True
+
+        # 没有吃到食物且不在生长，移除尾部
+        self.last_ate = False
+        if self.growing > 0:
+            self.growing -= 1
+            self.last_tail = None
+            if journal is not None:
+                journal.append((index, slot, -1))
+            return True
+        self.last_tail = tail = self.body.pop()
+        tail_index = tail[1] * width + tail[0]
+        occupied[tail_index] = 0
+        self._free_pools[self._is_border[tail_index]].add(tail_index)
+        if journal is not None:
+            journal.append((index, slot, tail_index))
+        return True
+
+    def _die(self, reason: str) -> bool:
+        self.alive = False
+        self.death_reason = reason
+        return False
+
+    def spawn_food(self) -> bool:
+        """生成食物，返回是否找到了空闲位置（棋盘已满时食物为None）"""
+        # 优先远离边界1格，内圈满了再使用边界格子
+        if self._journal is not None and (self._free_interior or self._free_border):
+            self._journal.append((None, self.rng.getstate(), None))
+        if self._free_interior:
+            index = self._free_interior.choice(self.rng)
+        elif self._free_border:
+            index = self._free_border.choice(self.rng)
+        else:
+            self.food = None
+            return False
+        self.food = (index % self.grid_width, index // self.grid_width)
+        return True
+
+    # 快照与序列化
+
+    def snapshot(self) -> SimulationSnapshot:
+        """O(1) 快照，用 restore() 恢复；不再需要快照时调用 discard_snapshots() 停止记录"""
+        journal = self._journal
+        if journal is None:
+            journal = self._journal = []
+        return SimulationSnapshot(self, self._epoch, self._journal_base + len(journal),
+                                  journal[-1] if journal else None,
+                                  self.tick, self.direction, self.next_direction, self.growing, self.food,
+                                  self.score, self.alive, self.death_reason, self.last_tail, self.last_ate)
+
+    def restore(self, snapshot: SimulationSnapshot):
+        """恢复到快照时的状态，只撤销之后发生变化的格子；快照已失效时抛出ValueError"""
+        journal = self._journal
+        # 换算成当前日志中的位置；为0时快照的最后一条记录已被丢弃，与 _base_entry 比较
+        position = snapshot.position - self._journal_base
+        if (snapshot.owner is not self or snapshot.epoch != self._epoch or journal is None
+                or not 0 <= position <= len(journal)
+                or (journal[position - 1] if position else self._base_entry) is not snapshot.entry):
+            raise ValueError("snapshot is no longer valid")
+
+        width = self.grid_width
+        body = self.body
+        occupied = self._occupied
+        pools = self._free_pools
+        is_border = self._is_border
+        rng_state = None
+        while len(journal) > position:
+            head, slot, tail = journal.pop()
+            if head is None:
+                # 生成食物前的随机数状态，最早的一条即快照时的状态
+                rng_state = slot
+                continue
+            if tail >= 0:
+                pools[is_border[tail]].remove_last(tail)
+                occupied[tail] = 1
+                body.append((tail % width, tail // width))
+            body.popleft()
+            occupied[head] = 0
+            if slot >= 0:
+                pools[is_border[head]].reinsert(head, slot)
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
+
+        (self.tick, self.direction, self.next_direction, self.growing, self.food, self.score,
+         self.alive, self.death_reason, self.last_tail, self.last_ate) = snapshot[4:]
+
+    def discard_snapshots(self):
+        """停止记录撤销日志，已有的快照全部失效"""
+        self._journal = None
+        self._journal_base = 0
+        self._base_entry = None
+        self._epoch += 1
+
+    def _trim_journal(self):
+        """丢弃撤销日志中较早的一半（均摊O(1)）"""
+        dropped = len(self._journal) // 2
+        self._base_entry = self._journal[dropped - 1]
+        del self._journal[:dropped]
+        self._journal_base += dropped
+
+    def to_bytes(self) -> bytes:
+        """序列化完整状态，包括空闲索引的排列和随机数状态，from_bytes() 恢复后的推进与原对象完全相同"""
+        width = self.grid_width
+        body = [y * width + x for x, y in self.body]
+        interior = self._free_interior.cells
+        border = self._free_border.cells
+        header = STATE_HEADER.pack(
+            STATE_MAGIC, STATE_VERSION, tuple(GameMode).index(self.mode), width, self.grid_height,
+            self.tick, tuple(Direction).index(self.direction), tuple(Direction).index(self.next_direction),
+            self.growing, self.score, self.alive, DEATH_REASONS.index(self.death_reason),
+            _pack_cell(self.food, width), _pack_cell(self.last_tail, width), self.last_ate,
+            len(body), len(interior), len(border))
+        version, internal, gauss = self.rng.getstate()
+        cells = body + interior + border
+        return b"".join((header, struct.pack(f"<{len(cells)}H", *cells), bytes((version,)),
+                         _MT_STATE.pack(*internal),
+                         struct.pack("<?d", gauss is not None, gauss if gauss is not None else 0.0)))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SnakeSimulation":
+        """从 to_bytes() 的结果恢复，使用新的 random.Random"""
+        try:
+            (magic, version, mode, width, height, tick, direction, next_direction, growing, score, alive,
+             reason, food, last_tail, last_ate, body_len, interior_len, border_len) = STATE_HEADER.unpack_from(data)
+            if magic != STATE_MAGIC or version != STATE_VERSION:
+                raise ValueError("unsupported simulation state format")
+            count = body_len + interior_len + border_len
+            cells = struct.unpack_from(f"<{count}H", data, STATE_HEADER.size)
+            if cells and max(cells) >= width * height:
+                raise ValueError("cell outside the board")
+            offset = STATE_HEADER.size + 2 * count
+            rng_version = data[offset]
+            internal = _MT_STATE.unpack_from(data, offset + 1)
+            has_gauss, gauss = struct.unpack_from("<?d", data, offset + 1 + _MT_STATE.size)
+            modes, directions = tuple(GameMode), tuple(Direction)
+            sim = cls(width, height, modes[mode], rng=random.Random())
+            sim.direction, sim.next_direction = directions[direction], directions[next_direction]
+            death_reason = DEATH_REASONS[reason]
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"invalid simulation state: {e}") from None
+
+        # 构造函数已按尺寸准备好棋盘，这里直接替换蛇身、占用位图和空闲索引
+        size = width * height
+        sim.body = deque((index % width, index // width) for index in cells[:body_len])
+        sim._occupied = occupied = bytearray(size)
+        for index in cells[:body_len]:
+            occupied[index] = 1
+        sim._free_interior = FreeCellIndex.from_cells(size, cells[body_len:body_len + interior_len])
+        sim._free_border = FreeCellIndex.from_cells(size, cells[body_len + interior_len:])
+        sim._free_pools = (sim._free_interior, sim._free_border)
+        sim.tick, sim.growing, sim.score = tick, growing, score
+        sim.alive, sim.death_reason = bool(alive), death_reason
+        sim.food, sim.last_tail = _unpack_cell(food, width), _unpack_cell(last_tail, width)
+        sim.last_ate = bool(last_ate)
+        sim.rng.setstate((rng_version, internal, gauss if has_gauss else None))
+        return sim
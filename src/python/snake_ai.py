@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI蛇控制器（不依赖 PySide6）
+
+控制器每帧根据棋盘视图返回一个 Direction。视图只需要提供
+grid_width / grid_height / wraps / occupied（所有蛇共享的占用位图）/
+body（蛇头在左端）/ direction / food，SnakeSimulation 和 MultiSnakeSimulation 中的
+SnakeState 本身即可作为视图。
+
+    GreedyController       沿到食物的距离场下降，不做安全检查（难度1~3）
+    AStarController        A*寻路到食物；safe=True 时检查吃到食物后蛇头能否回到蛇尾（难度4~7）
+    HamiltonianController  沿哈密顿回路前进，在不破坏回路顺序的前提下抄近路（难度8~10）
+
+到食物的距离场（绕开所有蛇身的BFS距离）由 DistanceFields 按食物位置缓存，
+蛇头占据新格子、蛇尾离开旧格子时只修复受影响的局部区域，不需要每帧重新做全图BFS；
+A* 以距离场作为启发函数，只展开路径附近的少量节点。
+"""
+
+import heapq
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from simulation import Cell, Direction
+
+# 不可达距离
+UNREACHABLE = 1 << 30
+
+# 距离场连续这么多帧没有被读取就丢弃，下次需要时重新计算
+FIELD_IDLE_UPDATES = 8
+
+NeighborTable = List[Tuple[Tuple[Direction, int], ...]]
+AdjacencyTable = List[Tuple[int, ...]]
+
+_board_tables: Dict[Tuple[int, int, bool], Tuple[NeighborTable, AdjacencyTable]] = {}
+
+
+def board_tables(width: int, height: int, wraps: bool) -> Tuple[NeighborTable, AdjacencyTable]:
+    """每个格子的 (方向, 相邻格子编号) 列表和只含编号的相邻表，按棋盘尺寸缓存"""
+    key = (width, height, wraps)
+    tables = _board_tables.get(key)
+    if tables is None:
+        moves = []
+        for index in range(width * height):
+            x, y = index % width, index // width
+            entries = []
+            for direction in Direction:
+                dx, dy = direction.value
+                nx, ny = x + dx, y + dy
+                if wraps:
+                    nx %= width
+                    ny %= height
+                elif not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                entries.append((direction, ny * width + nx))
+            moves.append(tuple(entries))
+        adjacency = [tuple(cell for _, cell in entries) for entries in moves]
+        tables = _board_tables[key] = (moves, adjacency)
+    return tables
+
+
+def hamiltonian_cycle(width: int, height: int) -> List[Cell]:
+    """经过每个格子一次并回到起点的环路（宽或高至少一个为偶数）
+
+    高度为偶数时第0列留作回程通道：在第1~width-1列按行往返，最后沿第0列回到(0, 0)；
+    只有宽度为偶数时按转置的方式生成。
+    """
+    if height % 2 == 0:
+        cells = [(0, 0)]
+        for y in range(height):
+            xs = range(1, width) if y % 2 == 0 else range(width - 1, 0, -1)
+            cells.extend((x, y) for x in xs)
+        cells.extend((0, y) for y in range(height - 1, 0, -1))
+        return cells
+    if width % 2 == 0:
+        return [(x, y) for y, x in hamiltonian_cycle(height, width)]
+    raise ValueError("hamiltonian_cycle requires an even width or height")
+
+
+class DistanceFields:
+    """按食物格子缓存的距离场，随占用变化增量修复
+
+    world 提供 grid_width / grid_height / wraps / occupied；推进一帧后由驱动方调用
+    update(blocked, freed, targets)：blocked 是新被占用的格子（蛇头），freed 是被释放的格子（蛇尾），
+    targets 是当前仍存在的食物，其余距离场被丢弃。只在规划时读取距离场的控制器（A*）
+    不会让它常驻：连续 FIELD_IDLE_UPDATES 帧未被读取的距离场不再维护。
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self._fields: Dict[int, List[int]] = {}
+        self._last_used: Dict[int, int] = {}
+        self._updates = 0
+        self.full_builds = 0
+        self.repaired_cells = 0
+
+    @property
+    def moves(self) -> NeighborTable:
+        world = self.world
+        return board_tables(world.grid_width, world.grid_height, world.wraps)[0]
+
+    @property
+    def adjacency(self) -> AdjacencyTable:
+        world = self.world
+        return board_tables(world.grid_width, world.grid_height, world.wraps)[1]
+
+    def get(self, target: int) -> List[int]:
+        """到 target 的距离场（列表，按格子编号索引，被占用或不可达为 UNREACHABLE）"""
+        field = self._fields.get(target)
+        if field is None:
+            field = self._fields[target] = self._build(target)
+        self._last_used[target] = self._updates
+        return field
+
+    def reset(self):
+        """棋盘整体变化（新一局、调整尺寸、恢复快照）后调用"""
+        self._fields.clear()
+        self._last_used.clear()
+
+    def update(self, blocked: Iterable[int] = (), freed: Iterable[int] = (),
+               targets: Optional[Iterable[int]] = None):
+        self._updates += 1
+        keep = None if targets is None else set(targets)
+        blocked = tuple(blocked)
+        freed = tuple(freed)
+        oldest = self._updates - FIELD_IDLE_UPDATES
+        for target, field in list(self._fields.items()):
+            # 食物已被吃掉或长时间未使用
+            if (keep is not None and target not in keep) or target in blocked or self._last_used[target] < oldest:
+                del self._fields[target]
+                del self._last_used[target]
+                continue
+            for cell in blocked:
+                self._block(field, cell)
+            for cell in freed:
+                self._unblock(field, cell)
+
+    def _build(self, target: int) -> List[int]:
+        self.full_builds += 1
+        occupied = self.world.occupied
+        adjacency = self.adjacency
+        field = [UNREACHABLE] * len(occupied)
+        field[target] = 0
+        frontier = [target]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for cell in frontier:
+                for other in adjacency[cell]:
+                    if field[other] == UNREACHABLE and not occupied[other]:
+                        field[other] = distance
+                        next_frontier.append(other)
+            frontier = next_frontier
+        return field
+
+    def _block(self, field: List[int], cell: int):
+        """cell 被占用：找出最短路径都经过它的格子，清空后从外围重新传播"""
+        if field[cell] == UNREACHABLE:
+            return
+        adjacency = self.adjacency
+        occupied = self.world.occupied
+
+        # 按距离逐层扩展；同层的受影响格子总是先于下一层被确定
+        affected = {cell}
+        order = [cell]
+        frontier = [cell]
+        distance = field[cell]
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for other in adjacency[current]:
+                    if field[other] != distance + 1 or other in affected:
+                        continue
+                    for support in adjacency[other]:
+                        if field[support] == distance and support not in affected:
+                            break
+                    else:
+                        affected.add(other)
+                        next_frontier.append(other)
+            order.extend(next_frontier)
+            frontier = next_frontier
+            distance += 1
+
+        for other in order:
+            field[other] = UNREACHABLE
+        heap = []
+        for other in order:
+            if occupied[other]:
+                continue
+            best = min([field[support] for support in adjacency[other]])
+            if best < UNREACHABLE:
+                field[other] = best + 1
+                heap.append((best + 1, other))
+        heapq.heapify(heap)
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if distance != field[current]:
+                continue
+            distance += 1
+            for other in adjacency[current]:
+                if field[other] > distance and other in affected and not occupied[other]:
+                    field[other] = distance
+                    heapq.heappush(heap, (distance, other))
+        self.repaired_cells += len(order)
+
+    def _unblock(self, field: List[int], cell: int):
+        """cell 被释放：从它开始向外松弛"""
+        occupied = self.world.occupied
+        if occupied[cell]:
+            return
+        adjacency = self.adjacency
+        best = min([field[other] for other in adjacency[cell]]) + 1
+        if best >= field[cell] or best > UNREACHABLE:
+            return
+        field[cell] = best
+        frontier = [cell]
+        count = 1
+        while frontier:
+            best += 1
+            next_frontier = []
+            for current in frontier:
+                for other in adjacency[current]:
+                    if field[other] > best and not occupied[other]:
+                        field[other] = best
+                        next_frontier.append(other)
+            count += len(next_frontier)
+            frontier = next_frontier
+        self.repaired_cells += count
+
+
+def cell_index(view, cell: Cell) -> int:
+    return cell[1] * view.grid_width + cell[0]
+
+
+class Controller:
+    """控制器基类"""
+
+    def __init__(self, fields: DistanceFields):
+        self.fields = fields
+
+    def choose(self, view) -> Direction:
+        raise NotImplementedError
+
+    def reset(self):
+        """新一局开始时清除缓存的计划"""
+
+    def _safe_moves(self, view, head: int) -> List[Tuple[Direction, int]]:
+        """不会立即撞墙或撞到任何蛇身（包括尚未移动的蛇尾）的移动
+
+        多蛇对局中尽量避开其它蛇头下一帧可能进入的格子（view.contested），
+        只剩这些格子时才冒险。
+        """
+        occupied = view.occupied
+        moves = [(direction, cell) for direction, cell in self.fields.moves[head] if not occupied[cell]]
+        contested = getattr(view, "contested", None)
+        if contested and moves:
+            moves = [move for move in moves if move[1] not in contested] or moves
+        return moves
+
+    def _direction_to(self, head: int, cell: int) -> Optional[Direction]:
+        for direction, other in self.fields.moves[head]:
+            if other == cell:
+                return direction
+        return None
+
+    def _survive(self, view, head: int) -> Direction:
+        """没有安全路线时：选择之后还能回到蛇尾、且可活动空间最大的方向"""
+        moves = self._safe_moves(view, head)
+        if not moves:
+            return view.direction
+        if len(moves) == 1:
+            return moves[0][0]
+        occupied = bytearray(view.occupied)
+        tail = cell_index(view, view.body[-1])
+        occupied[tail] = 0
+        best, best_score = moves[0][0], None
+        for direction, cell in moves:
+            area, reaches_tail = self._flood(occupied, cell, tail)
+            score = (reaches_tail, area)
+            if best_score is None or score > best_score:
+                best, best_score = direction, score
+        return best
+
+    def _flood(self, occupied: bytearray, start: int, goal: int) -> Tuple[int, bool]:
+        """从 start 出发可到达的格子数，以及能否到达 goal"""
+        adjacency = self.fields.adjacency
+        seen = bytearray(occupied)
+        seen[start] = 1
+        frontier = [start]
+        count = 1
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for other in adjacency[current]:
+                    if not seen[other]:
+                        seen[other] = 1
+                        next_frontier.append(other)
+            count += len(next_frontier)
+            frontier = next_frontier
+        return count, seen[goal] == 1 and not occupied[goal]
+
+
+class GreedyController(Controller):
+    """每帧走向距离场中离食物最近的相邻格子"""
+
+    def choose(self, view) -> Direction:
+        head = cell_index(view, view.body[0])
+        if view.food is None:
+            return self._survive(view, head)
+        field = self.fields.get(cell_index(view, view.food))
+        best, best_distance = None, UNREACHABLE
+        for direction, cell in self._safe_moves(view, head):
+            distance = field[cell]
+            if distance < best_distance or (distance == best_distance and direction is view.direction):
+                best, best_distance = direction, distance
+        return best if best is not None else self._survive(view, head)
+
+
+class AStarController(Controller):
+    """A*寻路到食物并沿路径前进，路径被挡住或食物移动时重新规划
+
+    safe=True 时模拟沿路径吃到食物后的蛇身，蛇头无法回到蛇尾的路径不采用。
+    找不到（安全的）路径时先朝蛇尾走 CHASE_STEPS 步再重新规划，
+    避免每帧都做一次全图搜索。
+    """
+
+    CHASE_STEPS = 4
+
+    def __init__(self, fields: DistanceFields, safe: bool = True):
+        super().__init__(fields)
+        self.safe = safe
+        self._path: deque = deque()
+        self._target: Optional[int] = None
+        self.plans = 0
+
+    def reset(self):
+        self._path.clear()
+        self._target = None
+
+    def choose(self, view) -> Direction:
+        head = cell_index(view, view.body[0])
+        target = None if view.food is None else cell_index(view, view.food)
+        path = self._path
+        if (target != self._target or not path or view.occupied[path[0]]
+                or self._direction_to(head, path[0]) is None):
+            self._target = target
+            path = self._path = deque(self._plan(view, head, target))
+        step = path.popleft() if path else None
+        direction = None if step is None else self._direction_to(head, step)
+        if direction is None or step not in {cell for _, cell in self._safe_moves(view, head)}:
+            path.clear()
+            return self._survive(view, head)
+        return direction
+
+    def _plan(self, view, head: int, target: Optional[int]) -> List[int]:
+        self.plans += 1
+        if target is not None:
+            path = self.search(view, head, target)
+            if path and (not self.safe or self._tail_reachable_after(view, path)):
+                return path
+        return self._chase_tail(view, head)
+
+    def search(self, view, start: int, target: int) -> List[int]:
+        """A*：启发函数为缓存的距离场，返回不含起点的格子序列"""
+        field = self.fields.get(target)
+        adjacency = self.fields.adjacency
+        best = {start: 0}
+        parents = {}
+        # 同f值时优先展开g更大的节点，启发函数精确时只沿路径前进
+        heap = [(0, 0, start)]
+        while heap:
+            _, negative_g, current = heapq.heappop(heap)
+            cost = -negative_g
+            if current == target:
+                path = []
+                while current != start:
+                    path.append(current)
+                    current = parents[current]
+                path.reverse()
+                return path
+            if cost > best[current]:
+                continue
+            next_cost = cost + 1
+            for other in adjacency[current]:
+                # 距离场中被占用的格子都是 UNREACHABLE
+                estimate = field[other]
+                if estimate == UNREACHABLE or next_cost >= best.get(other, UNREACHABLE):
+                    continue
+                best[other] = next_cost
+                parents[other] = current
+                heapq.heappush(heap, (next_cost + estimate, -next_cost, other))
+        return []
+
+    def _chase_tail(self, view, head: int) -> List[int]:
+        """到蛇尾的最短路径的前几步（不含蛇尾本身：蛇尾在这一帧仍算占用）"""
+        tail = cell_index(view, view.body[-1])
+        if tail == head:
+            return []
+        adjacency = self.fields.adjacency
+        occupied = view.occupied
+        parents = {head: head}
+        frontier = [head]
+        while frontier and tail not in parents:
+            next_frontier = []
+            for current in frontier:
+                for other in adjacency[current]:
+                    if other not in parents and (not occupied[other] or other == tail):
+                        parents[other] = current
+                        next_frontier.append(other)
+            frontier = next_frontier
+        if tail not in parents:
+            return []
+        path = []
+        current = parents[tail]
+        while current != head:
+            path.append(current)
+            current = parents[current]
+        path.reverse()
+        return path[:self.CHASE_STEPS]
+
+    def _tail_reachable_after(self, view, path: Sequence[int]) -> bool:
+        """沿 path 吃到食物后，新蛇头能否到达新蛇尾"""
+        body = [cell_index(view, cell) for cell in view.body]
+        growing = getattr(view, "growing", 0)
+        pops = max(0, len(path) - 1 - growing)
+        virtual = (list(reversed(path)) + body)[:len(body) + len(path) - pops]
+        if len(virtual) < 2:
+            return True
+
+        occupied = bytearray(view.occupied)
+        for cell in body:
+            occupied[cell] = 0
+        for cell in virtual:
+            occupied[cell] = 1
+        tail = virtual[-1]
+        occupied[tail] = 0
+        return self._flood(occupied, virtual[0], tail)[1]
+
+
+class HamiltonianController(Controller):
+    """沿哈密顿回路前进；蛇身较短时允许在回路顺序上跳过一段直接靠近食物
+
+    蛇身始终占据回路上连续的一段，只要跳跃后蛇头仍在蛇尾之前并留出余量，
+    就不会把自己困住，因此只要棋盘上只有它自己，这个控制器可以一直存活到填满棋盘。
+    多蛇对局中回路被其它蛇挡住时改用A*。
+    """
+
+    # 蛇身超过棋盘的这个比例后不再抄近路
+    SHORTCUT_LIMIT = 0.5
+    # 跳跃后与蛇尾之间保留的格子数（吃到食物会额外生长两格）
+    SAFETY_MARGIN = 4
+
+    def __init__(self, fields: DistanceFields, width: int, height: int, shortcuts: bool = True):
+        super().__init__(fields)
+        self.shortcuts = shortcuts
+        self._fallback = AStarController(fields, safe=True)
+        cycle = hamiltonian_cycle(width, height)
+        self._size = len(cycle)
+        self._cycle = [y * width + x for x, y in cycle]
+        self._order = [0] * self._size
+        for position, cell in enumerate(self._cycle):
+            self._order[cell] = position
+
+    def reset(self):
+        self._fallback.reset()
+
+    def choose(self, view) -> Direction:
+        order = self._order
+        size = self._size
+        head = cell_index(view, view.body[0])
+        moves = self._safe_moves(view, head)
+        if not moves:
+            return view.direction
+
+        head_position = order[head]
+        follow = self._cycle[(head_position + 1) % size]
+        length = len(view.body)
+        if self.shortcuts and view.food is not None and length < size * self.SHORTCUT_LIMIT:
+            tail_gap = (order[cell_index(view, view.body[-1])] - head_position) % size or size
+            food_gap = (order[cell_index(view, view.food)] - head_position) % size
+            limit = min(food_gap, tail_gap - self.SAFETY_MARGIN - getattr(view, "growing", 0))
+            best, best_skip = None, 0
+            for direction, cell in moves:
+                skip = (order[cell] - head_position) % size
+                if best_skip < skip <= limit:
+                    best, best_skip = direction, skip
+            if best is not None:
+                return best
+
+        for direction, cell in moves:
+            if cell == follow:
+                return direction
+        # 回路被其它蛇挡住，暂时改用A*
+        return self._fallback.choose(view)
+
+
+def make_controller(difficulty: int, fields: DistanceFields, width: int, height: int,
+                    solo: bool = True) -> Controller:
+    """按 Player.difficulty（1~10）选择控制器
+
+    哈密顿回路只在棋盘上只有一条蛇时才能保证安全，多蛇对局（solo=False）中最高难度使用安全A*。
+    """
+    if difficulty <= 3:
+        return GreedyController(fields)
+    if difficulty <= 7:
+        return AStarController(fields, safe=difficulty >= 6)
+    if solo and (width % 2 == 0 or height % 2 == 0):
+        return HamiltonianController(fields, width, height)
+    # 宽高都是奇数时不存在哈密顿回路
+    return AStarController(fields, safe=True)
+
+
+class AutoPilot:
+    """让控制器驾驶一个 SnakeSimulation
+
+    每帧推进前调用 steer() 设置方向，推进后调用 observe(result) 把蛇头/蛇尾的变化
+    同步给距离场；新一局开始（sim.reset()）或恢复快照（sim.restore()）后调用 reset()。
+    """
+
+    def __init__(self, sim, difficulty: int):
+        self.sim = sim
+        self.fields = DistanceFields(sim)
+        self.set_difficulty(difficulty)
+
+    def set_difficulty(self, difficulty: int):
+        self.difficulty = difficulty
+        self.controller = make_controller(difficulty, self.fields, self.sim.grid_width, self.sim.grid_height)
+
+    def reset(self):
+        """新一局开始或恢复快照后调用；网格尺寸可能已经变化，控制器一并重建"""
+        self.fields.reset()
+        self.set_difficulty(self.difficulty)
+
+    def steer(self) -> Direction:
+        sim = self.sim
+        direction = self.controller.choose(sim)
+        sim.set_direction(direction)
+        return direction
+
+    def observe(self, result):
+        """result 为 SnakeSimulation.step() 的返回值"""
+        if not result.alive:
+            return
+        sim = self.sim
+        width = sim.grid_width
+        head = result.head[1] * width + result.head[0]
+        freed = () if result.tail is None else (result.tail[1] * width + result.tail[0],)
+        food = sim.food
+        self.fields.update((head,), freed, () if food is None else (food[1] * width + food[0],))
+
+
+class SquadPilot:
+    """让控制器驾驶 MultiSnakeSimulation 中的若干条蛇
+
+    所有AI蛇共享同一组距离场（按食物格子缓存），占用位图中其它蛇的身体同样视为障碍。
+    用法与 AutoPilot 相同：steer() → sim.step() → observe(result)，新一局后 reset()。
+    """
+
+    def __init__(self, sim, difficulties: Dict[int, int]):
+        self.sim = sim
+        self.difficulties = dict(difficulties)
+        self.fields = DistanceFields(sim)
+        self.controllers: Dict[int, Controller] = {}
+        self.reset()
+
+    def reset(self):
+        sim = self.sim
+        self.fields.reset()
+        solo = len(sim.snakes) == 1
+        self.controllers = {player: make_controller(difficulty, self.fields, sim.grid_width, sim.grid_height, solo)
+                            for player, difficulty in self.difficulties.items()}
+
+    def steer(self):
+        snakes = self.sim.snakes
+        for player, controller in self.controllers.items():
+            snake = snakes[player]
+            if snake.alive:
+                snake.set_direction(controller.choose(snake))
+
+    def observe(self, result):
+        """result 为 MultiSnakeSimulation.step() 的返回值"""
+        width = self.sim.grid_width
+        blocked = [event.head[1] * width + event.head[0] for event in result.events if event.head is not None]
+        freed = [event.tail[1] * width + event.tail[0] for event in result.events if event.tail is not None]
+        freed.extend(y * width + x for x, y in result.removed)
+        self.fields.update(blocked, freed, (y * width + x for x, y in self.sim.foods))
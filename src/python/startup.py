@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动计时（不依赖 PySide6）
+
+StartupProfile 从 main.py 开始执行算起，按顺序记录每个启动阶段结束的时刻，
+report() 输出与 python -X importtime 相同形式的表格（自身耗时 | 累计耗时 | 阶段）。
+解释器自身的启动（site、编码等）在 main.py 执行之前，不包含在内，可用 -X importtime 单独查看。
+
+main.py 中的阶段：
+    imports          PySide6 和游戏模块的导入
+    QGuiApplication  创建应用对象（连接平台插件）
+    ConfigManager    读取 config.toml（存档推迟到首帧之后）
+    GameEngine       创建引擎（成就推迟到第一次使用）
+    QML load         编译并创建 main.qml（游戏界面推迟到首帧之后）
+    first frame      第一次帧交换，窗口中出现主菜单
+    deferred         首帧之后的工作：预读存档、建立成就表
+
+FileReadTrace 用审计钩子（sys.addaudithook）统计启动期间Python代码以只读方式打开每个文件的次数，
+用来确认 config.toml 和存档各只读取一次（子系统由 app_container.AppContainer 各创建一个实例）。
+
+环境变量:
+    SNAKE_STARTUP_REPORT  设为 1 时记录文件读取，在首帧之后的工作完成后把两张表写到 stderr
+    SNAKE_STARTUP_EXIT    设为 1 时输出之后立即退出（benchmarks/bench_startup.py 使用）
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# 首帧目标（毫秒，从 main.py 开始执行算起）；超出时输出警告
+FIRST_FRAME_TARGET_MS = 400
+
+
+class StartupProfile:
+    """启动阶段计时"""
+
+    def __init__(self, origin_ns: Optional[int] = None, clock: Callable[[], int] = time.perf_counter_ns):
+        self.clock = clock
+        self.origin_ns = clock() if origin_ns is None else origin_ns
+        self._marks: List[Tuple[str, int]] = []
+
+    def mark(self, phase: str) -> float:
+        """记录 phase 在现在结束，返回从开始到现在的毫秒数"""
+        now = self.clock()
+        self._marks.append((phase, now))
+        return (now - self.origin_ns) / 1_000_000
+
+    def elapsed_ms(self, phase: str) -> Optional[float]:
+        """从开始到 phase 结束的毫秒数，未记录过时返回 None"""
+        for name, end in self._marks:
+            if name == phase:
+                return (end - self.origin_ns) / 1_000_000
+        return None
+
+    def phases(self) -> List[Tuple[str, float, float]]:
+        """按顺序返回 (阶段, 自身毫秒, 累计毫秒)"""
+        rows = []
+        previous = self.origin_ns
+        for name, end in self._marks:
+            rows.append((name, (end - previous) / 1_000_000, (end - self.origin_ns) / 1_000_000))
+            previous = end
+        return rows
+
+    def report(self) -> str:
+        lines = ["startup: self [ms] | cumulative [ms] | phase"]
+        for name, own, cumulative in self.phases():
+            lines.append(f"startup: {own:>9.1f} | {cumulative:>15.1f} | {name}")
+        return "\n".join(lines)
+
+
+class FileReadTrace:
+    """统计 start() 到 stop() 之间以只读方式打开的文件
+
+    审计钩子装上后无法移除，因此只在需要报告时创建；stop() 之后钩子只做一次属性检查。
+    """
+
+    def __init__(self):
+        self.active = False
+        self.reads: Counter = Counter()
+        self._installed = False
+
+    def start(self):
+        if not self._installed:
+            sys.addaudithook(self._on_audit)
+            self._installed = True
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def _on_audit(self, event, args):
+        if not self.active or event != "open":
+            return
+        path, mode = args[0], args[1]
+        # os.open 的 mode 为 None（按 flags 判断），这里只统计 open() / io.open_code 的只读打开
+        if isinstance(path, (str, os.PathLike)) and isinstance(mode, str) and not set(mode) & set("wax+"):
+            self.reads[os.path.abspath(path)] += 1
+
+    def count(self, path) -> int:
+        return self.reads[os.path.abspath(path)]
+
+    def duplicates(self, paths: Iterable) -> List[Tuple[str, int]]:
+        """paths 中读取超过一次的文件"""
+        return [(os.path.abspath(path), self.count(path)) for path in paths if self.count(path) > 1]
+
+    def report(self, paths: Iterable) -> str:
+        lines = ["startup: reads | file"]
+        for path in paths:
+            lines.append(f"startup: {self.count(path):>5} | {os.path.abspath(path)}")
+        return "\n".join(lines)
@@ -37,19 +37,21 @@ Dialog {
         anchors.margins: 30
         spacing: 20
         
-        // 游戏结束标题
+        // 游戏结束标题（填满棋盘时为通关）
         Text {
-            text: "游戏结束"
+            id: titleText
+            property bool won: gameEngine ? gameEngine.won : false
+            text: won ? "恭喜通关" : "游戏结束"
             font.pixelSize: 32
             font.bold: true
-            color: "#FF6464"
+            color: won ? "#50FF80" : "#FF6464"
             Layout.alignment: Qt.AlignHCenter
             
             layer.enabled: true
             layer.effect: Glow {
                 radius: 8
                 samples: 17
-                color: "#FF6464"
+                color: titleText.color
                 transparentBorder: true
             }
         }
@@ -1,13 +1,91 @@
 import QtQuick 2.15
 
-Canvas {
-    id: canvas
+// 两层Canvas：staticLayer缓存背景、网格线和障碍物，只在网格尺寸、障碍物或控件大小
+// 变化时重绘；canvas每帧只绘制食物和蛇，两层由场景图合成。
+Item {
+    id: renderer
     
     property var gameEngine: null
     onGameEngineChanged: {
         if (gameEngine !== null) {
             console.log("GameRenderer received gameEngine:", gameEngine)
-            requestPaint()
+            resyncSnake()
+            foodCache = readModel(gameEngine.foodModel)
+            obstacleCache = readModel(gameEngine.obstacleModel)
+        }
+        invalidateStaticLayer()
+        canvas.requestPaint()
+    }
+    
+    // 两层共用的布局
+    readonly property int boardWidth: gameEngine ? (gameEngine.gridWidth || 30) : 30
+    readonly property int boardHeight: gameEngine ? (gameEngine.gridHeight || 20) : 20
+    readonly property real cellSize: Math.min(width / boardWidth, height / boardHeight)
+    readonly property real offsetX: (width - boardWidth * cellSize) / 2
+    readonly property real offsetY: (height - boardHeight * cellSize) / 2
+    
+    onWidthChanged: invalidateStaticLayer()
+    onHeightChanged: invalidateStaticLayer()
+    
+    function invalidateStaticLayer() {
+        staticLayer.requestPaint()
+    }
+    
+    // 蛇身的本地副本（从蛇头到蛇尾），每帧只根据snakeDelta增量更新，
+    // 只有snakePositionsChanged（重置/定期同步）时才读取完整列表
+    property var snakeBody: []
+    
+    function resyncSnake() {
+        var positions = gameEngine ? gameEngine.snakePositions : null
+        var body = []
+        if (positions) {
+            for (var i = 0; i < positions.length; i++) {
+                body.push({x: positions[i].x, y: positions[i].y})
+            }
+        }
+        snakeBody = body
+    }
+    
+    // 食物和障碍物的本地缓存，只在对应模型发出行变化通知时更新，
+    // onPaint中不再读取Python属性
+    property var foodCache: []
+    property var obstacleCache: []
+    
+    // 模型中的食物类型名称对应drawFoodItem使用的编号
+    readonly property var foodTypeCodes: ({
+        "normal": 1, "speed_up": 2, "speed_down": 3, "ghost": 4, "bonus": 5
+    })
+    
+    function readModel(model) {
+        var items = []
+        if (model) {
+            for (var i = 0; i < model.count; i++) {
+                items.push(model.get(i))
+            }
+        }
+        return items
+    }
+    
+    function insertRows(cache, model, first, last) {
+        for (var i = first; i <= last; i++) {
+            cache.splice(i, 0, model.get(i))
+        }
+    }
+    
+    function updateRows(cache, model, first, last) {
+        for (var i = first; i <= last; i++) {
+            cache[i] = model.get(i)
+        }
+    }
+    
+    function applySnakeDelta(headX, headY, tailX, tailY, grew) {
+        snakeBody.unshift({x: headX, y: headY})
+        if (!grew) {
+            // 移除的蛇尾与本地副本不一致说明漏掉或乱序收到了增量，立即重新同步完整蛇身
+            var tail = snakeBody.pop()
+            if (!tail || tail.x !== tailX || tail.y !== tailY) {
+                resyncSnake()
+            }
         }
     }
     
@@ -15,47 +93,65 @@ Canvas {
     property int lastFrameTime: 0
     property bool needsUpdate: false
     
-    onPaint: {
-        // 当前时间
-        var currentTime = new Date().getTime()
+    // 静态层：背景、网格线、边框和障碍物，渲染到FBO纹理后缓存
+    Canvas {
+        id: staticLayer
+        anchors.fill: parent
+        renderTarget: Canvas.FramebufferObject
         
-        if (!gameEngine) {
-            // 如果游戏引擎为空，绘制占位符或提示
+        onPaint: {
             var ctx = getContext("2d")
             ctx.clearRect(0, 0, width, height)
             
-            ctx.fillStyle = "#2A3442"
-            ctx.fillRect(0, 0, width, height)
+            if (!gameEngine) {
+                // 如果游戏引擎为空，绘制占位符或提示
+                ctx.fillStyle = "#2A3442"
+                ctx.fillRect(0, 0, width, height)
+                
+                ctx.font = "20px sans-serif"
+                ctx.fillStyle = "#50FF80"
+                ctx.textAlign = "center"
+                ctx.fillText("游戏引擎加载中...", width / 2, height / 2)
+                return
+            }
+            
+            // 绘制网格背景
+            drawGrid(ctx, cellSize, offsetX, offsetY)
             
-            ctx.font = "20px sans-serif"
-            ctx.fillStyle = "#50FF80"
-            ctx.textAlign = "center"
-            ctx.fillText("游戏引擎加载中...", width / 2, height / 2)
-            return
+            // 绘制障碍物
+            drawObstacles(ctx, cellSize, offsetX, offsetY)
+        }
+    }
+    
+    // 动态层：每帧只绘制食物和蛇
+    Canvas {
+        id: canvas
+        anchors.fill: parent
+        
+        onPaint: {
+            // 当前时间
+            var currentTime = new Date().getTime()
+            
+            var ctx = getContext("2d")
+            ctx.clearRect(0, 0, width, height)
+            if (!gameEngine) return
+            
+            // 开启性能计时时记录绘制耗时
+            var profiling = gameEngine.profiling
+            if (profiling) gameEngine.beginPhase("paint")
+            
+            // 绘制食物
+            drawFood(ctx, cellSize, offsetX, offsetY)
+            
+            // 绘制蛇
+            drawSnake(ctx, cellSize, offsetX, offsetY)
+            
+            if (profiling) gameEngine.endPhase("paint")
+            
+            // 更新帧时间
+            lastFrameTime = currentTime
+            needsUpdate = false
         }
-        
-        var ctx = getContext("2d")
-        ctx.clearRect(0, 0, width, height)
-        
-        var gridSize = Math.min(width / (gameEngine.gridWidth || 30), height / (gameEngine.gridHeight || 20))
-        var offsetX = (width - (gameEngine.gridWidth || 30) * gridSize) / 2
-        var offsetY = (height - (gameEngine.gridHeight || 20) * gridSize) / 2
-        
-        // 绘制网格背景
-        drawGrid(ctx, gridSize, offsetX, offsetY)
-        
-        // 绘制障碍物
-        drawObstacles(ctx, gridSize, offsetX, offsetY)
-        
-        // 绘制食物
-        drawFood(ctx, gridSize, offsetX, offsetY)
-        
-        // 绘制蛇
-        drawSnake(ctx, gridSize, offsetX, offsetY)
-        
-        // 更新帧时间
-        lastFrameTime = currentTime
-        needsUpdate = false
     }
     
     function drawGrid(ctx, gridSize, offsetX, offsetY) {
@@ -70,21 +166,21 @@ Canvas {
         ctx.strokeStyle = "#2A3A4A"  // 适中的网格线颜色
         ctx.lineWidth = 0.5  // 细线条，减少视觉干扰
         
+        // 所有网格线合并为一条路径，一次stroke
+        ctx.beginPath()
+        
         // 绘制水平线
         for (var y = 0; y <= gridHeight; y++) {
-            ctx.beginPath()
             ctx.moveTo(offsetX, offsetY + y * gridSize)
             ctx.lineTo(offsetX + gridWidth * gridSize, offsetY + y * gridSize)
-            ctx.stroke()
         }
         
         // 绘制垂直线
         for (var x = 0; x <= gridWidth; x++) {
-            ctx.beginPath()
             ctx.moveTo(offsetX + x * gridSize, offsetY)
             ctx.lineTo(offsetX + x * gridSize, offsetY + gridHeight * gridSize)
-            ctx.stroke()
         }
+        ctx.stroke()
         
         // 绘制游戏区域边框 - 重新设置样式确保正确
         ctx.strokeStyle = "#50FF80"  // 使用游戏主题色
@@ -95,7 +191,7 @@ Canvas {
     function drawSnake(ctx, gridSize, offsetX, offsetY) {
         if (!gameEngine) return
         
-        var positions = gameEngine.snakePositions
+        var positions = snakeBody
         if (!positions || positions.length === 0) return
         
         for (var i = 0; i < positions.length; i++) {
@@ -182,33 +278,16 @@ Canvas {
     function drawFood(ctx, gridSize, offsetX, offsetY) {
         if (!gameEngine) return
         
-        // 尝试使用foodPositions数组(完整版本)
-        var foods = gameEngine.foodPositions
-        if (foods && foods.length > 0) {
-            for (var i = 0; i < foods.length; i++) {
-                var food = foods[i]
-                if (!food || food.x === undefined || food.y === undefined) continue
-                
-                var x = offsetX + food.x * gridSize
-                var y = offsetY + food.y * gridSize
-                
-                drawFoodItem(ctx, x, y, gridSize, food.type || 1)
-            }
-        } 
-        // 如果没有食物数组，尝试使用单个食物位置(简化版本)
-        else if (gameEngine.foodPosition) {
-            var singleFood = gameEngine.foodPosition
-            if (singleFood && singleFood.x !== undefined && singleFood.y !== undefined) {
-                console.log("Drawing single food at:", singleFood.x, singleFood.y)
-                var x = offsetX + singleFood.x * gridSize
-                var y = offsetY + singleFood.y * gridSize
-                
-                drawFoodItem(ctx, x, y, gridSize, 1) // 默认类型为1
-            } else {
-                console.warn("Invalid food position:", singleFood)
-            }
-        } else {
-            console.warn("No food available to draw")
+        // 食物模型同时涵盖完整版本的foods列表和简化版本的单个食物
+        var foods = foodCache
+        for (var i = 0; i < foods.length; i++) {
+            var food = foods[i]
+            if (!food || food.x === undefined || food.y === undefined) continue
+            
+            var x = offsetX + food.x * gridSize
+            var y = offsetY + food.y * gridSize
+            
+            drawFoodItem(ctx, x, y, gridSize, foodTypeCodes[food.type] || 1)
         }
     }
     
@@ -262,7 +341,7 @@ Canvas {
     function drawObstacles(ctx, gridSize, offsetX, offsetY) {
         if (!gameEngine) return
         
-        var obstacles = gameEngine.obstaclePositions
+        var obstacles = obstacleCache
         if (!obstacles || obstacles.length === 0) return
         
         for (var i = 0; i < obstacles.length; i++) {
@@ -306,18 +385,12 @@ Canvas {
         target: gameEngine
         enabled: gameEngine !== null
         function onSnakePositionsChanged() { 
+            resyncSnake()
             needsUpdate = true
             canvas.requestPaint() 
         }
-        function onFoodPositionsChanged() { 
-            needsUpdate = true
-            canvas.requestPaint() 
-        }
-        function onFoodPositionChanged() { 
-            needsUpdate = true
-            canvas.requestPaint() 
-        }
-        function onObstaclePositionsChanged() { 
+        function onSnakeDelta(headX, headY, tailX, tailY, grew) { 
+            applySnakeDelta(headX, headY, tailX, tailY, grew)
             needsUpdate = true
             canvas.requestPaint() 
         }
@@ -326,21 +399,49 @@ Canvas {
             canvas.requestPaint() 
         }
         function onGridSizeChanged() { 
+            invalidateStaticLayer()
             needsUpdate = true
             canvas.requestPaint() 
         }
     }
     
-   
-    Timer {
-        interval: 60
-        running: canvas.visible
-        repeat: true
-        onTriggered: {
-            // 只在需要更新时重绘
-            if (needsUpdate) {
-                canvas.requestPaint()
-            }
+    Connections {
+        target: gameEngine ? gameEngine.foodModel : null
+        function onRowsInserted(parent, first, last) {
+            insertRows(foodCache, target, first, last)
+            canvas.requestPaint()
+        }
+        function onRowsRemoved(parent, first, last) {
+            foodCache.splice(first, last - first + 1)
+            canvas.requestPaint()
+        }
+        function onDataChanged(topLeft, bottomRight) {
+            updateRows(foodCache, target, topLeft.row, bottomRight.row)
+            canvas.requestPaint()
+        }
+        function onModelReset() {
+            foodCache = readModel(target)
+            canvas.requestPaint()
+        }
+    }
+    
+    Connections {
+        target: gameEngine ? gameEngine.obstacleModel : null
+        function onRowsInserted(parent, first, last) {
+            insertRows(obstacleCache, target, first, last)
+            invalidateStaticLayer()
+        }
+        function onRowsRemoved(parent, first, last) {
+            obstacleCache.splice(first, last - first + 1)
+            invalidateStaticLayer()
+        }
+        function onDataChanged(topLeft, bottomRight) {
+            updateRows(obstacleCache, target, topLeft.row, bottomRight.row)
+            invalidateStaticLayer()
+        }
+        function onModelReset() {
+            obstacleCache = readModel(target)
+            invalidateStaticLayer()
         }
     }
 } 
\ No newline at end of file
@@ -16,6 +16,9 @@ Rectangle {
     
     signal backToMenu()
     
+    property string rendererMode: (typeof configManager !== "undefined" && configManager !== null) ?
+                                  configManager.getRendererMode() : "canvas"
+    
     // 游戏区域
     Rectangle {
         id: gameArea
@@ -25,13 +28,27 @@ Rectangle {
         width: parent.width - sidePanel.width
         color: "#0C141E"
         
-        // 游戏渲染器
-        GameRenderer {
+        // 游戏渲染器，由config.toml [graphics] renderer 选择 canvas 或 scene
+        Loader {
             id: gameRenderer
             anchors.centerIn: parent
             width: Math.min(parent.width - 40, 800)
             height: Math.min(parent.height - 40, 600)
-            gameEngine: gameView.gameEngine
+            sourceComponent: gameView.rendererMode === "scene" ? sceneRendererComponent : canvasRendererComponent
+        }
+        
+        Component {
+            id: canvasRendererComponent
+            GameRenderer {
+                gameEngine: gameView.gameEngine
+            }
+        }
+        
+        Component {
+            id: sceneRendererComponent
+            SceneRenderer {
+                gameEngine: gameView.gameEngine
+            }
         }
         
         // 游戏状态覆盖层
@@ -69,7 +86,7 @@ Rectangle {
                             
                             switch(gameView.gameEngine.gameState) {
                                 case "paused": return "游戏暂停";
-                                case "game_over": return "游戏结束";
+                                case "game_over": return gameView.gameEngine.won ? "恭喜通关" : "游戏结束";
                                 case "ready": return "准备开始";
                                 default: return "";
                             }
@@ -89,6 +106,7 @@ Rectangle {
                                 case "ready": return "按空格键开始游戏";
                                 case "paused": return "按空格键继续";
                                 case "game_over": return gameView.gameEngine.score !== undefined ? 
+                                                  (gameView.gameEngine.won ? "蛇身填满了整个棋盘！" : "") +
                                                   "最终分数: " + gameView.gameEngine.score : "";
                                 default: return "";
                             }
@@ -355,8 +373,44 @@ Rectangle {
                 }
             }
         }
+
+        // 性能计时覆盖层（F3开关，F4导出Chrome trace）
+        Rectangle {
+            id: perfOverlay
+            anchors.left: gameRenderer.left
+            anchors.top: gameRenderer.top
+            anchors.margins: 8
+            width: perfText.implicitWidth + 16
+            height: perfText.implicitHeight + 12
+            visible: gameView.gameEngine !== null && gameView.gameEngine.profiling
+            color: "#CC0C141E"
+            radius: 4
+            border.color: "#2A3A4A"
+            border.width: 1
+
+            Text {
+                id: perfText
+                anchors.centerIn: parent
+                font.family: "monospace"
+                font.pixelSize: 11
+                color: "#70FFAA"
+                text: {
+                    var stats = perfOverlay.visible ? gameView.gameEngine.perfStats : null
+                    if (!stats) return "profiling..."
+                    var lines = ["phase        mean    p95     max  (ms)"]
+                    for (var phase in stats) {
+                        var s = stats[phase]
+                        lines.push((phase + "         ").substr(0, 10) +
+                                   ("       " + s.mean_ms.toFixed(3)).slice(-8) +
+                                   ("       " + s.p95_ms.toFixed(3)).slice(-8) +
+                                   ("       " + s.max_ms.toFixed(3)).slice(-8))
+                    }
+                    return lines.join("\n")
+                }
+            }
+        }
     }
-    
+
     // 侧边栏
     Rectangle {
         id: sidePanel
@@ -0,0 +1,203 @@
+import QtQuick 2.15
+
+// 场景图渲染器：每个格子是一个独立的Item（场景图节点），
+// 由snakeModel/foodModel/obstacleModel的行变化通知驱动，
+// 每帧只有新增/移除的格子需要更新，网格线只在尺寸变化时重绘一次。
+Item {
+    id: sceneRenderer
+
+    property var gameEngine: null
+    onGameEngineChanged: {
+        if (gameEngine !== null) {
+            console.log("SceneRenderer received gameEngine:", gameEngine)
+            updateHead()
+        }
+    }
+
+    readonly property int gridWidth: gameEngine ? (gameEngine.gridWidth || 30) : 30
+    readonly property int gridHeight: gameEngine ? (gameEngine.gridHeight || 20) : 20
+    readonly property real cellSize: Math.min(width / gridWidth, height / gridHeight)
+    readonly property bool ghostMode: gameEngine ? gameEngine.ghostMode : false
+
+    // 蛇头单独绘制，避免蛇身委托依赖index（插入第0行时所有index都会变化）
+    property int headX: -1
+    property int headY: -1
+    // 上一逻辑帧的蛇头，配合gameEngine.interpolationAlpha在两帧之间平滑移动
+    property int prevHeadX: -1
+    property int prevHeadY: -1
+    readonly property real alpha: gameEngine ? gameEngine.interpolationAlpha : 1.0
+    readonly property bool interpolate: Math.abs(headX - prevHeadX) + Math.abs(headY - prevHeadY) === 1
+
+    function updateHead() {
+        var model = gameEngine ? gameEngine.snakeModel : null
+        var head = model && model.count > 0 ? model.get(0) : null
+        prevHeadX = headX
+        prevHeadY = headY
+        headX = head ? head.x : -1
+        headY = head ? head.y : -1
+    }
+
+    function headPosition(previous, current) {
+        if (!interpolate) return current
+        return previous + (current - previous) * alpha
+    }
+
+    function foodColor(type) {
+        switch (type) {
+            case "speed_up": return "#64C8FF"
+            case "speed_down": return "#B464FF"
+            case "ghost": return "#FFDC64"
+            case "bonus": return "#FF9864"
+        }
+        return "#FF6464"
+    }
+
+    Item {
+        id: board
+        anchors.centerIn: parent
+        width: sceneRenderer.gridWidth * sceneRenderer.cellSize
+        height: sceneRenderer.gridHeight * sceneRenderer.cellSize
+
+        // 背景
+        Rectangle {
+            anchors.fill: parent
+            color: "#0C141E"
+        }
+
+        // 静态网格线：只在网格尺寸或控件大小变化时重绘
+        Canvas {
+            id: gridLayer
+            anchors.fill: parent
+            renderTarget: Canvas.FramebufferObject
+            onWidthChanged: requestPaint()
+            onHeightChanged: requestPaint()
+
+            onPaint: {
+                var ctx = getContext("2d")
+                var size = sceneRenderer.cellSize
+                ctx.clearRect(0, 0, width, height)
+                ctx.strokeStyle = "#2A3A4A"
+                ctx.lineWidth = 0.5
+                ctx.beginPath()
+                for (var y = 0; y <= sceneRenderer.gridHeight; y++) {
+                    ctx.moveTo(0, y * size)
+                    ctx.lineTo(width, y * size)
+                }
+                for (var x = 0; x <= sceneRenderer.gridWidth; x++) {
+                    ctx.moveTo(x * size, 0)
+                    ctx.lineTo(x * size, height)
+                }
+                ctx.stroke()
+            }
+        }
+
+        // 障碍物
+        Repeater {
+            model: sceneRenderer.gameEngine ? sceneRenderer.gameEngine.obstacleModel : null
+            delegate: Rectangle {
+                x: model.x * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.1
+                y: model.y * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.1
+                width: sceneRenderer.cellSize * 0.8
+                height: width
+                color: "#505A64"
+                border.color: "#AAAAAA"
+                border.width: 1
+            }
+        }
+
+        // 食物
+        Repeater {
+            model: sceneRenderer.gameEngine ? sceneRenderer.gameEngine.foodModel : null
+            delegate: Rectangle {
+                x: model.x * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.2
+                y: model.y * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.2
+                width: sceneRenderer.cellSize * 0.6
+                height: width
+                radius: width / 2
+                color: sceneRenderer.foodColor(model.type)
+                border.color: "#FFFFFF"
+                border.width: 1
+
+                // 特殊食物的内圈
+                Rectangle {
+                    visible: model.type !== "normal"
+                    anchors.centerIn: parent
+                    width: parent.width * 0.4
+                    height: width
+                    radius: width / 2
+                    color: "#FFFFFF"
+                }
+            }
+        }
+
+        // 蛇身（第0行是蛇头所在的格子，由下面插值移动的蛇头绘制，否则蛇头还没到时这里已经有一节蛇身）
+        Repeater {
+            model: sceneRenderer.gameEngine ? sceneRenderer.gameEngine.snakeModel : null
+            delegate: Rectangle {
+                visible: index > 0
+                x: model.x * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.15
+                y: model.y * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.15
+                width: sceneRenderer.cellSize * 0.7
+                height: width
+                radius: width / 2
+                color: "#3CCC60"
+                opacity: sceneRenderer.ghostMode ? 0.7 : 1.0
+                border.color: "#CCCCCC"
+                border.width: 1
+            }
+        }
+
+        // 蛇头
+        Rectangle {
+            visible: sceneRenderer.headX >= 0
+            x: sceneRenderer.headPosition(sceneRenderer.prevHeadX, sceneRenderer.headX) * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.1
+            y: sceneRenderer.headPosition(sceneRenderer.prevHeadY, sceneRenderer.headY) * sceneRenderer.cellSize + sceneRenderer.cellSize * 0.1
+            width: sceneRenderer.cellSize * 0.8
+            height: width
+            radius: width / 2
+            color: sceneRenderer.ghostMode ? "#80FF80AA" : "#50FF80"
+            border.color: "#FFFFFF"
+            border.width: 2
+
+            Repeater {
+                model: [-1, 1]
+                delegate: Rectangle {
+                    width: sceneRenderer.cellSize * 0.16
+                    height: width
+                    radius: width / 2
+                    color: "#0C141E"
+                    x: parent.width / 2 + modelData * sceneRenderer.cellSize * 0.15 - width / 2
+                    y: parent.height / 2 - sceneRenderer.cellSize * 0.15 - height / 2
+                }
+            }
+        }
+
+        // 游戏区域边框
+        Rectangle {
+            anchors.fill: parent
+            color: "transparent"
+            border.color: "#50FF80"
+            border.width: 3
+        }
+    }
+
+    Connections {
+        target: sceneRenderer.gameEngine ? sceneRenderer.gameEngine.snakeModel : null
+        function onRowsInserted(parent, first, last) {
+            if (first === 0) sceneRenderer.updateHead()
+        }
+        function onModelReset() {
+            sceneRenderer.updateHead()
+            sceneRenderer.prevHeadX = sceneRenderer.headX
+            sceneRenderer.prevHeadY = sceneRenderer.headY
+        }
+    }
+
+    Connections {
+        target: sceneRenderer.gameEngine
+        enabled: sceneRenderer.gameEngine !== null
+        function onGridSizeChanged() {
+            gridLayer.requestPaint()
+        }
+    }
+}
@@ -107,6 +107,13 @@ ApplicationWindow {
                         window._gameEngine.resetGame()
                         window.currentView = "menu"
                         break
+                    case Qt.Key_F3:
+                        // 性能计时和覆盖层
+                        window._gameEngine.profiling = !window._gameEngine.profiling
+                        break
+                    case Qt.Key_F4:
+                        console.log("Trace written to:", window._gameEngine.dumpPerfTrace(""))
+                        break
                 }
             }
             event.accepted = true
@@ -146,49 +153,72 @@ ApplicationWindow {
             }
         }
         
-        // 游戏界面
-        GameView {
-            id: gameView
+        // 游戏界面：首帧显示主菜单之后再在后台创建，其它界面第一次打开时才创建
+        Loader {
+            id: gameViewLoader
             anchors.fill: parent
             visible: window.currentView === "game"
-            gameEngine: window._gameEngine
-            onBackToMenu: {
-                window.currentView = "menu"
-                if (window._gameEngine) {
-                    window._gameEngine.resetGame()
+            active: visible
+            asynchronous: true
+            sourceComponent: GameView {
+                gameEngine: window._gameEngine
+                onBackToMenu: {
+                    window.currentView = "menu"
+                    if (window._gameEngine) {
+                        window._gameEngine.resetGame()
+                    }
                 }
             }
         }
         
+        Connections {
+            target: window
+            function onFrameSwapped() {
+                enabled = false
+                gameViewLoader.active = true
+            }
+        }
+        
         // 设置界面
-        SettingsView {
-            id: settingsView
+        Loader {
             anchors.fill: parent
             visible: window.currentView === "settings"
-            configManager: window._configManager
-            onBackToMenu: {
-                window.currentView = "menu"
+            active: visible
+            sourceComponent: SettingsView {
+                configManager: window._configManager
+                onBackToMenu: {
+                    window.currentView = "menu"
+                }
             }
+            // 创建之后保留
+            onLoaded: active = true
         }
         
         // 高分界面
-        HighScoresView {
-            id: highScoresView
+        Loader {
             anchors.fill: parent
             visible: window.currentView === "highscores"
-            onBackToMenu: {
-                window.currentView = "menu"
+            active: visible
+            sourceComponent: HighScoresView {
+                configManager: window._configManager
+                onBackToMenu: {
+                    window.currentView = "menu"
+                }
             }
+            onLoaded: active = true
         }
         
         // 成就界面
-        AchievementsView {
-            id: achievementsView
+        Loader {
             anchors.fill: parent
             visible: window.currentView === "achievements"
-            onBackToMenu: {
-                window.currentView = "menu"
+            active: visible
+            sourceComponent: AchievementsView {
+                onBackToMenu: {
+                    window.currentView = "menu"
+                }
             }
+            onLoaded: active = true
         }
     }
 }
\ No newline at end of file
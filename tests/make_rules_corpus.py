@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成 tests/corpus/rules.json：CLASSIC 和 FREESTYLE 下的方向日志、食物序列及期望的结束状态
+
+期望状态不由 SnakeSimulation 计算，而是由下面的 BaselineGame 推进得到：它逐条照搬拆分之前
+GameEngine.update_game 的规则（穿越边界 / 撞墙、蛇尾尚未移动时撞到它也算撞到自己、每个食物加10分并生长2格、
+只拒绝与当前方向相反的按键），只依赖标准库。食物位置同样按原来的 _spawn_food（远离边界1格随机选取）生成，
+写入语料，测试时注入 SnakeSimulation 和 GameEngine，因此期望与新实现的随机数用法无关。
+
+方向日志每个字符对应一个逻辑帧：U/D/L/R 表示这一帧之前按下的方向键，"." 表示没有按键。
+日志由脚本化玩家生成（贪心地吃若干个食物，再按用例的要求撞墙、绕圈撞到自己或穿越边界）。
+规则有意改变时修改 BaselineGame 并重新生成，逐条审阅 rules.json 的差异；
+test_rules_corpus.py 只读取 rules.json，不调用这里的代码。
+
+用法: python tests/make_rules_corpus.py
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+CORPUS = Path(__file__).resolve().parent / "corpus" / "rules.json"
+# 两种模式都是 30x20（与 simulation.grid_size_for_mode 相同，测试中会检查）
+GRID_WIDTH = 30
+GRID_HEIGHT = 20
+DELTAS = {"U": (0, -1), "D": (0, 1), "L": (-1, 0), "R": (1, 0)}
+TURNS = {"R": "U", "U": "L", "L": "D", "D": "R"}
+
+
+def format_cells(cells):
+    """"x,y x,y ..."（蛇身从蛇头到蛇尾）"""
+    return " ".join(f"{x},{y}" for x, y in cells)
+
+
+class BaselineGame:
+    """拆分之前 GameEngine.update_game 的规则"""
+
+    def __init__(self, mode, seed):
+        self.mode = mode
+        self.wraps = mode == "freestyle"
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        self.rng = random.Random(seed)
+        self.positions = [(self.width // 2, self.height // 2)]
+        self.direction = self.next_direction = "R"
+        self.growing = 0
+        self.score = 0
+        self.tick = 0
+        self.alive = True
+        self.death_reason = None
+        self.foods = []
+        self.food = None
+        self._spawn_food()
+
+    def _spawn_food(self):
+        while True:
+            cell = (self.rng.randint(1, self.width - 2), self.rng.randint(1, self.height - 2))
+            if cell not in self.positions:
+                self.food = cell
+                self.foods.append(cell)
+                return
+
+    def set_direction(self, key):
+        """长度小于2时任何方向都有效，否则不能与当前方向相反"""
+        dx, dy = DELTAS[self.direction]
+        new_dx, new_dy = DELTAS[key]
+        if len(self.positions) < 2 or not (dx == -new_dx and dy == -new_dy):
+            self.next_direction = key
+
+    def update(self):
+        self.tick += 1
+        self.direction = self.next_direction
+        head_x, head_y = self.positions[0]
+        dx, dy = DELTAS[self.direction]
+        new_head = (head_x + dx, head_y + dy)
+        if self.wraps:
+            new_head = (new_head[0] % self.width, new_head[1] % self.height)
+        elif not (0 <= new_head[0] < self.width and 0 <= new_head[1] < self.height):
+            return self._die("wall")
+        if new_head in self.positions:
+            return self._die("self")
+        self.positions.insert(0, new_head)
+        if new_head == self.food:
+            self.score += 10
+            self.growing += 1
+            self._spawn_food()
+        elif self.growing > 0:
+            self.growing -= 1
+        else:
+            self.positions.pop()
+        return True
+
+    def _die(self, reason):
+        self.alive = False
+        self.death_reason = reason
+        return False
+
+    def expected(self):
+        return {
+            "tick": self.tick,
+            "alive": self.alive,
+            "death_reason": self.death_reason,
+            "score": self.score,
+            "length": len(self.positions),
+            "direction": self.direction,
+            "food": format_cells([self.food]),
+            "body": format_cells(self.positions),
+        }
+
+
+def safe(game, key):
+    """这一步不会撞墙或撞到自己（蛇尾尚未移动，仍算占用）"""
+    dx, dy = DELTAS[key]
+    x, y = game.positions[0][0] + dx, game.positions[0][1] + dy
+    if game.wraps:
+        x %= game.width
+        y %= game.height
+    elif not (0 <= x < game.width and 0 <= y < game.height):
+        return False
+    return (x, y) not in game.positions
+
+
+def is_reverse(a, b):
+    return DELTAS[a] == tuple(-d for d in DELTAS[b])
+
+
+def toward_food(game):
+    """贪心地走向食物（不考虑穿越边界），没有安全的方向时保持原方向"""
+    fx, fy = game.food
+    hx, hy = game.positions[0]
+    candidates = sorted(
+        (key for key in DELTAS
+         if not (len(game.positions) > 1 and is_reverse(game.direction, key)) and safe(game, key)),
+        key=lambda k: abs(hx + DELTAS[k][0] - fx) + abs(hy + DELTAS[k][1] - fy))
+    return candidates[0] if candidates else game.direction
+
+
+def play(game, log, key):
+    """按下 key（与当前方向相同时不按键）并推进一帧"""
+    if key != game.direction:
+        game.set_direction(key)
+        log.append(key)
+    else:
+        log.append(".")
+    return game.update()
+
+
+def eat(game, log, foods):
+    for _ in range(foods):
+        target = game.score + 10
+        while game.score < target:
+            if not play(game, log, toward_food(game)):
+                return
+
+
+def into_wall(game, log):
+    """转到与当前方向垂直的方向后一直走：CLASSIC 撞墙，FREESTYLE 穿越边界后继续走"""
+    key = "U" if game.direction in ("L", "R") else "L"
+    for _ in range(game.width + game.height):
+        if not play(game, log, key):
+            return
+
+
+def into_self(game, log):
+    """连续三次同向转弯，第三步回到两帧前的蛇身上"""
+    for _ in range(3):
+        if not play(game, log, TURNS[game.direction]):
+            return
+
+
+def coast(game, log):
+    """不再按键，走完 2 * width 帧（FREESTYLE 穿越边界两次）"""
+    for _ in range(2 * game.width):
+        if not play(game, log, game.direction):
+            return
+
+
+def stop(game, log):
+    pass
+
+
+def run_case(name, mode, seed, foods, finish):
+    game = BaselineGame(mode, seed)
+    log = []
+    eat(game, log, foods)
+    finish(game, log)
+    return {
+        "name": name,
+        "mode": mode,
+        "width": game.width,
+        "height": game.height,
+        "foods": format_cells(game.foods),
+        "directions": "".join(log),
+        "expected": game.expected(),
+    }
+
+
+def build():
+    cases = []
+    for mode in ("classic", "freestyle"):
+        for seed in (1, 2):
+            edge = "wall" if mode == "classic" else "wrap"
+            cases.append(run_case(f"{mode}-{edge}-{seed}", mode, seed, 0, into_wall))
+            cases.append(run_case(f"{mode}-growth-{seed}", mode, seed, 6, coast if mode == "freestyle" else stop))
+            cases.append(run_case(f"{mode}-self-{seed}", mode, seed, 4, into_self))
+    return cases
+
+
+def main():
+    cases = build()
+    CORPUS.parent.mkdir(parents=True, exist_ok=True)
+    CORPUS.write_text(json.dumps(cases, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    for case in cases:
+        expected = case["expected"]
+        print(f"{case['name']:<22} ticks {expected['tick']:>4}  score {expected['score']:>3}  "
+              f"{expected['death_reason'] or 'alive'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""FixedStepClock：用手动推进的时钟检查逻辑帧数和延迟统计"""
+
+from game_loop import FixedStepClock
+
+MS = 1_000_000
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def run(clock, fixed, ms, frames):
+    """以 ms 毫秒的间隔调用 advance() frames 次，返回逻辑帧总数"""
+    ticks = 0
+    for _ in range(frames):
+        clock.now += ms * MS
+        ticks += fixed.advance()
+    return ticks
+
+
+def test_on_time_ticks_have_no_lateness():
+    clock = ManualClock()
+    fixed = FixedStepClock(100, clock=clock)
+    fixed.start()
+    assert run(clock, fixed, 100, 10) == 10
+    stats = fixed.jitter_stats()
+    assert stats["max_ms"] == 0.0 and stats["dropped"] == 0
+
+
+def test_step_change_mid_run_keeps_schedule():
+    clock = ManualClock()
+    fixed = FixedStepClock(100, clock=clock)
+    fixed.start()
+    assert run(clock, fixed, 100, 5) == 5
+    clock.now += 40 * MS
+    assert fixed.advance() == 0
+    fixed.set_step_ms(200)
+    # 已累加的40毫秒保留：下一个逻辑帧在160毫秒之后
+    clock.now += 160 * MS
+    assert fixed.advance() == 1
+    assert run(clock, fixed, 200, 10) == 10
+    stats = fixed.jitter_stats()
+    assert stats["ticks"] == 16
+    assert stats["mean_ms"] == stats["max_ms"] == 0.0
+
+
+def test_step_change_before_start():
+    clock = ManualClock()
+    fixed = FixedStepClock(100, clock=clock)
+    fixed.set_step_ms(50)
+    fixed.start()
+    assert run(clock, fixed, 50, 4) == 4
+    assert fixed.jitter_stats()["max_ms"] == 0.0
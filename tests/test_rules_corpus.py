@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+规则语料：CLASSIC / FREESTYLE 下的方向日志和食物序列（corpus/rules.json，由 make_rules_corpus.py 生成）
+
+期望状态来自 make_rules_corpus.BaselineGame（拆分之前 update_game 的规则），不是 SnakeSimulation 的输出。
+语料中的食物序列替换随机生成的食物，同一份日志分别由 SnakeSimulation 和 GameEngine.update_game 推进，
+结束状态都必须与期望相同。
+SnakeSimulation 每帧之后还检查占用位图和空闲格子索引与蛇身一致，并在日志中途拍快照、
+推进到结尾后恢复再重放，检查撤销日志能回到完全相同的状态。
+"""
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from simulation import FOOD_SCORE, Direction, GameMode, SnakeSimulation, grid_size_for_mode
+
+CASES = json.loads((Path(__file__).resolve().parent / "corpus" / "rules.json").read_text(encoding="utf-8"))
+DIRECTIONS = {"U": Direction.UP, "D": Direction.DOWN, "L": Direction.LEFT, "R": Direction.RIGHT}
+KEYS = {direction: key for key, direction in DIRECTIONS.items()}
+KEY_NAMES = {"U": "up", "D": "down", "L": "left", "R": "right"}
+
+
+def format_cells(cells):
+    return " ".join(f"{x},{y}" for x, y in cells)
+
+
+def state(sim):
+    """与语料中 expected 相同格式的状态"""
+    return {
+        "tick": sim.tick,
+        "alive": sim.alive,
+        "death_reason": sim.death_reason,
+        "score": sim.score,
+        "length": len(sim.body),
+        "direction": KEYS[sim.direction],
+        "food": format_cells([sim.food] if sim.food else []),
+        "body": format_cells(sim.body),
+    }
+
+
+def parse_cells(text):
+    return [tuple(map(int, cell.split(","))) for cell in text.split()]
+
+
+def inject_foods(sim, case):
+    """用语料中的食物序列代替随机生成：吃掉 n 个食物之后出现第 n 个（从0开始）"""
+    foods = parse_cells(case["foods"])
+
+    def spawn_food():
+        sim.food = foods[sim.score // FOOD_SCORE]
+        return True
+
+    sim.spawn_food = spawn_food
+
+
+def new_simulation(case):
+    mode = GameMode(case["mode"])
+    assert grid_size_for_mode(mode) == (case["width"], case["height"])
+    sim = SnakeSimulation(case["width"], case["height"], mode, rng=random.Random(0))
+    inject_foods(sim, case)
+    sim.reset()
+    return sim
+
+
+def check_invariants(sim):
+    """占用位图、空闲格子索引与蛇身一致"""
+    width = sim.grid_width
+    cells = {y * width + x for x, y in sim.body}
+    assert len(cells) == len(sim.body), "snake overlaps itself"
+    assert {i for i, taken in enumerate(sim.occupied) if taken} == cells
+    free = sim._free_interior.cells + sim._free_border.cells
+    assert len(free) == len(set(free)) == width * sim.grid_height - len(cells)
+    assert not cells.intersection(free)
+
+
+def play(sim, keys, check=False):
+    for key in keys:
+        if not sim.alive:
+            break
+        if key != ".":
+            sim.set_direction(DIRECTIONS[key])
+        sim.step()
+        if check:
+            check_invariants(sim)
+
+
+def test_hand_checked_wall():
+    """手算：蛇从 (15, 10) 向右，第14帧到达 (29, 10)，第15帧撞墙"""
+    sim = new_simulation({"mode": "classic", "width": 30, "height": 20, "foods": "1,1"})
+    play(sim, "." * 15, check=True)
+    assert (sim.tick, sim.death_reason, list(sim.body)) == (15, "wall", [(29, 10)])
+
+
+def test_hand_checked_growth():
+    """手算：吃到食物的那一帧和下一帧蛇尾都不移动，之后保持长度3"""
+    sim = new_simulation({"mode": "classic", "width": 30, "height": 20, "foods": "16,10 1,1"})
+    play(sim, "....", check=True)
+    assert sim.score == FOOD_SCORE and sim.food == (1, 1)
+    assert list(sim.body) == [(19, 10), (18, 10), (17, 10)]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_simulation(case):
+    sim = new_simulation(case)
+    play(sim, case["directions"], check=True)
+    assert state(sim) == case["expected"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_snapshot_restore(case):
+    sim = new_simulation(case)
+    keys = case["directions"]
+    middle = len(keys) // 2
+    play(sim, keys[:middle])
+    snapshot = sim.snapshot()
+    saved = sim.to_bytes()
+    play(sim, keys[middle:])
+    assert state(sim) == case["expected"]
+
+    sim.restore(snapshot)
+    assert sim.to_bytes() == saved
+    check_invariants(sim)
+    play(sim, keys[middle:])
+    assert state(sim) == case["expected"]
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_engine(case, qt_app):
+    from game_engine import GameEngine
+
+    engine = GameEngine()
+    engine.setGameMode(case["mode"], 5)
+    inject_foods(engine.simulation, case)
+    engine.startGame()  # READY：新的一局
+    engine.startGame()  # PLAYING
+    reasons = []
+    engine.gameOverSignal.connect(lambda score, reason: reasons.append(reason))
+    try:
+        for key in case["directions"]:
+            if key != ".":
+                engine.setDirection(KEY_NAMES[key])
+            engine.update_game()
+        expected = case["expected"]
+        assert state(engine.simulation) == expected
+        assert engine.score == expected["score"]
+        assert format_cells((cell["x"], cell["y"]) for cell in engine.snakePositions) == expected["body"]
+        if expected["alive"]:
+            assert engine.gameState == "playing" and reasons == []
+        else:
+            assert engine.gameState == "game_over" and reasons == [expected["death_reason"]]
+    finally:
+        engine.resetGame()